@@ -0,0 +1,217 @@
+"""Streamlit 화면 없이 같은 분석 결과를 받아 가는 HTTP/JSON API (ASGI).
+
+    GEMINI_API_KEY=... uvicorn api:app --host 0.0.0.0 --port 8000
+
+    GET /snapshot?q=삼성전자              현재가, 상세 재무 지표, 재무제표 요약, 52주 범위, 뉴스 목록
+    GET /report?q=NVDA&kind=report       AI 리포트 (kind: chart, financial, news_briefing, sentiment, report)
+    GET /healthz
+
+같은 종목에 대한 요청이 동시에 몰리면 처음 요청 하나만 실제로 수집/생성하고 나머지는 그 결과를 함께 받습니다.
+수집과 AI 응답은 app.py와 같은 stock_core 캐시를 거치므로, 이미 본 종목은 네트워크 없이 바로 돌려줍니다.
+요청마다 단계별 소요 시간을 trace로 남기며, STOCK_TERMINAL_TRACE_FILE을 지정하면 OTLP/JSON으로 기록합니다.
+"""
+import asyncio
+import contextvars
+import json
+import math
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import asdict
+from datetime import datetime, timedelta
+from urllib.parse import parse_qs
+
+import numpy as np
+
+from stock_core.history import load_price_history, load_quote, positive_prices
+from stock_core.indicators import add_indicators
+from stock_core.llm import LLMUnavailableError, generate_report
+from stock_core.prompts import (
+    NEWS_TOKEN_BUDGETS, analysis_price_table, build_news_context, chart_prompt, financial_prompt,
+    ma_context_text, news_briefing_prompt, report_prompt, sentiment_prompt, statement_trend_text,
+)
+from stock_core.refresher import get_refresher, track_ticker
+from stock_core.resolver import get_ticker_symbol, normalize_term
+from stock_core.snapshot import fetch_snapshot, is_korean_ticker
+from stock_core.tracing import count, finish_trace, span, start_trace
+
+API_POOL_SIZE = 16
+REPORT_KINDS = ('chart', 'financial', 'news_briefing', 'sentiment', 'report')
+REPORT_CONFIG = {"temperature": 0.1}
+# 화면의 차트 탭 기본값(일봉, 최근 10년)과 같은 구간/이동평균으로 리포트를 만듭니다.
+REPORT_LOOKBACK_DAYS = 365 * 10
+DAILY_MA_LABELS = [(5, "MA1(5일)"), (20, "MA2(20일)"), (60, "MA3(60일)"), (120, "MA4(120일)")]
+
+_pool = ThreadPoolExecutor(max_workers=API_POOL_SIZE, thread_name_prefix="api")
+
+
+class NotFound(Exception):
+    pass
+
+
+class AsyncSingleFlight:
+    """같은 키로 동시에 들어온 요청은 처음 요청의 작업 하나를 함께 기다립니다. (이벤트 루프 스레드 안에서만 씀)"""
+    def __init__(self):
+        self._inflight = {}
+
+    async def do(self, key, fn):
+        future = self._inflight.get(key)
+        if future is None:
+            # 실제 작업의 span은 처음 요청한 쪽의 trace에 남고, 나머지 요청에는 합류 횟수만 남습니다.
+            future = asyncio.get_running_loop().run_in_executor(_pool, contextvars.copy_context().run, fn)
+            self._inflight[key] = future
+            future.add_done_callback(lambda f: self._inflight.pop(key) if self._inflight.get(key) is f else None)
+        else:
+            count('coalesced')
+        # 요청 하나가 끊겨도 같은 작업을 기다리는 다른 요청은 계속 받을 수 있도록 shield로 감쌉니다.
+        return await asyncio.shield(future)
+
+
+flights = AsyncSingleFlight()
+
+
+def jsonable(value):
+    # NumPy 값과 NaN/inf는 JSON에 그대로 못 넣으므로 파이썬 값/None으로 바꿉니다.
+    if isinstance(value, dict):
+        return {str(k): jsonable(v) for k, v in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [jsonable(v) for v in value]
+    if isinstance(value, np.generic):
+        value = value.item()
+    if isinstance(value, float) and (math.isnan(value) or math.isinf(value)):
+        return None
+    return value
+
+
+def news_query_for(ticker, query):
+    # 화면과 같이 한국 종목은 입력한 종목명, 미국 종목은 티커로 뉴스를 찾습니다.
+    return query if is_korean_ticker(ticker) else ticker
+
+
+def load_analysis(ticker, news_query):
+    quote = load_quote(ticker)
+    if quote.empty:
+        raise NotFound(ticker)
+    return float(quote['Close'].iloc[-1]), fetch_snapshot(ticker, news_query)
+
+
+async def resolve(query):
+    return await flights.do(('resolve', normalize_term(query)), lambda: get_ticker_symbol(query))
+
+
+async def analysis(ticker, news_query):
+    return await flights.do(('snapshot', ticker, news_query), lambda: load_analysis(ticker, news_query))
+
+
+def snapshot_payload(price, snap):
+    return {
+        "ticker": snap.ticker,
+        "price": price,
+        "currency": snap.currency,
+        "high_52": snap.high_52,
+        "low_52": snap.low_52,
+        "valuation": asdict(snap.valuation()),
+        "statements": asdict(snap.statements()),
+        "profile": snap.profile.to_dict(),
+        "trend": snap.statement_history().as_dict(),
+        "news": snap.news,
+        "failed": snap.failed,
+    }
+
+
+def build_report(kind, query, price, snap):
+    ticker, currency = snap.ticker, snap.currency
+    terms = [ticker.split('.')[0], query.strip()]
+    news_context = build_news_context(snap.news, NEWS_TOKEN_BUDGETS[kind], terms)
+    today = datetime.now()
+    today_date = today.strftime("%Y년 %m월 %d일")
+    if kind == 'chart':
+        start, end = today.date() - timedelta(days=REPORT_LOOKBACK_DAYS), today.date()
+        tables = [analysis_price_table(ticker, interval, start, end) for interval in ("1d", "1wk", "1mo")]
+        prompt = chart_prompt(ticker, news_context, *tables, currency)
+    elif kind == 'financial':
+        trend_text = statement_trend_text(snap.statement_history())
+        prompt = financial_prompt(ticker, news_context, snap.valuation(), snap.statements(), currency, trend_text)
+    elif kind == 'news_briefing':
+        prompt = news_briefing_prompt(ticker, today_date, news_context)
+    elif kind == 'sentiment':
+        prompt = sentiment_prompt(ticker, today_date, news_context)
+    else:
+        history = positive_prices(load_price_history(ticker, "1d"))
+        history = add_indicators(ticker, "1d", history, [w for w, _ in DAILY_MA_LABELS])
+        history = history[history.index.date >= today.date() - timedelta(days=REPORT_LOOKBACK_DAYS)]
+        ma_context = ma_context_text(history, DAILY_MA_LABELS, snap.price_fmt, currency) if not history.empty else "차트 데이터 부족"
+        prompt = report_prompt(
+            ticker, today_date, price, snap.high_52, snap.low_52, ma_context,
+            snap.valuation(), snap.statements(), news_context, currency, snap.price_fmt,
+        )
+    return {"ticker": ticker, "kind": kind, "text": generate_report(prompt, config=REPORT_CONFIG)}
+
+
+async def handle(path, params):
+    if path == '/healthz':
+        return 200, {"status": "ok"}
+    if path not in ('/snapshot', '/report'):
+        return 404, {"error": "not found"}
+    query = params.get('q', '').strip()
+    if not query:
+        return 400, {"error": "q(종목명 또는 티커)가 필요합니다."}
+    kind = params.get('kind', 'report')
+    if path == '/report' and kind not in REPORT_KINDS:
+        return 400, {"error": f"kind는 {', '.join(REPORT_KINDS)} 중 하나여야 합니다."}
+
+    with span("resolve"):
+        ticker = await resolve(query)
+    news_query = news_query_for(ticker, query)
+    track_ticker(ticker, news_query)
+    try:
+        with span("snapshot", ticker=ticker):
+            price, snap = await analysis(ticker, news_query)
+    except NotFound:
+        return 404, {"error": f"'{query}'에 대한 데이터를 찾을 수 없습니다.", "ticker": ticker}
+    if path == '/snapshot':
+        return 200, snapshot_payload(price, snap)
+    try:
+        with span("report", kind=kind):
+            return 200, await flights.do(('report', ticker, news_query, kind), lambda: build_report(kind, query, price, snap))
+    except LLMUnavailableError as e:
+        return 503, {"error": str(e)}
+
+
+async def send_json(send, status, payload, head=False, headers=()):
+    """head=True(HEAD 요청)면 같은 헤더만 보내고 본문은 비웁니다."""
+    body = json.dumps(jsonable(payload), ensure_ascii=False).encode('utf-8')
+    await send({
+        'type': 'http.response.start',
+        'status': status,
+        'headers': [(b'content-type', b'application/json; charset=utf-8'), (b'content-length', str(len(body)).encode()), *headers],
+    })
+    await send({'type': 'http.response.body', 'body': b'' if head else body})
+
+
+async def app(scope, receive, send):
+    if scope['type'] == 'lifespan':
+        while True:
+            message = await receive()
+            if message['type'] == 'lifespan.startup':
+                await send({'type': 'lifespan.startup.complete'})
+            elif message['type'] == 'lifespan.shutdown':
+                _pool.shutdown(wait=False)
+                get_refresher().stop()
+                await send({'type': 'lifespan.shutdown.complete'})
+                return
+    if scope['type'] != 'http':
+        return
+    head = scope['method'] == 'HEAD'
+    # /report는 HEAD에도 유료 Gemini 호출을 하게 되므로 GET만 받습니다.
+    if scope['method'] not in ('GET', 'HEAD') or (head and scope['path'] == '/report'):
+        allow = b'GET' if scope['path'] == '/report' else b'GET, HEAD'
+        await send_json(send, 405, {"error": "GET만 지원합니다."}, head, [(b'allow', allow)])
+        return
+    params = {k: v[0] for k, v in parse_qs(scope.get('query_string', b'').decode('ascii', 'ignore')).items()}
+    trace = start_trace(f"{scope['method']} {scope['path']}", query=params.get('q', ''))
+    try:
+        status, payload = await handle(scope['path'], params)
+    except Exception as e:
+        status, payload = 500, {"error": str(e)}
+    trace.root.set(status=status)
+    finish_trace(trace)
+    await send_json(send, status, payload, head)
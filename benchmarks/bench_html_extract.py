@@ -0,0 +1,68 @@
+"""저장된 HTML 픽스처로 네이버/Finviz 파서의 페이지당 파싱 시간을 잽니다.
+
+    python benchmarks/bench_html_extract.py [--repeat 50] [--naver 파일] [--finviz 파일]
+
+설치된 백엔드(selectolax, lxml, soup)마다 결과 dict가 같은지도 함께 확인합니다.
+'baseline'은 예전 방식(html.parser로 페이지 전체를 트리로 만든 뒤 찾기)의 파싱 시간입니다.
+"""
+import argparse
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bs4 import BeautifulSoup
+
+from stock_core.html_extract import available_backends, parse_finviz_fundamentals, parse_naver_fundamentals
+
+FIXTURE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures")
+
+
+def time_call(fn, repeat):
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - started) * 1000)
+    return statistics.median(samples)
+
+
+def bench_page(label, html, parser, repeat):
+    print(f"\n[{label}] {len(html.encode('utf-8')) / 1024:.0f} KB")
+    baseline = time_call(lambda: BeautifulSoup(html, 'html.parser'), repeat)
+    print(f"  {'baseline':<11} {baseline:8.2f} ms/page")
+    reference = None
+    ok = True
+    for backend in available_backends():
+        result = parser(html, backend=backend)
+        if reference is None:
+            reference = result
+        elif result != reference:
+            ok = False
+            print(f"  !! {backend} 결과가 다릅니다: {result}")
+        elapsed = time_call(lambda: parser(html, backend=backend), repeat)
+        print(f"  {backend:<11} {elapsed:8.2f} ms/page  (x{baseline / elapsed:.1f})  필드 {len(result)}개")
+    return ok
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--repeat", type=int, default=50)
+    ap.add_argument("--naver", default=os.path.join(FIXTURE_DIR, "naver_005930.html"))
+    ap.add_argument("--finviz", default=os.path.join(FIXTURE_DIR, "finviz_AAPL.html"))
+    args = ap.parse_args()
+
+    with open(args.naver, encoding="utf-8") as f:
+        naver_html = f.read()
+    with open(args.finviz, encoding="utf-8") as f:
+        finviz_html = f.read()
+
+    ok = bench_page("naver", naver_html, parse_naver_fundamentals, args.repeat)
+    ok = bench_page("finviz", finviz_html, parse_finviz_fundamentals, args.repeat) and ok
+    return 0 if ok else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
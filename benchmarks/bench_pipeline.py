@@ -0,0 +1,448 @@
+"""녹화된 응답(픽스처)을 재생해 네트워크 없이 분석 파이프라인의 단계별 시간과 최대 메모리를 잽니다.
+
+    python benchmarks/bench_pipeline.py                      # 기준값과 비교, 느려지면 종료 코드 1, 기준값이 없으면 2
+    python benchmarks/bench_pipeline.py --update-baseline    # 현재 결과를 기준값으로 저장
+    python benchmarks/bench_pipeline.py --stage rss_parsing --stage prompt_assembly --repeat 50
+
+yfinance 프레임, KRX 상장 목록, 야후 검색, 네이버/Finviz HTML, 뉴스 RSS는 benchmarks/fixtures에서 읽고
+(다시 녹화: benchmarks/record_fixtures.py), Gemini는 고정 응답을 돌려주는 가짜 클라이언트로 바꿉니다.
+단계마다 p50/p95(ms)와 tracemalloc 최대 메모리(KB)를 재며, 기준값 대비 p50이 --time-tolerance,
+최대 메모리가 --mem-tolerance보다 크게 늘면 실패합니다. 시간은 머신마다 다르므로 기준값 파일은 각자 만듭니다.
+기준값 파일이나 단계의 기준값이 없으면 비교 없이 통과시키지 않고 실패하므로, CI에서는 같은 머신에서
+--update-baseline으로 먼저 만든 기준값을 보관해 두고 비교하세요.
+"""
+import argparse
+import gc
+import gzip
+import json
+import os
+import platform
+import shutil
+import sys
+import tempfile
+import time
+import tracemalloc
+from types import SimpleNamespace
+
+import numpy as np
+import pandas as pd
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+FIXTURE_DIR = os.path.join(ROOT, "benchmarks", "fixtures")
+DEFAULT_BASELINE = os.path.join(ROOT, "benchmarks", "baseline.json")
+
+# 디스크 캐시(티커 메모, 일봉 저장소, 야간 배치 DB)가 실제 사용자 캐시와 섞이지 않도록 임시 폴더를 씁니다.
+# stock_core.config가 불러올 때 경로를 정하므로 import보다 먼저 지정해야 합니다.
+BENCH_CACHE_DIR = tempfile.mkdtemp(prefix="stock_bench_")
+os.environ["STOCK_TERMINAL_CACHE_DIR"] = BENCH_CACHE_DIR
+os.environ["STOCK_TERMINAL_LLM_CACHE"] = "memory"
+sys.path.insert(0, ROOT)
+
+import yfinance as yf
+
+from stock_core import http_transport, llm, resolver
+from stock_core.fundamentals import STATEMENT_KINDS, load_info, load_statement, scrape_finviz_fundamentals
+from stock_core.history import positive_prices, resample_ohlcv
+from stock_core.indicators import INDICATOR_CACHE_MAX_ENTRIES, IndicatorCache
+from stock_core.krx_warehouse import fetch_naver_fundamentals
+from stock_core.metrics import compute_valuation, summarize_statements
+from stock_core.news import NEWS_INDEX_DIR, get_news_index, load_news
+from stock_core.prompts import (
+    ANALYSIS_MA_WINDOWS, NEWS_TOKEN_BUDGETS, build_news_context, chart_prompt, compact_price_table,
+    financial_prompt, ma_context_text, news_briefing_prompt, report_prompt, sentiment_prompt, statement_trend_text,
+)
+from stock_core.profile import profile_from_info
+from stock_core.statements import build_statement_history
+
+TICKER = "005930.KS"
+QUERY = "삼성전자"
+# 해시 인덱스 적중, 코드, 미국 별칭, 부분 한글명(2-gram), 야후 검색까지 각 경로를 한 번씩 지나갑니다.
+RESOLUTION_QUERIES = ["삼성전자", "005930", "애플", "삼성전", "에코프로비", "Berkshire Hathaway"]
+CHART_MA_SETTINGS = [(5, "MA1(5일)", "#ffeb3b"), (20, "MA2(20일)", "#ff9800"), (60, "MA3(60일)", "#00e5ff"), (120, "MA4(120일)", "#e040fb")]
+CHART_LOOKBACK_DAYS = 365 * 10
+STUB_REPORT = ("## 종합 의견\n\n" + "실적 개선과 수급 흐름을 근거로 한 중립 이상의 의견입니다. " * 40).strip()
+
+
+# ====================== 녹화된 응답 재생 ======================
+
+def read_fixture(name):
+    with open(os.path.join(FIXTURE_DIR, name), "rb") as f:
+        return f.read()
+
+
+class ReplayResponse:
+    def __init__(self, content, status_code=200):
+        self.content = content
+        self.status_code = status_code
+
+    @property
+    def text(self):
+        return self.content.decode("utf-8")
+
+    def json(self):
+        return json.loads(self.content)
+
+    def raise_for_status(self):
+        if self.status_code >= 400:
+            raise RuntimeError(f"HTTP {self.status_code}")
+
+
+class ReplayTransport:
+    """http_transport.get_transport() 자리에 들어가 URL별로 녹화된 본문을 돌려줍니다."""
+    ROUTES = [
+        ("query2.finance.yahoo.com/v1/finance/search", "yahoo_search.json"),
+        ("news.google.com/rss/search", "rss_005930.xml"),
+        ("finance.naver.com/item/main.naver", "naver_005930.html"),
+        ("finviz.com/quote.ashx", "finviz_AAPL.html"),
+    ]
+
+    def __init__(self):
+        self.bodies = {name: read_fixture(name) for _, name in self.ROUTES}
+
+    def get(self, url, **kwargs):
+        for pattern, name in self.ROUTES:
+            if pattern in url:
+                return ReplayResponse(self.bodies[name])
+        return ReplayResponse(b"", 404)
+
+
+class ReplayData:
+    def __init__(self):
+        self.info = json.loads(read_fixture("info_005930.json"))
+        self.statements = {
+            kind: pd.read_csv(os.path.join(FIXTURE_DIR, f"{kind}_005930.csv"), index_col=0)
+            for kind in STATEMENT_KINDS
+        }
+        for df in self.statements.values():
+            df.columns = pd.to_datetime(df.columns)
+        with gzip.open(os.path.join(FIXTURE_DIR, "history_005930.csv.gz"), "rt", encoding="utf-8") as f:
+            history = pd.read_csv(f, index_col=0)
+        history.index = pd.to_datetime(history.index, utc=True).tz_convert("Asia/Seoul")
+        self.history = history
+        self.krx = pd.read_csv(os.path.join(FIXTURE_DIR, "krx_listing.csv"), dtype={"Code": str})
+
+
+class ReplayTicker:
+    """yf.Ticker와 같은 속성으로 녹화된 프레임을 돌려줍니다. (yfinance처럼 부를 때마다 새 객체)"""
+    data = None
+
+    def __init__(self, ticker):
+        self.ticker = ticker
+
+    @property
+    def info(self):
+        return dict(self.data.info)
+
+    @property
+    def financials(self):
+        return self.data.statements['financials'].copy()
+
+    @property
+    def balance_sheet(self):
+        return self.data.statements['balance_sheet'].copy()
+
+    @property
+    def cashflow(self):
+        return self.data.statements['cashflow'].copy()
+
+    @property
+    def news(self):
+        return []
+
+    def history(self, period=None, start=None, interval="1d", **kwargs):
+        history = self.data.history
+        if start is not None:
+            history = history[history.index >= pd.Timestamp(start).tz_localize(history.index.tz)]
+        elif period == "1d":
+            history = history.tail(1)
+        return history.copy()
+
+
+class ReplayModels:
+    def generate_content(self, model, contents, config=None):
+        return SimpleNamespace(text=STUB_REPORT)
+
+    def generate_content_stream(self, model, contents, config=None):
+        for i in range(0, len(STUB_REPORT), 200):
+            yield SimpleNamespace(text=STUB_REPORT[i:i + 200])
+
+
+def install_replay():
+    data = ReplayData()
+    transport = ReplayTransport()
+    ReplayTicker.data = data
+    yf.Ticker = ReplayTicker
+    http_transport.get_transport = lambda: transport
+    resolver.load_krx_data = lambda: data.krx
+    # 호출량 제한과 백오프가 시간에 끼지 않도록 사실상 무제한 버킷을 씁니다.
+    client = llm.LLMClient(
+        SimpleNamespace(models=ReplayModels()), [],
+        llm.TokenBucket(1e9, 1e9), llm.CircuitBreaker(llm.LLM_BREAKER_THRESHOLD, llm.LLM_BREAKER_COOLDOWN),
+    )
+    llm.get_llm_client = lambda: client
+    resolver.get_llm_client = lambda: client
+    return data
+
+
+# ====================== 단계 ======================
+# 단계마다 (준비, 실행)을 정의합니다. 준비는 시간에서 빠지고, 실행은 준비 결과를 받아 한 번의 작업을 합니다.
+
+def daily_prices(data):
+    return positive_prices(data.history[['Open', 'High', 'Low', 'Close', 'Volume']])
+
+
+def indicator_frames(daily):
+    # 일봉에서 주봉/월봉을 만들고 AI 차트 분석과 같은 이동평균 창으로 지표를 붙입니다. (빈 캐시에서 전체 계산)
+    cache = IndicatorCache(INDICATOR_CACHE_MAX_ENTRIES)
+    frames = {}
+    for interval, windows in ANALYSIS_MA_WINDOWS.items():
+        bars = resample_ohlcv(daily, interval)
+        frames[interval] = bars.join(cache.get(TICKER, interval, bars, windows))
+    return frames
+
+
+def setup_resolution(data):
+    return None
+
+
+def run_resolution(_):
+    # 앱을 처음 띄운 상태를 재현하려고 인덱스와 디스크 메모를 매번 새로 만듭니다.
+    resolver.get_ticker_index.reset()
+    resolver.get_resolution_memo.reset()
+    try:
+        os.remove(resolver.TICKER_MEMO_PATH)
+    except OSError:
+        pass
+    return [resolver.get_ticker_symbol(q) for q in RESOLUTION_QUERIES]
+
+
+def setup_info(data):
+    return None
+
+
+def run_info(_):
+    # 캐시를 거치지 않는 원래 함수(__wrapped__)를 불러 스크래핑/파싱 비용을 그대로 잽니다.
+    profile = load_info.__wrapped__(TICKER).merged(profile_from_info(fetch_naver_fundamentals(TICKER.split('.')[0]), 'naver'))
+    us_profile = load_info.__wrapped__("AAPL").merged(profile_from_info(scrape_finviz_fundamentals("AAPL"), 'finviz'))
+    return profile, us_profile
+
+
+def setup_statements(data):
+    return profile_from_info(data.info, 'yfinance')
+
+
+def run_statements(profile):
+    fin, bs, cf = (load_statement.__wrapped__(TICKER, kind) for kind in STATEMENT_KINDS)
+    # 결산별 캐시(statement_history)를 거치지 않고 전 기간 정렬과 지표 계산을 매번 다시 합니다.
+    history = build_statement_history(fin, bs, cf)
+    return compute_valuation(profile, history), summarize_statements(history)
+
+
+def reset_news_index():
+    get_news_index.reset()
+    shutil.rmtree(NEWS_INDEX_DIR, ignore_errors=True)
+
+
+def setup_rss(data):
+    return None
+
+
+def run_rss(_):
+    # 뉴스 인덱스가 빈 상태(처음 본 종목)에서 피드 100건을 모두 정리하는 비용입니다.
+    reset_news_index()
+    return load_news.__wrapped__(TICKER, QUERY)
+
+
+def setup_rss_refresh(data):
+    reset_news_index()
+    load_news.__wrapped__(TICKER, QUERY)
+    return None
+
+
+def run_rss_refresh(_):
+    # 이미 본 기사뿐인 피드를 다시 받았을 때(새로 고침) 비용입니다.
+    return load_news.__wrapped__(TICKER, QUERY)
+
+
+def setup_indicators(data):
+    return daily_prices(data)
+
+
+def run_indicators(daily):
+    return indicator_frames(daily)
+
+
+def setup_figure(data):
+    # plotly는 화면용 의존성이라 없으면 이 단계만 건너뜁니다.
+    from stock_core.charts import build_price_figure
+
+    daily = daily_prices(data)
+    windows = [w for w, _, _ in CHART_MA_SETTINGS]
+    history = daily.join(IndicatorCache(INDICATOR_CACHE_MAX_ENTRIES).get(TICKER, "1d", daily, windows))
+    history = history[history.index >= history.index[-1] - pd.Timedelta(days=CHART_LOOKBACK_DAYS)]
+    return build_price_figure, history
+
+
+def run_figure(args):
+    build_price_figure, history = args
+    return build_price_figure(history, CHART_MA_SETTINGS, f"{QUERY} ({TICKER}) - 일봉", ",.0f", "원")
+
+
+def setup_prompts(data):
+    news = load_news.__wrapped__(TICKER, QUERY)
+    profile = profile_from_info(data.info, 'yfinance').merged(profile_from_info(fetch_naver_fundamentals(TICKER.split('.')[0]), 'naver'))
+    history = build_statement_history(*(data.statements[kind] for kind in STATEMENT_KINDS))
+    frames = indicator_frames(daily_prices(data))
+    return news, compute_valuation(profile, history), summarize_statements(history), history, frames, profile
+
+
+def run_prompts(args):
+    news, m, s, history, frames, profile = args
+    terms = [TICKER.split('.')[0], QUERY]
+    contexts = {kind: build_news_context(news, budget, terms) for kind, budget in NEWS_TOKEN_BUDGETS.items()}
+    tables = []
+    for interval, windows in ANALYSIS_MA_WINDOWS.items():
+        cols = ['Open', 'High', 'Low', 'Close'] + [f'MA_{w}' for w in windows]
+        tables.append(compact_price_table(frames[interval][cols]))
+    today_date = "2025년 09월 30일"
+    ma_context = ma_context_text(frames["1d"], [(w, name) for w, name, _ in CHART_MA_SETTINGS], ",.0f", "원")
+    return [
+        chart_prompt(TICKER, contexts['chart'], *tables, "원"),
+        financial_prompt(TICKER, contexts['financial'], m, s, "원", statement_trend_text(history)),
+        news_briefing_prompt(TICKER, today_date, contexts['news_briefing']),
+        sentiment_prompt(TICKER, today_date, contexts['sentiment']),
+        report_prompt(TICKER, today_date, 60200.0, profile.high_52, profile.low_52,
+                      ma_context, m, s, contexts['report'], "원", ",.0f"),
+    ]
+
+
+def setup_llm(data):
+    return run_prompts(setup_prompts(data))
+
+
+def run_llm(prompts):
+    # 응답 캐시를 비운 뒤 처음(가짜 클라이언트 호출)과 두 번째(캐시 적중)를 함께 잽니다.
+    llm.get_llm_cache.reset()
+    return [llm.generate_report(p, config={"temperature": 0.1}) for p in prompts * 2]
+
+
+STAGES = {
+    "ticker_resolution": (setup_resolution, run_resolution),
+    "info_augmentation": (setup_info, run_info),
+    "statement_parsing": (setup_statements, run_statements),
+    "rss_parsing": (setup_rss, run_rss),
+    "rss_refresh": (setup_rss_refresh, run_rss_refresh),
+    "indicator_computation": (setup_indicators, run_indicators),
+    "figure_construction": (setup_figure, run_figure),
+    "prompt_assembly": (setup_prompts, run_prompts),
+    "llm_roundtrip": (setup_llm, run_llm),
+}
+
+
+# ====================== 측정과 기준값 비교 ======================
+
+def measure(run, arg, repeat, warmup):
+    for _ in range(warmup):
+        run(arg)
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        run(arg)
+        samples.append((time.perf_counter() - started) * 1000)
+    # tracemalloc은 실행을 느리게 하므로 시간 측정과 따로 한 번 더 돌려 최대 메모리만 봅니다.
+    gc.collect()
+    tracemalloc.start()
+    try:
+        run(arg)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return {
+        "p50_ms": round(float(np.percentile(samples, 50)), 3),
+        "p95_ms": round(float(np.percentile(samples, 95)), 3),
+        "peak_kb": round(peak / 1024, 1),
+    }
+
+
+def compare(name, result, base, args):
+    """기준값보다 나빠진 항목의 설명 목록을 돌려줍니다. 아주 짧은 단계의 흔들림은 --min-delta-ms 이하면 무시합니다."""
+    if base is None:
+        return [f"{name}: 기준값이 없습니다 (--update-baseline으로 추가)"]
+    problems = []
+    time_limit = base["p50_ms"] * (1 + args.time_tolerance)
+    if result["p50_ms"] > time_limit and result["p50_ms"] - base["p50_ms"] > args.min_delta_ms:
+        problems.append(f"{name}: p50 {base['p50_ms']:.2f} -> {result['p50_ms']:.2f} ms")
+    mem_limit = base["peak_kb"] * (1 + args.mem_tolerance)
+    if result["peak_kb"] > mem_limit:
+        problems.append(f"{name}: 최대 메모리 {base['peak_kb']:.0f} -> {result['peak_kb']:.0f} KB")
+    return problems
+
+
+def load_baseline(path):
+    try:
+        with open(path, encoding="utf-8") as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return None
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--repeat", type=int, default=30)
+    ap.add_argument("--warmup", type=int, default=3)
+    ap.add_argument("--stage", action="append", choices=list(STAGES), help="지정한 단계만 실행 (여러 번 지정 가능)")
+    ap.add_argument("--baseline", default=DEFAULT_BASELINE)
+    ap.add_argument("--update-baseline", action="store_true")
+    ap.add_argument("--time-tolerance", type=float, default=0.3, help="p50 허용 증가율 (기본 30%%)")
+    ap.add_argument("--mem-tolerance", type=float, default=0.2, help="최대 메모리 허용 증가율 (기본 20%%)")
+    ap.add_argument("--min-delta-ms", type=float, default=0.5)
+    args = ap.parse_args()
+
+    data = install_replay()
+    baseline = load_baseline(args.baseline)
+    base_stages = (baseline or {}).get("stages", {})
+    results = {}
+    problems = []
+    print(f"{'stage':<24}{'p50(ms)':>10}{'p95(ms)':>10}{'peak(KB)':>11}{'기준 p50':>11}")
+    try:
+        for name in args.stage or STAGES:
+            setup, run = STAGES[name]
+            try:
+                arg = setup(data)
+            except ImportError as e:
+                print(f"{name:<24}  건너뜀: {e}")
+                continue
+            result = measure(run, arg, args.repeat, args.warmup)
+            results[name] = result
+            base = base_stages.get(name)
+            base_str = f"{base['p50_ms']:.2f}" if base else "-"
+            print(f"{name:<24}{result['p50_ms']:>10.2f}{result['p95_ms']:>10.2f}{result['peak_kb']:>11.0f}{base_str:>11}")
+            if baseline is not None:
+                problems += compare(name, result, base, args)
+    finally:
+        shutil.rmtree(BENCH_CACHE_DIR, ignore_errors=True)
+
+    if args.update_baseline:
+        # --stage로 일부만 돌렸으면 나머지 단계의 기준값은 그대로 둡니다.
+        stages = dict(base_stages)
+        stages.update(results)
+        with open(args.baseline, "w", encoding="utf-8") as f:
+            json.dump({"python": platform.python_version(), "machine": platform.machine(),
+                       "repeat": args.repeat, "stages": stages}, f, ensure_ascii=False, indent=2)
+        print(f"\n기준값을 저장했습니다: {args.baseline}")
+        return 0
+    if baseline is None:
+        # 기준값 없이 통과시키면 회귀 검사가 늘 성공하므로 실패로 끝냅니다.
+        print(f"\n기준값 파일이 없습니다. --update-baseline으로 먼저 만들어 두세요. ({args.baseline})")
+        return 2
+    if problems:
+        print("\n기준값보다 느려지거나 메모리가 늘었거나 기준값이 없는 단계가 있습니다:")
+        for p in problems:
+            print(f"  {p}")
+        return 1
+    print("\n모든 단계가 기준값 안에 있습니다.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
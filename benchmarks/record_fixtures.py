@@ -0,0 +1,70 @@
+"""bench_pipeline.py가 재생할 응답을 실제 소스에서 다시 받아 benchmarks/fixtures에 저장합니다.
+
+    python benchmarks/record_fixtures.py [--code 005930] [--query 삼성전자] [--us AAPL]
+
+파일 이름은 고정이라(005930/AAPL) 다른 종목을 녹화해도 벤치마크 코드는 그대로 씁니다.
+녹화한 뒤에는 기준값이 달라지므로 bench_pipeline.py --update-baseline으로 다시 만들어야 합니다.
+"""
+import argparse
+import gzip
+import json
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import yfinance as yf
+
+from stock_core.fundamentals import STATEMENT_KINDS
+from stock_core.http_transport import http_get
+from stock_core.krx_warehouse import NAVER_MAIN_URL
+
+FIXTURE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures")
+BROWSER_UA = 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36'
+
+
+def save(name, content):
+    path = os.path.join(FIXTURE_DIR, name)
+    with open(path, "wb") as f:
+        f.write(content)
+    print(f"{name:<28} {len(content) / 1024:8.0f} KB")
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--code", default="005930")
+    ap.add_argument("--query", default="삼성전자")
+    ap.add_argument("--us", default="AAPL")
+    ap.add_argument("--search", default="Berkshire Hathaway")
+    args = ap.parse_args()
+    os.makedirs(FIXTURE_DIR, exist_ok=True)
+
+    import FinanceDataReader as fdr
+
+    listing = fdr.StockListing('KRX')[['Code', 'Name', 'Market']]
+    save("krx_listing.csv", listing.to_csv(index=False).encode("utf-8"))
+
+    res = http_get(f"https://query2.finance.yahoo.com/v1/finance/search?q={args.search}",
+                   headers={'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64)'}, timeout=10)
+    save("yahoo_search.json", res.content)
+
+    stock = yf.Ticker(f"{args.code}.KS")
+    save("info_005930.json", json.dumps(stock.info, ensure_ascii=False, indent=1, default=str).encode("utf-8"))
+    for kind in STATEMENT_KINDS:
+        save(f"{kind}_005930.csv", getattr(stock, kind).to_csv().encode("utf-8"))
+    save("history_005930.csv.gz", gzip.compress(stock.history(period="max", interval="1d").to_csv().encode("utf-8")))
+
+    res = http_get(f"https://news.google.com/rss/search?q={args.query}+주식&hl=ko-KR&gl=KR&ceid=KR:ko",
+                   headers={'User-Agent': 'Mozilla/5.0'}, timeout=10)
+    save("rss_005930.xml", res.content)
+
+    res = http_get(NAVER_MAIN_URL.format(code=args.code), headers={'User-Agent': 'Mozilla/5.0'}, timeout=10)
+    save("naver_005930.html", res.text.encode("utf-8"))
+    res = http_get(f"https://finviz.com/quote.ashx?t={args.us}",
+                   headers={'User-Agent': BROWSER_UA, 'Referer': 'https://finviz.com/'}, timeout=10)
+    save("finviz_AAPL.html", res.content)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
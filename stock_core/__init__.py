@@ -0,0 +1,28 @@
+"""AI 주식 분석 터미널의 데이터/분석 코어.
+
+Streamlit 화면(app.py), 야간 배치(krx_warehouse), 벤치마크가 같은 함수를 그대로 씁니다.
+이 패키지는 Streamlit에 의존하지 않으며, Gemini 클라이언트와 KRX 상장 목록은 처음 필요할 때 만듭니다.
+무거운 의존성(yfinance 등)을 필요한 모듈에서만 불러오도록 여기서는 하위 모듈을 다시 내보내지 않습니다.
+
+    resolver      종목명 -> 티커
+    snapshot      기본 정보/보충 지표/재무제표/뉴스/52주 범위 동시 수집 (Snapshot)
+    profile       화면이 쓰는 기본 지표만 담은 종목 프로필과 출처 (FundamentalProfile)
+    metrics       ROIC, 이자보상배율, 재무제표 요약 (ValuationMetrics, StatementSummary)
+    statements    재무제표 전 기간 정렬과 다기간 지표 (StatementHistory)
+    history       현재가, 일봉 저장소, 주봉/월봉
+    indicators    이동평균/볼린저밴드/EMA/MACD/RSI
+    news          뉴스 RSS 증분 수집, 종목별 뉴스 인덱스, 기사 본문
+    prompts       AI 버튼별 프롬프트와 토큰 예산
+    llm           Gemini 호출(재시도/차단기)과 응답 캐시
+    watchlist     관심종목 스크리너
+    charts        차트 탭의 plotly 그림
+    refresher     자주 찾는 종목의 캐시를 만료 전에 미리 갱신하는 백그라운드 작업
+    shared_cache  여러 프로세스가 함께 쓰는 캐시 저장소 (SQLite/Redis 프로토콜)
+    tracing       단계별 소요 시간(span) 기록과 내보내기
+
+    from stock_core.resolver import get_ticker_symbol
+    from stock_core.snapshot import fetch_snapshot
+
+    snap = fetch_snapshot(get_ticker_symbol("삼성전자"), "삼성전자")
+    snap.valuation().roic
+"""
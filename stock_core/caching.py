@@ -0,0 +1,195 @@
+"""Streamlit 런타임 없이 쓰는 프로세스 내 캐시 도구.
+
+ttl_cache는 st.cache_data, shared_resource는 st.cache_resource 자리를 대신합니다.
+모듈 전역에 보관되므로 Streamlit 재실행, 배치 작업, 벤치마크가 같은 프로세스 안에서 결과를 함께 씁니다.
+shared=True인 캐시는 공유 캐시 저장소(shared_cache, STOCK_TERMINAL_SHARED_CACHE)가 있으면 다른 프로세스와도 값을 나눕니다.
+"""
+import functools
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+from . import tracing
+from .config import SHARED_CACHE_MAX_BYTES, SHARED_CACHE_URL
+from .shared_cache import decode_value, encode_value, open_backend, shared_key
+
+DEFAULT_MAX_ENTRIES = 512
+REVALIDATE_POOL_SIZE = 4
+
+
+def is_empty_result(value):
+    # None, 빈 DataFrame/StatementHistory/FundamentalProfile(.empty), 빈 dict/list/tuple
+    if value is None or getattr(value, 'empty', False) is True:
+        return True
+    return isinstance(value, (dict, list, tuple)) and not value
+
+
+def ttl_cache(ttl=None, max_entries=DEFAULT_MAX_ENTRIES, stale_ttl=0, shared=False, version=1):
+    """인자별로 반환값을 ttl초 동안 기억하는 데코레이터입니다. (ttl=None이면 만료 없음, 넘치면 오래 안 쓴 것부터 지움)
+
+    st.cache_data와 달리 복사본이 아니라 같은 객체를 돌려주므로, 받은 쪽에서 결과를 고치지 말고 복사해서 써야 합니다.
+    예외는 기억하지 않습니다.
+    만료 뒤 stale_ttl초까지는 기다리지 않고 예전 값을 돌려주면서 백그라운드에서 새 값을 받아 둡니다(stale-while-revalidate).
+    fn.refresh(*args)는 캐시를 거치지 않고 다시 계산해 저장하고, fn.age(*args)는 저장된 값의 나이(초, 없으면 None)입니다.
+    백그라운드 재검증과 refresh는 실패하거나 빈 결과(is_empty_result)를 받으면 이미 있는 값을 덮어쓰지 않습니다.
+    shared=True면 프로세스 안에 없을 때 공유 캐시를 먼저 보고, 새로 계산한 값은 공유 캐시에도 씁니다.
+    공유 키는 모듈/함수 이름과 version으로 만들므로, 반환 형식을 바꾸면 version을 올리세요.
+    """
+    def decorator(fn):
+        lock = threading.Lock()
+        entries = OrderedDict()
+        revalidating = set()
+        namespace = f"{fn.__module__}.{fn.__qualname__}"
+        shared_ttl = ttl + stale_ttl if ttl is not None else None
+
+        def store(key, value, stored_at=None, publish=True):
+            with lock:
+                entries[key] = (stored_at if stored_at is not None else time.monotonic(), value)
+                entries.move_to_end(key)
+                while len(entries) > max_entries:
+                    entries.popitem(last=False)
+            if shared and publish:
+                publish_shared(key, value)
+
+        def publish_shared(key, value):
+            backend = get_shared_cache()
+            if backend is None:
+                return
+            try:
+                backend.set(shared_key(namespace, version, key), encode_value(value), shared_ttl)
+            except:
+                tracing.record_error()
+
+        def load_shared(key):
+            # 공유 캐시에 있으면 저장된 시각 그대로(나이 유지) 프로세스 캐시에 넣고 True를 돌려줍니다.
+            backend = get_shared_cache()
+            if backend is None:
+                return False
+            try:
+                raw = backend.get(shared_key(namespace, version, key))
+                if raw is None:
+                    tracing.count('shared_miss')
+                    return False
+                created_at, value = decode_value(raw)
+            except:
+                tracing.record_error()
+                return False
+            tracing.count('shared_hit')
+            store(key, value, time.monotonic() - max(0.0, time.time() - created_at), publish=False)
+            return True
+
+        def replace(key, value):
+            # 일시적 장애로 빈 결과가 오면 예전 값을 지키고 False를 돌려줍니다.
+            if is_empty_result(value):
+                with lock:
+                    if key in entries:
+                        return False
+            store(key, value)
+            return True
+
+        def lookup(key):
+            # (상태, 값, 재검증 시작 여부). 상태는 'fresh', 'stale' 또는 None(없거나 완전히 만료)
+            with lock:
+                entry = entries.get(key)
+                if entry is None:
+                    return None, None, False
+                age = time.monotonic() - entry[0]
+                if ttl is None or age <= ttl:
+                    state = 'fresh'
+                elif age <= ttl + stale_ttl:
+                    state = 'stale'
+                else:
+                    return None, None, False
+                entries.move_to_end(key)
+                start_revalidate = state == 'stale' and key not in revalidating
+                if start_revalidate:
+                    revalidating.add(key)
+            return state, entry[1], start_revalidate
+
+        def revalidate(key, args, kwargs):
+            try:
+                replace(key, fn(*args, **kwargs))
+            except:
+                pass
+            finally:
+                with lock:
+                    revalidating.discard(key)
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            key = (args, tuple(sorted(kwargs.items())))
+            state, value, start_revalidate = lookup(key)
+            if state is None and shared and load_shared(key):
+                state, value, start_revalidate = lookup(key)
+            if state == 'fresh':
+                tracing.count('cache_hit')
+                return value
+            if state == 'stale':
+                tracing.count('cache_stale')
+                if start_revalidate:
+                    get_revalidate_pool().submit(revalidate, key, args, kwargs)
+                return value
+            tracing.count('cache_miss')
+            value = fn(*args, **kwargs)
+            store(key, value)
+            return value
+
+        def refresh(*args, **kwargs):
+            value = fn(*args, **kwargs)
+            replace((args, tuple(sorted(kwargs.items()))), value)
+            return value
+
+        def age(*args, **kwargs):
+            with lock:
+                entry = entries.get((args, tuple(sorted(kwargs.items()))))
+            return time.monotonic() - entry[0] if entry is not None else None
+
+        def cache_clear():
+            with lock:
+                entries.clear()
+
+        wrapper.ttl = ttl
+        wrapper.refresh = refresh
+        wrapper.age = age
+        wrapper.cache_clear = cache_clear
+        return wrapper
+    return decorator
+
+
+def shared_resource(fn):
+    """인자 없는 생성 함수를 처음 부를 때 한 번만 실행하고, 이후에는 같은 객체(풀, 클라이언트 등)를 돌려줍니다."""
+    lock = threading.Lock()
+    holder = []
+
+    @functools.wraps(fn)
+    def wrapper():
+        with lock:
+            if not holder:
+                holder.append(fn())
+            return holder[0]
+
+    def reset():
+        with lock:
+            holder.clear()
+
+    wrapper.reset = reset
+    return wrapper
+
+
+@shared_resource
+def get_shared_cache():
+    """공유 캐시 저장소. STOCK_TERMINAL_SHARED_CACHE를 지정하지 않았거나 열 수 없으면 None입니다."""
+    if not SHARED_CACHE_URL:
+        return None
+    try:
+        return open_backend(SHARED_CACHE_URL, SHARED_CACHE_MAX_BYTES)
+    except:
+        tracing.record_error()
+        return None
+
+
+@shared_resource
+def get_revalidate_pool():
+    # 만료된 값을 백그라운드에서 다시 받는 작업 전용 풀입니다. 화면 요청용 수집 풀을 차지하지 않습니다.
+    return ThreadPoolExecutor(max_workers=REVALIDATE_POOL_SIZE, thread_name_prefix="revalidate")
@@ -0,0 +1,84 @@
+"""차트 탭의 캔들/이동평균 plotly 그림.
+
+수십 년치 일봉을 그대로 그리면 슬라이더를 움직일 때마다 수만 개의 점이 브라우저로 전송됩니다.
+표시 구간이 CHART_TARGET_BARS를 넘으면 연속된 봉을 묶어(시가=첫 봉, 고가=최고, 저가=최저, 종가=마지막 봉) 줄입니다.
+"""
+import plotly.graph_objects as go
+
+from .history import decimate_ohlc
+
+CHART_LOD_ENABLED = True
+CHART_TARGET_BARS = 1200
+# plotly 6 이상은 NumPy 배열을 base64 typed array로 직렬화하므로 값 열을 배열로 넘겨 전송량을 줄입니다.
+CHART_TYPED_ARRAYS = True
+
+
+def chart_values(series):
+    return series.to_numpy(dtype=float) if CHART_TYPED_ARRAYS else series
+
+
+def build_price_figure(history, ma_settings, title, price_fmt, currency):
+    """(그림, 캔들 하나에 묶인 봉 수)를 돌려줍니다. history는 MA_{w} 열이 붙은 표시 구간이고 비어 있으면 안 됩니다.
+
+    ma_settings: [(창, 범례 이름, 색)]. 최고/최저 표시와 y축 범위는 묶기 전 원래 봉 기준입니다.
+    """
+    price_min = history['Low'].min()
+    price_max = history['High'].max()
+    min_idx = history['Low'].idxmin()
+    max_idx = history['High'].idxmax()
+
+    padding = (price_max - price_min) * 0.1 if price_max != price_min else price_max * 0.1
+    min_y = price_min - padding
+    max_y = price_max + padding
+
+    plot_history, bars_per_candle = decimate_ohlc(history, CHART_TARGET_BARS if CHART_LOD_ENABLED else 0)
+
+    fig = go.Figure()
+
+    fig.add_trace(go.Candlestick(
+        x=plot_history.index, open=chart_values(plot_history['Open']), high=chart_values(plot_history['High']),
+        low=chart_values(plot_history['Low']), close=chart_values(plot_history['Close']),
+        increasing_line_color='#00ff9d', decreasing_line_color='#ff2d55',
+        name="가격"
+    ))
+
+    for w, name, color in ma_settings:
+        fig.add_trace(go.Scatter(
+            x=plot_history.index,
+            y=chart_values(plot_history[f'MA_{w}']),
+            name=name,
+            line=dict(color=color, width=1.0),
+            hovertemplate=f'%{{y:{price_fmt}}}'
+        ))
+
+    fig.add_annotation(
+        x=max_idx, y=price_max,
+        text=f"최고: {price_max:{price_fmt}} {currency}",
+        showarrow=True, arrowhead=2, arrowsize=1, arrowwidth=2, arrowcolor="#ff2d55",
+        ax=0, ay=-35,
+        font=dict(color="white", size=13, family="Pretendard"),
+        bgcolor="#ff2d55", bordercolor="#ff2d55", borderwidth=1, borderpad=4, opacity=0.9
+    )
+    fig.add_annotation(
+        x=min_idx, y=price_min,
+        text=f"최저: {price_min:{price_fmt}} {currency}",
+        showarrow=True, arrowhead=2, arrowsize=1, arrowwidth=2, arrowcolor="#00b0ff",
+        ax=0, ay=35,
+        font=dict(color="white", size=13, family="Pretendard"),
+        bgcolor="#00b0ff", bordercolor="#00b0ff", borderwidth=1, borderpad=4, opacity=0.9
+    )
+
+    fig.update_layout(
+        title=dict(text=title, font=dict(size=22, color="white")),
+        template="plotly_dark",
+        dragmode=False,
+        xaxis=dict(rangeslider=dict(visible=False), type="date", hoverformat="%Y-%m-%d", fixedrange=True),
+        yaxis=dict(range=[min_y, max_y], gridcolor="#333", autorange=False, fixedrange=True, tickformat=price_fmt, hoverformat=price_fmt),
+        height=520,
+        margin=dict(l=0, r=0, t=40, b=0),
+        legend=dict(yanchor="top", y=0.99, xanchor="left", x=0.01, bgcolor="rgba(0,0,0,0.6)", font=dict(color="white")),
+        hovermode="x unified",
+        clickmode="none",
+        hoverlabel=dict(font_family="Pretendard")
+    )
+    return fig, bars_per_candle
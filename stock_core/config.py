@@ -0,0 +1,23 @@
+"""stock_core 전체가 함께 쓰는 저장 위치와 데이터 종류별 캐시 유효 시간(초)."""
+import os
+
+# 디스크 캐시(기사 본문, 티커 검색 결과, 일봉 등)를 저장할 위치
+CACHE_DIR = os.environ.get("STOCK_TERMINAL_CACHE_DIR", ".cache")
+
+QUOTE_TTL = 30                 # 현재가: 초 단위
+HISTORY_TTL = 60 * 10          # 차트용 가격 이력
+NEWS_TTL = 60 * 10             # 뉴스 RSS
+FUNDAMENTAL_TTL = 60 * 60 * 6  # 밸류에이션/펀더멘털: 시간 단위
+STATEMENT_TTL = 60 * 60 * 24   # 재무제표: 하루 단위
+
+# 유효 시간이 지난 뒤에도 이 시간까지는 예전 값을 바로 보여주고 백그라운드에서 새로 받습니다.
+QUOTE_STALE_TTL = 60 * 5
+HISTORY_STALE_TTL = 60 * 60
+NEWS_STALE_TTL = 60 * 60
+FUNDAMENTAL_STALE_TTL = 60 * 60 * 24
+STATEMENT_STALE_TTL = 60 * 60 * 24 * 7
+
+# 여러 프로세스(레플리카)가 함께 쓰는 캐시 주소 (예: sqlite:///.cache/shared.sqlite3, redis://cache:6379/0).
+# 비우면 프로세스 안에서만 캐시합니다. 크기 제한(MB)은 SQLite 저장소에 적용됩니다.
+SHARED_CACHE_URL = os.environ.get("STOCK_TERMINAL_SHARED_CACHE", "")
+SHARED_CACHE_MAX_BYTES = int(os.environ.get("STOCK_TERMINAL_SHARED_CACHE_MB", "512")) * 1024 * 1024
@@ -0,0 +1,77 @@
+"""yfinance 기본 정보/재무제표와, 비어 있는 지표를 채우는 네이버(한국)/Finviz(미국) 보충 지표.
+
+기본 정보와 보충 지표는 받은 즉시 FundamentalProfile로 줄여 캐시에 둡니다.
+캐시하는 로더는 받기에 실패하면 빈 값을 돌려주지 않고 예외를 그대로 올립니다. 빈 값을 캐시하면 한 번의
+일시적 오류(예: yfinance 429)가 몇 시간 동안 모든 레플리카의 지표를 지우기 때문입니다.
+빈 값으로 대신하는 일은 부르는 쪽(snapshot.collect_results의 SOURCE_DEFAULTS)이 맡습니다.
+"""
+import pandas as pd
+import yfinance as yf
+
+from . import krx_warehouse
+from .caching import ttl_cache
+from .config import FUNDAMENTAL_STALE_TTL, FUNDAMENTAL_TTL, STATEMENT_STALE_TTL, STATEMENT_TTL
+from .html_extract import parse_finviz_fundamentals
+from .http_transport import http_get
+from .profile import profile_from_info
+
+STATEMENT_KINDS = ('financials', 'balance_sheet', 'cashflow')
+
+
+def scrape_naver_fundamentals(ticker):
+    if not (ticker.endswith('.KS') or ticker.endswith('.KQ')):
+        return {}
+    code = ticker.split('.')[0]
+    # 야간 배치(krx_warehouse)가 모아 둔 값이 있으면 스크래핑하지 않습니다.
+    stored = krx_warehouse.read_fundamentals(code)
+    if stored is not None:
+        return stored
+    data = krx_warehouse.fetch_naver_fundamentals(code)
+    if not krx_warehouse.has_fields(data):
+        return data
+    try:
+        conn = krx_warehouse.connect()
+        try:
+            krx_warehouse.save_fundamentals(conn, code, data, ticker)
+        finally:
+            conn.close()
+    except:
+        pass
+    return data
+
+
+def scrape_finviz_fundamentals(ticker):
+    if ticker.endswith('.KS') or ticker.endswith('.KQ'):
+        return {}
+    url = f"https://finviz.com/quote.ashx?t={ticker}"
+    headers = {
+        'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
+        'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/avif,image/webp,*/*;q=0.8',
+        'Accept-Language': 'en-US,en;q=0.5',
+        'Referer': 'https://finviz.com/'
+    }
+    res = http_get(url, headers=headers, timeout=5, conditional=True)
+    # 429/차단 응답을 빈 지표로 파싱해 캐시하지 않도록 오류 상태는 예외로 올립니다.
+    res.raise_for_status()
+    return parse_finviz_fundamentals(res.text)
+
+
+@ttl_cache(ttl=FUNDAMENTAL_TTL, stale_ttl=FUNDAMENTAL_STALE_TTL, shared=True)
+def load_info(ticker):
+    # info 전체(수백 개 키)는 버리고 쓰는 항목만 남깁니다.
+    return profile_from_info(yf.Ticker(ticker).info, 'yfinance')
+
+
+@ttl_cache(ttl=FUNDAMENTAL_TTL, stale_ttl=FUNDAMENTAL_STALE_TTL, shared=True)
+def load_scraped_fundamentals(ticker):
+    # 한국 종목은 네이버, 미국 종목은 Finviz에서 보충 지표를 가져옵니다.
+    if ticker.endswith('.KS') or ticker.endswith('.KQ'):
+        return profile_from_info(scrape_naver_fundamentals(ticker), 'naver')
+    return profile_from_info(scrape_finviz_fundamentals(ticker), 'finviz')
+
+
+@ttl_cache(ttl=STATEMENT_TTL, stale_ttl=STATEMENT_STALE_TTL, shared=True)
+def load_statement(ticker, kind):
+    # kind: 'financials', 'balance_sheet', 'cashflow' (분기는 앞에 'quarterly_')
+    df = getattr(yf.Ticker(ticker), kind)
+    return df if df is not None else pd.DataFrame()
@@ -0,0 +1,136 @@
+"""현재가와 일봉/주봉/월봉 가격 이력.
+
+종목마다 일봉 전체 이력을 한 번만 내려받아 Parquet 파일로 보관하고, 이후에는 마지막 저장일 이후의
+봉만 이어 붙입니다. 주봉/월봉은 이 일봉을 리샘플링해 만들어 차트와 AI 분석이 함께 씁니다.
+"""
+import math
+import os
+import re
+import threading
+
+import numpy as np
+import pandas as pd
+import yfinance as yf
+
+from . import tracing
+from .caching import ttl_cache
+from .config import CACHE_DIR, HISTORY_STALE_TTL, HISTORY_TTL, QUOTE_STALE_TTL, QUOTE_TTL
+
+HISTORY_DIR = os.path.join(CACHE_DIR, "history")
+OHLCV_COLUMNS = ['Open', 'High', 'Low', 'Close', 'Volume']
+RESAMPLE_RULES = {"1wk": "W-MON", "1mo": "MS"}
+# 이어 붙일 때 겹치는 봉의 종가가 이 비율 이상 달라지면 수정주가가 바뀐 것으로 보고 전체를 다시 받습니다.
+HISTORY_REVISION_TOLERANCE = 0.005
+
+
+def history_store_path(ticker):
+    return os.path.join(HISTORY_DIR, re.sub(r"[^A-Za-z0-9._-]", "_", ticker) + ".parquet")
+
+
+def read_history_store(ticker):
+    try:
+        return pd.read_parquet(history_store_path(ticker))
+    except:
+        return None
+
+
+def write_history_store(ticker, df):
+    path = history_store_path(ticker)
+    try:
+        os.makedirs(HISTORY_DIR, exist_ok=True)
+        tmp_path = f"{path}.{threading.get_ident()}.tmp"
+        df.to_parquet(tmp_path)
+        os.replace(tmp_path, path)
+    except:
+        pass
+
+
+def update_daily_history(ticker):
+    """저장된 일봉에 새 봉만 이어 붙여 돌려줍니다. 분할/배당으로 과거 가격이 바뀌었으면 전체를 다시 받습니다."""
+    stock = yf.Ticker(ticker)
+    cached = read_history_store(ticker)
+    if cached is not None and not cached.empty:
+        try:
+            # 마지막 봉은 장중에 저장됐을 수 있으므로 그 봉부터 다시 받아 덮어씁니다.
+            fresh = stock.history(start=cached.index[-1].strftime('%Y-%m-%d'), interval="1d")
+            if fresh.empty:
+                return cached
+            events = fresh.reindex(columns=['Dividends', 'Stock Splits']).fillna(0)
+            overlap = cached.index.intersection(fresh.index)
+            revised = bool((events != 0).to_numpy().any())
+            if len(overlap) and not revised:
+                old_close = cached.loc[overlap[0], 'Close']
+                revised = old_close > 0 and abs(fresh.loc[overlap[0], 'Close'] / old_close - 1) > HISTORY_REVISION_TOLERANCE
+            if not revised:
+                merged = pd.concat([cached[~cached.index.isin(fresh.index)], fresh[OHLCV_COLUMNS]]).sort_index()
+                write_history_store(ticker, merged)
+                return merged
+        except:
+            tracing.record_error()
+            return cached
+    full = stock.history(period="max", interval="1d")
+    if full.empty:
+        return full
+    full = full[OHLCV_COLUMNS]
+    write_history_store(ticker, full)
+    return full
+
+
+def resample_ohlcv(daily, interval):
+    rule = RESAMPLE_RULES.get(interval)
+    if rule is None or daily.empty:
+        return daily
+    bars = daily.resample(rule, label='left', closed='left').agg(
+        {'Open': 'first', 'High': 'max', 'Low': 'min', 'Close': 'last', 'Volume': 'sum'}
+    )
+    return bars.dropna(subset=['Close'])
+
+
+def decimate_ohlc(df, target_bars):
+    """(묶은 DataFrame, 캔들 하나에 묶인 봉 수)를 돌려줍니다. 지표 열은 각 묶음의 마지막 값을 씁니다.
+
+    연속된 봉을 묶을 때 시가는 첫 봉, 고가는 최고, 저가는 최저, 종가는 마지막 봉 값입니다.
+    target_bars가 0 이하이거나 봉 수가 이미 그 이하이면 그대로 돌려줍니다.
+    """
+    n = len(df)
+    if target_bars <= 0 or n <= target_bars:
+        return df, 1
+    step = math.ceil(n / target_bars)
+    starts = np.arange(0, n, step)
+    ends = np.append(starts[1:], n) - 1
+    out = {}
+    for col in df.columns:
+        values = df[col].to_numpy()
+        if col == 'Open':
+            out[col] = values[starts]
+        elif col == 'High':
+            out[col] = np.maximum.reduceat(values, starts)
+        elif col == 'Low':
+            out[col] = np.minimum.reduceat(values, starts)
+        elif col == 'Volume':
+            out[col] = np.add.reduceat(values, starts)
+        else:
+            out[col] = values[ends]
+    return pd.DataFrame(out, index=df.index[starts]), step
+
+
+@ttl_cache(ttl=QUOTE_TTL, stale_ttl=QUOTE_STALE_TTL, shared=True)
+def load_quote(ticker):
+    # 실패는 캐시하지 않도록 예외를 그대로 올립니다.
+    return yf.Ticker(ticker).history(period="1d")
+
+
+@ttl_cache(ttl=HISTORY_TTL, stale_ttl=HISTORY_STALE_TTL, shared=True)
+def load_daily_history(ticker):
+    return update_daily_history(ticker)
+
+
+@ttl_cache(ttl=HISTORY_TTL)
+def load_price_history(ticker, interval):
+    # 주봉/월봉은 따로 내려받지 않고 일봉에서 만들어 씁니다.
+    return resample_ohlcv(load_daily_history(ticker), interval)
+
+
+def positive_prices(history):
+    # 거래 정지 등으로 0이 찍힌 봉은 차트/분석에서 뺍니다.
+    return history[(history['Low'] > 0) & (history['High'] > 0) & (history['Close'] > 0)]
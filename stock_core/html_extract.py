@@ -0,0 +1,208 @@
+"""네이버 금융 / Finviz 페이지에서 필요한 지표만 빠르게 뽑아내는 파서.
+
+페이지 전체를 BeautifulSoup(html.parser)로 읽는 대신 설치되어 있으면 selectolax, 그다음 lxml을 쓰고,
+둘 다 없으면 SoupStrainer로 필요한 태그만 골라 부분 파싱합니다. 어느 백엔드든 결과 dict는 같습니다.
+"""
+from bs4 import BeautifulSoup, SoupStrainer
+
+try:
+    from selectolax.lexbor import LexborHTMLParser as HTMLParser
+except ImportError:
+    try:
+        # selectolax 1.0 이전 버전
+        from selectolax.parser import HTMLParser
+    except ImportError:
+        HTMLParser = None
+
+try:
+    import lxml.html as lxml_html
+except ImportError:
+    lxml_html = None
+
+NAVER_IDS = ('_per', '_pbr', '_dvr')
+NAVER_TABLE_CLASS = 'tb_type1_ifrs'
+FINVIZ_TABLE_CLASS = 'snapshot-table2'
+
+
+def available_backends():
+    backends = []
+    if HTMLParser is not None:
+        backends.append('selectolax')
+    if lxml_html is not None:
+        backends.append('lxml')
+    backends.append('soup')
+    return backends
+
+
+def default_backend():
+    return available_backends()[0]
+
+
+def _class_xpath(tag, cls):
+    return f'//{tag}[contains(concat(" ", normalize-space(@class), " "), " {cls} ")]'
+
+
+# ---------- 백엔드별 원시 추출: (id별 텍스트, [(행 제목, [셀 텍스트...])]) ----------
+
+def _naver_raw_selectolax(html):
+    tree = HTMLParser(html)
+    ids = {}
+    for eid in NAVER_IDS:
+        node = tree.css_first(f'#{eid}')
+        if node is not None:
+            ids[eid] = node.text()
+    rows = []
+    table = tree.css_first(f'table.{NAVER_TABLE_CLASS}')
+    if table is not None:
+        for row in table.css('tbody > tr'):
+            th = row.css_first('th')
+            if th is None:
+                continue
+            rows.append((th.text().strip(), [td.text() for td in row.css('td')]))
+    return ids, rows
+
+
+def _naver_raw_lxml(html):
+    doc = lxml_html.fromstring(html)
+    ids = {}
+    for eid in NAVER_IDS:
+        found = doc.xpath('//*[@id=$eid]', eid=eid)
+        if found:
+            ids[eid] = found[0].text_content()
+    rows = []
+    tables = doc.xpath(_class_xpath('table', NAVER_TABLE_CLASS))
+    if tables:
+        for row in tables[0].xpath('./tbody/tr'):
+            th = row.find('th')
+            if th is None:
+                continue
+            rows.append((th.text_content().strip(), [td.text_content() for td in row.findall('td')]))
+    return ids, rows
+
+
+def _naver_raw_soup(html):
+    # PER/PBR/배당수익률은 <em id="...">, 재무 요약은 <table> 안에 있으므로 이 두 태그만 트리로 만듭니다.
+    soup = BeautifulSoup(html, 'html.parser', parse_only=SoupStrainer(['em', 'table']))
+    ids = {}
+    for eid in NAVER_IDS:
+        el = soup.find(id=eid)
+        if el:
+            ids[eid] = el.text
+    rows = []
+    table = soup.find('table', class_=NAVER_TABLE_CLASS)
+    if table:
+        tbody = table.find('tbody')
+        if tbody:
+            for row in tbody.find_all('tr'):
+                th = row.find('th')
+                if not th:
+                    continue
+                rows.append((th.text.strip(), [td.text for td in row.find_all('td')]))
+    return ids, rows
+
+
+def _finviz_raw_selectolax(html):
+    tree = HTMLParser(html)
+    table = tree.css_first(f'table.{FINVIZ_TABLE_CLASS}')
+    if table is None:
+        return None
+    return [[td.text() for td in row.css('td')] for row in table.css('tr')]
+
+
+def _finviz_raw_lxml(html):
+    doc = lxml_html.fromstring(html)
+    tables = doc.xpath(_class_xpath('table', FINVIZ_TABLE_CLASS))
+    if not tables:
+        return None
+    return [[td.text_content() for td in row.findall('td')] for row in tables[0].iter('tr')]
+
+
+def _finviz_raw_soup(html):
+    # 여러 클래스가 붙은 표는 파싱 단계의 클래스 필터에 걸리지 않는 경우가 있어 <table>만 골라 트리로 만듭니다.
+    soup = BeautifulSoup(html, 'html.parser', parse_only=SoupStrainer('table'))
+    table = soup.find('table', class_=FINVIZ_TABLE_CLASS)
+    if not table:
+        return None
+    return [[td.text for td in row.find_all('td')] for row in table.find_all('tr')]
+
+
+_NAVER_RAW = {'selectolax': _naver_raw_selectolax, 'lxml': _naver_raw_lxml, 'soup': _naver_raw_soup}
+_FINVIZ_RAW = {'selectolax': _finviz_raw_selectolax, 'lxml': _finviz_raw_lxml, 'soup': _finviz_raw_soup}
+
+
+# ---------- 공통 변환: yfinance info 키 기준 dict ----------
+
+def parse_naver_fundamentals(html, backend=None):
+    ids, rows = _NAVER_RAW[backend or default_backend()](html)
+    data = {}
+
+    def to_float(txt):
+        try:
+            return float(txt.replace(',', '').replace('%', '').strip())
+        except (AttributeError, ValueError):
+            return None
+
+    per = to_float(ids.get('_per'))
+    pbr = to_float(ids.get('_pbr'))
+    div = to_float(ids.get('_dvr'))
+    if per: data['trailingPE'] = per
+    if pbr: data['priceToBook'] = pbr
+    if div: data['dividendYield'] = div / 100.0
+
+    for title, cells in rows:
+        valid_vals = [v for v in (to_float(c) for c in cells) if v is not None]
+        if not valid_vals: continue
+        recent_val = valid_vals[-1]
+
+        if 'ROE' in title:
+            data.setdefault('returnOnEquity', recent_val / 100.0)
+        elif '영업이익률' in title:
+            data.setdefault('operatingMargins', recent_val / 100.0)
+        elif '순이익률' in title:
+            data.setdefault('profitMargins', recent_val / 100.0)
+        elif '부채비율' in title:
+            data.setdefault('debtToEquity', recent_val)
+        elif '당좌비율' in title:
+            data.setdefault('quickRatio', recent_val / 100.0)
+        elif '유동비율' in title:
+            data.setdefault('currentRatio', recent_val / 100.0)
+    return data
+
+
+def parse_finviz_val(val_str, is_pct=False):
+    if val_str == '-' or val_str == '': return None
+    val_str = val_str.replace(',', '').replace('%', '')
+    try:
+        num = float(val_str)
+        return num / 100.0 if is_pct else num
+    except ValueError:
+        return None
+
+
+def parse_finviz_fundamentals(html, backend=None):
+    rows = _FINVIZ_RAW[backend or default_backend()](html)
+    data = {}
+    if rows is None:
+        return data
+    data_dict = {}
+    for cols in rows:
+        for i in range(0, len(cols) - 1, 2):
+            data_dict[cols[i].strip()] = cols[i+1].strip()
+
+    data['trailingPE'] = parse_finviz_val(data_dict.get('P/E', '-'))
+    data['forwardPE'] = parse_finviz_val(data_dict.get('Forward P/E', '-'))
+    data['priceToBook'] = parse_finviz_val(data_dict.get('P/B', '-'))
+    data['priceToSalesTrailing12Months'] = parse_finviz_val(data_dict.get('P/S', '-'))
+    data['pegRatio'] = parse_finviz_val(data_dict.get('PEG', '-'))
+    data['returnOnEquity'] = parse_finviz_val(data_dict.get('ROE', '-'), True)
+    data['returnOnAssets'] = parse_finviz_val(data_dict.get('ROA', '-'), True)
+    data['returnOnCapitalEmployed'] = parse_finviz_val(data_dict.get('ROI', '-'), True)
+    data['grossMargins'] = parse_finviz_val(data_dict.get('Gross Margin', '-'), True)
+    data['operatingMargins'] = parse_finviz_val(data_dict.get('Oper. Margin', '-'), True)
+    data['profitMargins'] = parse_finviz_val(data_dict.get('Profit Margin', '-'), True)
+    data['dividendYield'] = parse_finviz_val(data_dict.get('Dividend %', '-'), True)
+    val = parse_finviz_val(data_dict.get('Debt/Eq', '-'))
+    if val is not None: data['debtToEquity'] = val * 100
+    data['currentRatio'] = parse_finviz_val(data_dict.get('Current Ratio', '-'))
+    data['quickRatio'] = parse_finviz_val(data_dict.get('Quick Ratio', '-'))
+    return data
@@ -0,0 +1,149 @@
+"""모든 외부 HTTP 호출(야후 검색, 네이버, Finviz, 구글 뉴스 RSS, 기사 본문)이 함께 쓰는 전송 계층.
+
+호스트마다 keep-alive 연결 풀을 두어 TCP/TLS 연결을 재사용하고, 호스트별 동시 요청 수와
+초당 요청 수를 제한해 트래픽이 몰려도 Finviz/네이버에 차단당하지 않게 합니다.
+conditional=True로 요청하면 이전 응답의 ETag/Last-Modified를 보내고, 304가 오면 저장해 둔 응답을 그대로 돌려줍니다.
+"""
+import threading
+import time
+from collections import OrderedDict
+from urllib.parse import urlparse
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from . import tracing
+from .caching import shared_resource
+
+DEFAULT_HEADERS = {'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64)'}
+DEFAULT_HOST_LIMIT = (4, 10.0)  # (동시 요청 수, 초당 요청 수)
+HOST_LIMITS = {
+    'finviz.com': (2, 1.0),
+    'finance.naver.com': (4, 5.0),
+    'news.google.com': (4, 5.0),
+    'query2.finance.yahoo.com': (4, 5.0),
+}
+VALIDATOR_CACHE_SIZE = 512
+# 연결 풀을 유지할 호스트 수와, 동시 요청/초당 요청 제한 상태를 기억할 호스트 수
+HOST_POOL_COUNT = 64
+HOST_POOL_MAXSIZE = 16
+HOST_STATE_SIZE = 256
+
+
+class RateLimiter:
+    """초당 rate개까지 허용하는 간단한 토큰 버킷입니다. (최대 1초 분량까지 몰아서 허용)"""
+    def __init__(self, rate):
+        self.rate = rate
+        self.capacity = max(1.0, rate)
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def wait(self, timeout):
+        deadline = time.monotonic() + timeout
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return True
+                wait_for = (1 - self._tokens) / self.rate
+            if time.monotonic() + wait_for > deadline:
+                return False
+            time.sleep(wait_for)
+
+
+class HostThrottledError(requests.exceptions.RequestException):
+    pass
+
+
+class HttpTransport:
+    def __init__(self, host_limits=None, default_limit=DEFAULT_HOST_LIMIT, validator_cache_size=VALIDATOR_CACHE_SIZE):
+        self.host_limits = dict(HOST_LIMITS if host_limits is None else host_limits)
+        self.default_limit = default_limit
+        self.validator_cache_size = validator_cache_size
+        self.session = requests.Session()
+        self.session.headers.update(DEFAULT_HEADERS)
+        # 세션은 여러 스레드가 동시에 쓰므로 어댑터는 여기서 한 번만 마운트하고 이후에는 바꾸지 않습니다.
+        # 호스트별 keep-alive 연결 풀은 어댑터 안의 urllib3 PoolManager가 최근 HOST_POOL_COUNT개까지 유지합니다.
+        adapter = HTTPAdapter(pool_connections=HOST_POOL_COUNT, pool_maxsize=HOST_POOL_MAXSIZE)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+        self._lock = threading.Lock()
+        self._hosts = OrderedDict()
+        self._validators = OrderedDict()
+        self.stats = {'requests': 0, 'not_modified': 0, 'bytes': 0}
+
+    def _host_state(self, host):
+        with self._lock:
+            state = self._hosts.get(host)
+            if state is None:
+                concurrency, rate = self.host_limits.get(host, self.default_limit)
+                state = (threading.BoundedSemaphore(concurrency), RateLimiter(rate))
+                self._hosts[host] = state
+                # 뉴스 기사처럼 한 번만 들르는 호스트가 쌓이지 않도록 오래 안 쓴 호스트부터 잊습니다.
+                while len(self._hosts) > HOST_STATE_SIZE:
+                    self._hosts.popitem(last=False)
+            else:
+                self._hosts.move_to_end(host)
+            return state
+
+    def _remember(self, url, response):
+        etag = response.headers.get('ETag')
+        last_modified = response.headers.get('Last-Modified')
+        if not (etag or last_modified):
+            return
+        with self._lock:
+            self._validators[url] = (etag, last_modified, response)
+            self._validators.move_to_end(url)
+            while len(self._validators) > self.validator_cache_size:
+                self._validators.popitem(last=False)
+
+    def get(self, url, headers=None, timeout=5, conditional=False, **kwargs):
+        """requests.get과 같은 방식으로 쓰되, 호스트별 제한과 조건부 요청을 적용합니다."""
+        host = urlparse(url).netloc
+        slots, limiter = self._host_state(host)
+        request_headers = dict(headers or {})
+        cached = None
+        if conditional:
+            with self._lock:
+                cached = self._validators.get(url)
+            if cached:
+                etag, last_modified, _ = cached
+                if etag: request_headers['If-None-Match'] = etag
+                if last_modified: request_headers['If-Modified-Since'] = last_modified
+        if not limiter.wait(timeout):
+            raise HostThrottledError(f"{host} 요청 한도를 초과했습니다.")
+        # 호스트가 응답하지 않아 슬롯이 모두 잡혀 있으면 끝없이 줄 서지 않고 timeout 뒤에 포기합니다.
+        if not slots.acquire(timeout=timeout):
+            raise requests.exceptions.Timeout(f"{host} 동시 요청 슬롯을 {timeout}초 안에 얻지 못했습니다.")
+        try:
+            response = self.session.get(url, headers=request_headers, timeout=timeout, **kwargs)
+        finally:
+            slots.release()
+        with self._lock:
+            self.stats['requests'] += 1
+            self.stats['bytes'] += len(response.content)
+        tracing.count('http_requests')
+        tracing.count('http_bytes', len(response.content))
+        if conditional:
+            if response.status_code == 304 and cached:
+                with self._lock:
+                    self.stats['not_modified'] += 1
+                tracing.count('http_not_modified')
+                return cached[2]
+            if response.ok:
+                self._remember(url, response)
+        return response
+
+
+@shared_resource
+def get_transport():
+    """프로세스 전체에서 하나만 쓰는 전송 객체를 돌려줍니다."""
+    return HttpTransport()
+
+
+def http_get(url, **kwargs):
+    return get_transport().get(url, **kwargs)
@@ -0,0 +1,145 @@
+"""기술적 지표 엔진.
+
+이동평균/볼린저밴드는 누적합 한 번으로 여러 창을 한꺼번에, EMA/RSI/MACD는 지수평활로 계산합니다.
+결과는 (티커, 주기, 마지막 봉) 기준으로 기억해 두고, 새 봉이 붙으면 바뀐 구간만 이어서 계산합니다.
+"""
+import threading
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+
+from .caching import shared_resource
+
+EMA_SPANS = (12, 26)
+RSI_PERIOD = 14
+MACD_FAST, MACD_SLOW, MACD_SIGNAL = 12, 26, 9
+BOLLINGER_WINDOW, BOLLINGER_K = 20, 2.0
+INDICATOR_CACHE_MAX_ENTRIES = 64
+
+
+def rolling_mean_batch(values, windows, start=0):
+    """values[start:] 구간의 이동평균을 창 크기별로 돌려줍니다. 누적합은 필요한 구간에 대해 한 번만 구합니다."""
+    lo = max(0, start - max(windows) + 1)
+    seg = values[lo:]
+    csum = np.concatenate(([0.0], np.cumsum(seg)))
+    out = {}
+    for w in windows:
+        res = np.full(len(seg), np.nan)
+        if len(seg) >= w:
+            res[w - 1:] = (csum[w:] - csum[:-w]) / w
+        out[w] = res[start - lo:]
+    return out
+
+
+def rolling_std(values, window, start=0):
+    lo = max(0, start - window + 1)
+    seg = values[lo:]
+    # 큰 가격의 제곱합에서 생기는 자릿수 손실을 줄이려고 평균을 빼고 계산합니다.
+    centered = seg - (seg.mean() if len(seg) else 0.0)
+    csum = np.concatenate(([0.0], np.cumsum(centered)))
+    csum_sq = np.concatenate(([0.0], np.cumsum(centered * centered)))
+    res = np.full(len(seg), np.nan)
+    if len(seg) >= window:
+        mean = (csum[window:] - csum[:-window]) / window
+        var = (csum_sq[window:] - csum_sq[:-window]) / window - mean * mean
+        res[window - 1:] = np.sqrt(np.clip(var, 0.0, None) * window / (window - 1))
+    return res[start - lo:]
+
+
+def ema_from(values, alpha, start=0, prev=None):
+    """values[start:]의 지수이동평균. prev가 있으면 start-1 시점의 값으로 이어서 계산합니다."""
+    tail = values[start:]
+    if prev is None or np.isnan(prev):
+        return pd.Series(tail).ewm(alpha=alpha, adjust=False).mean().to_numpy()
+    return pd.Series(np.concatenate(([prev], tail))).ewm(alpha=alpha, adjust=False).mean().to_numpy()[1:]
+
+
+def compute_indicators(close, ma_windows, start=0, prev=None):
+    """close[start:] 구간의 지표 배열 묶음을 계산합니다. prev는 start 이전까지 계산된 지표 묶음입니다."""
+    def last(name):
+        return prev[name][start - 1] if prev is not None and start > 0 else None
+
+    cols = {}
+    windows = sorted(set(ma_windows) | {BOLLINGER_WINDOW})
+    means = rolling_mean_batch(close, windows, start)
+    for w in ma_windows:
+        cols[f'MA_{w}'] = means[w]
+
+    std = rolling_std(close, BOLLINGER_WINDOW, start)
+    cols['BB_mid'] = means[BOLLINGER_WINDOW]
+    cols['BB_upper'] = means[BOLLINGER_WINDOW] + BOLLINGER_K * std
+    cols['BB_lower'] = means[BOLLINGER_WINDOW] - BOLLINGER_K * std
+
+    for span in sorted(set(EMA_SPANS) | {MACD_FAST, MACD_SLOW}):
+        cols[f'EMA_{span}'] = ema_from(close, 2.0 / (span + 1), start, last(f'EMA_{span}'))
+    cols['MACD'] = cols[f'EMA_{MACD_FAST}'] - cols[f'EMA_{MACD_SLOW}']
+    cols['MACD_signal'] = ema_from(cols['MACD'], 2.0 / (MACD_SIGNAL + 1), 0, last('MACD_signal'))
+    cols['MACD_hist'] = cols['MACD'] - cols['MACD_signal']
+
+    # RSI는 와일더 방식(알파 1/기간)으로 상승폭/하락폭을 평활합니다.
+    delta = np.diff(close[start - 1:]) if start > 0 else np.concatenate(([0.0], np.diff(close)))
+    alpha = 1.0 / RSI_PERIOD
+    gain = ema_from(np.clip(delta, 0, None), alpha, 0, last('_rsi_gain'))
+    loss = ema_from(np.clip(-delta, 0, None), alpha, 0, last('_rsi_loss'))
+    with np.errstate(divide='ignore', invalid='ignore'):
+        rsi = np.where(loss == 0, 100.0, 100.0 - 100.0 / (1.0 + gain / loss))
+    positions = np.arange(start, len(close))
+    cols['_rsi_gain'], cols['_rsi_loss'] = gain, loss
+    cols[f'RSI_{RSI_PERIOD}'] = np.where(positions < RSI_PERIOD, np.nan, rsi)
+    return cols
+
+
+class IndicatorCache:
+    """(티커, 주기, MA 창) 별로 마지막으로 계산한 지표를 보관하고, 이력이 늘어나면 바뀐 구간만 다시 계산합니다."""
+    def __init__(self, max_entries):
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()
+
+    def get(self, ticker, interval, history, ma_windows):
+        key = (ticker, interval, tuple(ma_windows))
+        index = history.index
+        close = history['Close'].to_numpy(dtype=float)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+        start = 0
+        if entry is not None:
+            old_index, old_close, old_cols = entry
+            if len(old_index) == len(index) and old_index[-1] == index[-1] and old_close[-1] == close[-1]:
+                return self._frame(old_cols, index)
+            # 앞부분이 그대로이면 처음 달라진 봉부터만 이어서 계산합니다.
+            n = min(len(old_index), len(index))
+            same = (old_index[:n] == index[:n]) & (old_close[:n] == close[:n])
+            start = n if same.all() else int(np.argmin(same))
+        if start > 0:
+            tail = compute_indicators(close, ma_windows, start, old_cols)
+            cols = {name: np.concatenate((old_cols[name][:start], tail[name])) for name in tail}
+        else:
+            cols = compute_indicators(close, ma_windows)
+        with self._lock:
+            self._entries[key] = (index, close, cols)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return self._frame(cols, index)
+
+    @staticmethod
+    def _frame(cols, index):
+        # '_'로 시작하는 열은 이어서 계산할 때만 쓰는 내부 상태입니다.
+        return pd.DataFrame({k: v for k, v in cols.items() if not k.startswith('_')}, index=index)
+
+
+@shared_resource
+def get_indicator_cache():
+    return IndicatorCache(INDICATOR_CACHE_MAX_ENTRIES)
+
+
+def add_indicators(ticker, interval, history, ma_windows):
+    """history에 MA_{w}, EMA, RSI, MACD, 볼린저밴드 열을 붙여 돌려줍니다."""
+    if history.empty:
+        return history
+    indicators = get_indicator_cache().get(ticker, interval, history, ma_windows)
+    return history.join(indicators)
@@ -0,0 +1,146 @@
+"""KRX 전 종목의 네이버 금융 펀더멘털을 미리 모아 두는 로컬 SQLite 저장소.
+
+밤마다 배치로 돌려 두면 화면에서는 이 저장소를 먼저 읽으므로, 한국 종목은 요청 경로에서 스크래핑하지 않습니다.
+
+    python -m stock_core.krx_warehouse                   # 오래된(기본 20시간) 종목만 다시 수집
+    python -m stock_core.krx_warehouse --limit 100       # 시가총액 상위 100개만
+    python -m stock_core.krx_warehouse --max-age-hours 0 # 전부 다시 수집
+"""
+import argparse
+import os
+import sqlite3
+import sys
+import time
+
+from .config import CACHE_DIR
+from .html_extract import parse_naver_fundamentals
+from .http_transport import http_get
+
+WAREHOUSE_PATH = os.path.join(CACHE_DIR, "fundamentals.sqlite3")
+WAREHOUSE_MAX_AGE = 60 * 60 * 20
+CRAWL_DELAY = 0.5
+NAVER_MAIN_URL = "https://finance.naver.com/item/main.naver?code={code}"
+
+# yfinance info 키 -> 저장 열 이름 (parse_naver_fundamentals가 채우는 항목)
+FIELD_COLUMNS = {
+    'trailingPE': 'trailing_pe',
+    'priceToBook': 'price_to_book',
+    'dividendYield': 'dividend_yield',
+    'returnOnEquity': 'return_on_equity',
+    'operatingMargins': 'operating_margins',
+    'profitMargins': 'profit_margins',
+    'debtToEquity': 'debt_to_equity',
+    'quickRatio': 'quick_ratio',
+    'currentRatio': 'current_ratio',
+}
+
+
+def connect(path=WAREHOUSE_PATH):
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    conn = sqlite3.connect(path, timeout=10)
+    conn.execute("PRAGMA journal_mode=WAL")
+    columns = ", ".join(f"{col} REAL" for col in FIELD_COLUMNS.values())
+    conn.execute(
+        "CREATE TABLE IF NOT EXISTS naver_fundamentals ("
+        f"code TEXT PRIMARY KEY, symbol TEXT, name TEXT, market TEXT, {columns}, fetched_at REAL NOT NULL)"
+    )
+    return conn
+
+
+def naver_symbol(code, market):
+    return f"{code}.KS" if market == 'KOSPI' else f"{code}.KQ"
+
+
+def fetch_naver_fundamentals(code, timeout=5):
+    res = http_get(NAVER_MAIN_URL.format(code=code), headers={'User-Agent': 'Mozilla/5.0'}, timeout=timeout, conditional=True)
+    res.raise_for_status()
+    return parse_naver_fundamentals(res.text)
+
+
+def has_fields(data):
+    # 파싱이 아무 항목도 찾지 못했으면(마크업 변경, 차단 페이지 등) 저장하지 않고 다음에 다시 받습니다.
+    return any(data.get(key) is not None for key in FIELD_COLUMNS)
+
+
+def save_fundamentals(conn, code, data, symbol=None, name=None, market=None, fetched_at=None):
+    cols = list(FIELD_COLUMNS.values())
+    values = [data.get(key) for key in FIELD_COLUMNS]
+    conn.execute(
+        f"INSERT OR REPLACE INTO naver_fundamentals (code, symbol, name, market, {', '.join(cols)}, fetched_at) "
+        f"VALUES ({', '.join('?' * (len(cols) + 5))})",
+        [code, symbol, name, market, *values, fetched_at or time.time()],
+    )
+    conn.commit()
+
+
+def read_fundamentals(code, max_age=WAREHOUSE_MAX_AGE, path=WAREHOUSE_PATH):
+    """저장된 값이 max_age초 이내면 info 키 dict를, 없거나 오래됐거나 모든 항목이 비어 있으면 None을 돌려줍니다."""
+    if not os.path.exists(path):
+        return None
+    conn = sqlite3.connect(path, timeout=10)
+    try:
+        row = conn.execute(
+            f"SELECT {', '.join(FIELD_COLUMNS.values())}, fetched_at FROM naver_fundamentals WHERE code = ?", (code,)
+        ).fetchone()
+    except sqlite3.Error:
+        return None
+    finally:
+        conn.close()
+    if row is None or time.time() - row[-1] > max_age:
+        return None
+    data = {key: val for key, val in zip(FIELD_COLUMNS, row[:-1]) if val is not None}
+    return data or None
+
+
+def stale_codes(conn, codes, max_age):
+    cutoff = time.time() - max_age
+    fresh = {code for code, in conn.execute("SELECT code FROM naver_fundamentals WHERE fetched_at >= ?", (cutoff,))}
+    return [code for code in codes if code not in fresh]
+
+
+def crawl(limit=None, max_age=WAREHOUSE_MAX_AGE, delay=CRAWL_DELAY, path=WAREHOUSE_PATH, log=print):
+    """KRX 상장 종목을 순서대로(시가총액 순) 돌며 오래된 종목만 천천히 다시 수집합니다."""
+    import FinanceDataReader as fdr
+
+    listing = fdr.StockListing('KRX')
+    if limit:
+        listing = listing.head(limit)
+    meta = {code: (name, market) for code, name, market in zip(listing['Code'], listing['Name'], listing['Market'])}
+    conn = connect(path)
+    try:
+        todo = stale_codes(conn, list(meta), max_age)
+        log(f"대상 {len(meta)}개 중 {len(todo)}개 수집")
+        done = failed = 0
+        for i, code in enumerate(todo, 1):
+            name, market = meta[code]
+            try:
+                data = fetch_naver_fundamentals(code)
+                if not has_fields(data):
+                    raise ValueError("펀더멘털 항목을 찾지 못했습니다")
+                save_fundamentals(conn, code, data, naver_symbol(code, market), name, market)
+                done += 1
+            except Exception as e:
+                failed += 1
+                log(f"  {code} {name}: {e}")
+            if i % 100 == 0:
+                log(f"  {i}/{len(todo)}")
+            time.sleep(delay)
+        log(f"완료: 성공 {done}, 실패 {failed}")
+    finally:
+        conn.close()
+    return failed
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--limit", type=int, default=None, help="시가총액 상위 N개만 수집")
+    ap.add_argument("--max-age-hours", type=float, default=WAREHOUSE_MAX_AGE / 3600, help="이보다 오래된 종목만 다시 수집")
+    ap.add_argument("--delay", type=float, default=CRAWL_DELAY, help="요청 사이 대기(초)")
+    ap.add_argument("--db", default=WAREHOUSE_PATH)
+    args = ap.parse_args(argv)
+    failed = crawl(args.limit, args.max_age_hours * 3600, args.delay, args.db)
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
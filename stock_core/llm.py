@@ -0,0 +1,368 @@
+"""Gemini 호출 계층: 재시도/대체 모델/호출량 제한/차단기와 응답 캐시, 스트리밍.
+
+genai.Client는 import 시점이 아니라 get_llm_client()를 처음 부를 때 만듭니다.
+API 키는 configure_llm()으로 넘기거나 GEMINI_API_KEY 환경 변수로 지정합니다.
+"""
+import hashlib
+import json
+import os
+import random
+import sqlite3
+import threading
+import time
+from collections import OrderedDict, defaultdict
+
+import requests
+
+try:
+    # google-genai는 httpx로 통신하므로 네트워크 시간 초과/연결 끊김이 httpx 예외로 올라옵니다.
+    import httpx
+    HTTPX_TRANSIENT_ERRORS = (httpx.TransportError,)
+except ImportError:
+    HTTPX_TRANSIENT_ERRORS = ()
+
+from . import tracing
+from .caching import get_shared_cache, shared_resource
+from .config import CACHE_DIR, SHARED_CACHE_URL
+from .shared_cache import shared_key
+
+# ====================== AI 호출 안정화 ======================
+# 구글 AI 서버가 몰려 503/429가 나면 사용자가 다시 누르는 대신 잠깐 기다렸다가 재시도하고,
+# 그래도 안 되면 대체 모델로 넘어갑니다. 호출량 제한(토큰 버킷)과 차단기(circuit breaker)는
+# 모든 세션이 함께 쓰는 객체라 과부하 때 요청을 한꺼번에 쏟아붓지 않습니다.
+LLM_MODEL = 'gemini-2.5-flash'
+LLM_FALLBACK_MODELS = [m.strip() for m in os.environ.get("STOCK_TERMINAL_LLM_FALLBACKS", "gemini-2.5-flash-lite,gemini-2.0-flash").split(",") if m.strip()]
+LLM_MAX_RETRIES = 3
+LLM_BACKOFF_BASE = 1.0
+LLM_BACKOFF_MAX = 8.0
+LLM_RATE_PER_MINUTE = 60
+LLM_RATE_BURST = 10
+LLM_RATE_WAIT = 10
+LLM_BREAKER_THRESHOLD = 5
+LLM_BREAKER_COOLDOWN = 60
+LLM_TRANSIENT_CODES = {429, 500, 502, 503, 504}
+
+_api_key = None
+
+
+class LLMUnavailableError(Exception):
+    pass
+
+
+class TokenBucket:
+    """초당 rate개씩 채워지고 최대 capacity개까지 쌓이는 토큰 버킷입니다."""
+    def __init__(self, rate, capacity):
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = float(capacity)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self, timeout):
+        deadline = time.monotonic() + timeout
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return True
+                wait_for = (1 - self._tokens) / self.rate
+            if time.monotonic() + wait_for > deadline:
+                return False
+            time.sleep(wait_for)
+
+
+class CircuitBreaker:
+    """모델별로 연속 실패가 threshold번 쌓이면 cooldown초 동안 호출을 막습니다."""
+    def __init__(self, threshold, cooldown):
+        self.threshold = threshold
+        self.cooldown = cooldown
+        self._lock = threading.Lock()
+        self._failures = defaultdict(int)
+        self._opened_at = {}
+
+    def allow(self, model):
+        with self._lock:
+            opened_at = self._opened_at.get(model)
+            # 쿨다운이 지나면 한 번 시도해 볼 수 있게 열어 둡니다(half-open).
+            return opened_at is None or time.monotonic() - opened_at >= self.cooldown
+
+    def record_success(self, model):
+        with self._lock:
+            self._failures[model] = 0
+            self._opened_at.pop(model, None)
+
+    def record_failure(self, model):
+        with self._lock:
+            self._failures[model] += 1
+            if self._failures[model] >= self.threshold:
+                self._opened_at[model] = time.monotonic()
+
+
+def is_transient_llm_error(exc):
+    code = getattr(exc, 'code', None) or getattr(exc, 'status_code', None)
+    if code in LLM_TRANSIENT_CODES:
+        return True
+    return isinstance(exc, (TimeoutError, ConnectionError, requests.exceptions.ConnectionError, requests.exceptions.Timeout)
+                      + HTTPX_TRANSIENT_ERRORS)
+
+
+def backoff_delay(attempt):
+    # full jitter: 0 ~ min(최대, 기본 * 2^attempt) 사이에서 무작위로 기다립니다.
+    return random.uniform(0, min(LLM_BACKOFF_MAX, LLM_BACKOFF_BASE * (2 ** attempt)))
+
+
+class LLMClient:
+    """genai.Client를 감싸 재시도, 지수 백오프, 호출량 제한, 차단기, 대체 모델을 적용합니다."""
+    def __init__(self, client, fallback_models, bucket, breaker, max_retries=LLM_MAX_RETRIES):
+        self.client = client
+        self.fallback_models = fallback_models
+        self.bucket = bucket
+        self.breaker = breaker
+        self.max_retries = max_retries
+
+    def _attempts(self, model):
+        for candidate in dict.fromkeys([model] + self.fallback_models):
+            for attempt in range(self.max_retries):
+                # 재시도 중에 차단기가 열리면 남은 시도를 건너뛰고 다음 모델로 넘어갑니다.
+                if not self.breaker.allow(candidate):
+                    break
+                yield candidate, attempt
+
+    def _run(self, model, call):
+        last_error = None
+        for candidate, attempt in self._attempts(model):
+            if not self.bucket.acquire(LLM_RATE_WAIT):
+                raise LLMUnavailableError("AI 호출량 제한에 걸려 잠시 후 다시 시도해야 합니다.")
+            try:
+                result = call(candidate)
+                self.breaker.record_success(candidate)
+                tracing.annotate(model=candidate)
+                return result
+            except Exception as e:
+                if not is_transient_llm_error(e):
+                    raise
+                last_error = e
+                tracing.count('llm_retries')
+                self.breaker.record_failure(candidate)
+                if attempt < self.max_retries - 1 and self.breaker.allow(candidate):
+                    time.sleep(backoff_delay(attempt))
+        if last_error is None:
+            # 한 번도 시도하지 못했다면 모든 모델의 차단기가 열려 있는 것입니다.
+            raise LLMUnavailableError(f"AI 모델 호출이 잇따라 실패해 차단기가 열려 있습니다. {LLM_BREAKER_COOLDOWN}초쯤 뒤에 다시 시도해 주세요.")
+        raise LLMUnavailableError(f"모든 AI 모델이 응답하지 않습니다: {last_error}")
+
+    def generate(self, prompt, model=LLM_MODEL, config=None):
+        return self._run(model, lambda m: self.client.models.generate_content(model=m, contents=prompt, config=config).text)
+
+    def stream(self, prompt, model=LLM_MODEL, config=None):
+        """첫 조각을 받기 전까지만 재시도/대체 모델을 적용하고, 이후에는 받은 대로 흘려 보냅니다."""
+        def open_stream(m):
+            chunks = iter(self.client.models.generate_content_stream(model=m, contents=prompt, config=config))
+            first = next(chunks, None)
+            return first, chunks
+        first, chunks = self._run(model, open_stream)
+        if first is not None:
+            yield first
+        yield from chunks
+
+
+def configure_llm(api_key):
+    """Gemini API 키를 지정합니다. 이미 만든 클라이언트가 있으면 다음 호출 때 새 키로 다시 만듭니다."""
+    global _api_key
+    if api_key != _api_key:
+        _api_key = api_key
+        get_llm_client.reset()
+
+
+@shared_resource
+def get_llm_client():
+    api_key = _api_key or os.environ.get("GEMINI_API_KEY")
+    if not api_key:
+        raise LLMUnavailableError("Gemini API 키가 설정되지 않았습니다.")
+    from google import genai
+
+    return LLMClient(
+        genai.Client(api_key=api_key),
+        LLM_FALLBACK_MODELS,
+        TokenBucket(LLM_RATE_PER_MINUTE / 60.0, LLM_RATE_BURST),
+        CircuitBreaker(LLM_BREAKER_THRESHOLD, LLM_BREAKER_COOLDOWN),
+    )
+
+
+# ====================== AI 응답 캐시 ======================
+# 같은 종목/같은 데이터로 만든 프롬프트는 같은 응답을 받으므로, (모델, 프롬프트, 설정)의 해시를
+# 키로 응답을 저장해 두고 다시 누르면 바로 돌려줍니다. 저장소는 메모리, SQLite, 공유 캐시 중에서 고르며
+# 공유 캐시(STOCK_TERMINAL_SHARED_CACHE)를 지정하면 기본값이 공유 캐시라 여러 레플리카가 같은 응답을 나눠 씁니다.
+LLM_CACHE_BACKEND = os.environ.get("STOCK_TERMINAL_LLM_CACHE", "shared" if SHARED_CACHE_URL else "memory")  # "memory", "sqlite", "shared"
+LLM_CACHE_VERSION = 1
+LLM_CACHE_PATH = os.path.join(CACHE_DIR, "llm_cache.sqlite3")
+LLM_CACHE_TTL = 60 * 60 * 6
+LLM_CACHE_MAX_ENTRIES = 256
+
+
+def prompt_fingerprint(model, prompt, config=None):
+    payload = json.dumps([model, prompt, config or {}], ensure_ascii=False, sort_keys=True)
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+
+class MemoryResponseCache:
+    """TTL과 최대 개수(LRU)로 제한되는 프로세스 내 응답 캐시입니다."""
+    def __init__(self, ttl, max_entries):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            created_at, value = entry
+            if time.time() - created_at > self.ttl:
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key, value):
+        with self._lock:
+            self._entries[key] = (time.time(), value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+
+class SQLiteResponseCache:
+    """프로세스 재시작 후에도 남는 SQLite 응답 캐시입니다. 마지막 조회 시각 기준으로 오래된 항목부터 지웁니다."""
+    def __init__(self, path, ttl, max_entries):
+        self.path = path
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS llm_cache ("
+            "key TEXT PRIMARY KEY, value TEXT NOT NULL, created_at REAL NOT NULL, accessed_at REAL NOT NULL)"
+        )
+        self._conn.commit()
+
+    def get(self, key):
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute("SELECT value, created_at FROM llm_cache WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                return None
+            if now - row[1] > self.ttl:
+                self._conn.execute("DELETE FROM llm_cache WHERE key = ?", (key,))
+                self._conn.commit()
+                return None
+            self._conn.execute("UPDATE llm_cache SET accessed_at = ? WHERE key = ?", (now, key))
+            self._conn.commit()
+            return row[0]
+
+    def set(self, key, value):
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO llm_cache (key, value, created_at, accessed_at) VALUES (?, ?, ?, ?)",
+                (key, value, now, now),
+            )
+            self._conn.execute(
+                "DELETE FROM llm_cache WHERE key NOT IN "
+                "(SELECT key FROM llm_cache ORDER BY accessed_at DESC LIMIT ?)",
+                (self.max_entries,),
+            )
+            self._conn.commit()
+
+
+class SharedResponseCache:
+    """공유 캐시 저장소에 응답을 두는 캐시입니다. 이 프로세스에서 읽은 응답은 메모리에도 둡니다."""
+    def __init__(self, backend, ttl, max_entries):
+        self.backend = backend
+        self.ttl = ttl
+        self.local = MemoryResponseCache(ttl, max_entries)
+
+    def get(self, key):
+        value = self.local.get(key)
+        if value is not None:
+            return value
+        try:
+            raw = self.backend.get(shared_key('llm', LLM_CACHE_VERSION, key))
+        except:
+            tracing.record_error()
+            return None
+        if raw is None:
+            return None
+        value = raw.decode('utf-8')
+        self.local.set(key, value)
+        return value
+
+    def set(self, key, value):
+        self.local.set(key, value)
+        try:
+            self.backend.set(shared_key('llm', LLM_CACHE_VERSION, key), value.encode('utf-8'), self.ttl)
+        except:
+            tracing.record_error()
+
+
+@shared_resource
+def get_llm_cache():
+    if LLM_CACHE_BACKEND == "shared" and get_shared_cache() is not None:
+        return SharedResponseCache(get_shared_cache(), LLM_CACHE_TTL, LLM_CACHE_MAX_ENTRIES)
+    if LLM_CACHE_BACKEND == "sqlite":
+        return SQLiteResponseCache(LLM_CACHE_PATH, LLM_CACHE_TTL, LLM_CACHE_MAX_ENTRIES)
+    return MemoryResponseCache(LLM_CACHE_TTL, LLM_CACHE_MAX_ENTRIES)
+
+
+def generate_report(prompt, model=LLM_MODEL, config=None):
+    with tracing.span("llm.generate", prompt_chars=len(prompt)):
+        cache = get_llm_cache()
+        key = prompt_fingerprint(model, prompt, config)
+        cached = cache.get(key)
+        if cached is not None:
+            tracing.count('cache_hit')
+            return cached
+        tracing.count('cache_miss')
+        text = get_llm_client().generate(prompt, model=model, config=config)
+        if text:
+            cache.set(key, text)
+        return text
+
+
+# ====================== AI 응답 스트리밍 ======================
+# 전체 리포트가 완성될 때까지 기다리지 않고 생성되는 대로 흘려 보내며,
+# 첫 토큰까지 걸린 시간(TTFT)과 전체 생성 시간을 기록합니다.
+
+def stream_report(prompt, model=LLM_MODEL, config=None, metrics=None):
+    """응답 조각을 차례로 내보내는 제너레이터입니다. metrics에 ttft/total(초)와 캐시 적중 여부를 채웁니다."""
+    metrics = metrics if metrics is not None else {}
+    started = time.perf_counter()
+    cache = get_llm_cache()
+    key = prompt_fingerprint(model, prompt, config)
+    cached = cache.get(key)
+    # 제너레이터 안에서는 span을 새로 열지 않고, 소비하는 쪽(화면의 버튼 처리)의 현재 span에 기록합니다.
+    if cached is not None:
+        tracing.count('cache_hit')
+        metrics.update(cached=True, ttft=time.perf_counter() - started, total=time.perf_counter() - started)
+        yield cached
+        return
+    tracing.count('cache_miss')
+    metrics['cached'] = False
+    parts = []
+    for chunk in get_llm_client().stream(prompt, model=model, config=config):
+        text = chunk.text
+        if not text:
+            continue
+        if not parts:
+            metrics['ttft'] = time.perf_counter() - started
+        parts.append(text)
+        yield text
+    metrics['total'] = time.perf_counter() - started
+    full_text = "".join(parts)
+    if full_text:
+        cache.set(key, full_text)
@@ -0,0 +1,192 @@
+"""상세 재무 탭과 AI 프롬프트가 함께 쓰는 지표 계산과 표시 형식.
+
+compute_valuation()은 밸류에이션/수익성/안정성 지표를, summarize_statements()는 최근 결산 재무제표 요약을
+각각 dataclass로 돌려줍니다. 값이 없는 지표는 'N/A'입니다. 기본 지표는 profile.FundamentalProfile에서,
+재무제표 값은 statements.StatementHistory에서 읽고, trend_table()은 그 다기간 지표를 표로 만듭니다.
+"""
+import math
+from dataclasses import dataclass
+from typing import Union
+
+import pandas as pd
+
+from .history import load_daily_history
+from .profile import as_number
+from .statements import METRIC_NAMES, STATEMENT_ROWS
+
+# 숫자 또는 값이 없을 때의 'N/A'
+Value = Union[float, str]
+
+
+def format_statement_value(val, default='N/A'):
+    return default if val is None else f"{val:,.0f}"
+
+
+def format_large_number(num, currency):
+    return f"{num:,.0f} {currency}"
+
+
+def or_na(v, default='N/A'):
+    return default if v is None else v
+
+
+def fmt_pct(v, is_dividend=False):
+    if v == 'N/A' or v is None: return 'N/A'
+    try:
+        val = float(v)
+        if is_dividend and val >= 1.0:
+            val = val / 100.0
+        return f"{val*100:.2f}%"
+    except: return 'N/A'
+
+
+def fmt_flt(v):
+    if v is None or pd.isna(v): return 'N/A'
+    try:
+        f = float(v)
+        if math.isnan(f) or math.isinf(f): return 'N/A'
+        return f"{f:.2f}"
+    except: return 'N/A'
+
+
+def as_percent(v):
+    f = as_number(v)
+    return None if f is None else f * 100
+
+
+def get_52w_high_low(ticker, info_high, info_low):
+    high = info_high
+    low = info_low
+    if low <= 0 or high <= 0:
+        try:
+            # 차트와 같은 일봉 저장소에서 최근 2년 구간만 잘라 씁니다.
+            hist = load_daily_history(ticker)
+            hist = hist[hist.index >= hist.index.max() - pd.DateOffset(years=2)]
+            hist = hist[hist['Low'] > 0]
+            if not hist.empty:
+                high = hist['High'].max()
+                low = hist['Low'].min()
+        except:
+            pass
+    return high, low
+
+
+def compute_roic(profile, history):
+    # 프로필에 ROIC가 없으면 최근 결산 영업이익(세율 25% 가정)과 투하자본(총자산-유동부채)으로 추정합니다.
+    roic = profile.roic if profile.roic is not None else history.latest('roic')
+    return or_na(roic)
+
+
+@dataclass
+class ValuationMetrics:
+    market_cap: float
+    trailing_pe: Value
+    forward_pe: Value
+    pb: Value
+    psr: Value
+    peg: Value
+    ev_ebitda: Value
+    roe: Value
+    roa: Value
+    roic: Value
+    gross_margin: Value
+    op_margin: Value
+    net_margin: Value
+    rev_growth: Value
+    div_yield: Value
+    debt: Value
+    current_ratio: Value
+    quick_ratio: Value
+    interest_cov: Union[float, None]
+
+
+def compute_valuation(profile, history):
+    return ValuationMetrics(
+        market_cap=or_na(profile.market_cap, 0),
+        trailing_pe=or_na(profile.trailing_pe),
+        forward_pe=or_na(profile.forward_pe),
+        pb=or_na(profile.pb),
+        psr=or_na(profile.psr),
+        peg=or_na(profile.peg),
+        ev_ebitda=or_na(profile.ev_ebitda),
+        roe=or_na(profile.roe),
+        roa=or_na(profile.roa),
+        roic=compute_roic(profile, history),
+        gross_margin=or_na(profile.gross_margin),
+        op_margin=or_na(profile.op_margin),
+        net_margin=or_na(profile.net_margin),
+        rev_growth=or_na(profile.rev_growth),
+        div_yield=or_na(profile.div_yield),
+        debt=or_na(profile.debt),
+        current_ratio=or_na(profile.current_ratio),
+        quick_ratio=or_na(profile.quick_ratio),
+        interest_cov=history.latest('interest_coverage'),
+    )
+
+
+@dataclass
+class StatementSummary:
+    """최근 결산 재무제표의 주요 항목을 천 단위 구분 문자열로 담습니다."""
+    rev: str = 'N/A'
+    cogs: str = 'N/A'
+    gp: str = 'N/A'
+    sga: str = 'N/A'
+    op: str = 'N/A'
+    pretax: str = 'N/A'
+    net: str = 'N/A'
+    oci: str = 'N/A'
+    tot_assets: str = 'N/A'
+    cur_assets: str = 'N/A'
+    ncur_assets: str = 'N/A'
+    tot_liab: str = 'N/A'
+    cur_liab: str = 'N/A'
+    ncur_liab: str = 'N/A'
+    tot_eq: str = 'N/A'
+    cash: str = 'N/A'
+    receiv: str = 'N/A'
+    inv: str = 'N/A'
+    tangible: str = 'N/A'
+    intangible: str = 'N/A'
+    s_debt: str = 'N/A'
+    l_debt: str = 'N/A'
+    cap_stock: str = 'N/A'
+    cap_surplus: str = 'N/A'
+    retained: str = 'N/A'
+    cf_op: str = 'N/A'
+    cf_inv: str = 'N/A'
+    cf_fin: str = 'N/A'
+    cf_beg: str = 'N/A'
+    cf_end: str = 'N/A'
+    dividend: str = 'N/A'
+
+
+def summarize_statements(history):
+    return StatementSummary(**{name: format_statement_value(history.latest(name)) for name in STATEMENT_ROWS})
+
+
+# 다년 추이 표의 지표 이름. 비율 지표는 %로, 이자보상배율은 배수로, 잉여현금흐름은 금액으로 표시합니다.
+METRIC_LABELS = {
+    'roic': "ROIC", 'interest_coverage': "이자보상배율", 'gross_margin': "매출총이익률", 'op_margin': "영업이익률",
+    'net_margin': "순이익률", 'rev_growth': "매출 성장률", 'op_growth': "영업이익 성장률", 'net_growth': "순이익 성장률",
+    'fcf': "잉여현금흐름", 'fcf_margin': "FCF 마진",
+}
+TREND_PERIODS = 5
+
+
+def format_metric(name, value):
+    if value is None or math.isnan(value):
+        return 'N/A'
+    if name == 'interest_coverage':
+        return f"{value:.2f}배"
+    if name == 'fcf':
+        return f"{value:,.0f}"
+    return f"{value * 100:.2f}%"
+
+
+def trend_table(history, periods=TREND_PERIODS, frequency='annual'):
+    """최근 periods개 결산의 지표를 (지표 이름 × 결산 기간) 문자열 표로 돌려줍니다. (상세 재무 탭/프롬프트용)"""
+    frame = history.to_frame(periods=periods)
+    label = "%Y" if frequency == 'annual' else "%Y-%m"
+    columns = [p.strftime(label) if hasattr(p, 'strftime') else str(p) for p in frame.columns]
+    rows = [[format_metric(name, v) for v in frame.loc[name].tolist()] for name in METRIC_NAMES]
+    return pd.DataFrame(rows, index=[METRIC_LABELS[name] for name in METRIC_NAMES], columns=columns)
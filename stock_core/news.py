@@ -0,0 +1,253 @@
+"""구글 뉴스 RSS(없으면 yfinance 뉴스)와 기사 본문 수집.
+
+RSS 설명이 비어 있는 기사는 본문을 직접 가져와야 합니다. 공용 전송 계층(http_transport)으로
+여러 기사를 동시에 받되 같은 호스트에는 동시 요청 수를 제한하고, 받은 본문은 URL 해시 기준으로
+디스크에 저장해 같은 날 다시 본 기사에는 네트워크 비용이 들지 않게 합니다.
+
+피드는 iterparse로 <item>이 닫힐 때마다 읽고, 종목별 뉴스 인덱스(NewsIndex)에 이미 있는 GUID/링크는
+건너뛰어 새 기사만 본문 정리(BeautifulSoup)를 거칩니다. 화면과 프롬프트는 이 인덱스의 최신순 목록을 읽습니다.
+"""
+import contextvars
+import hashlib
+import io
+import json
+import os
+import re
+import threading
+import time
+import xml.etree.ElementTree as ET
+from concurrent.futures import ThreadPoolExecutor, wait
+from email.utils import parsedate_to_datetime
+
+import yfinance as yf
+from bs4 import BeautifulSoup
+
+from . import tracing
+from .caching import shared_resource, ttl_cache
+from .config import CACHE_DIR, NEWS_STALE_TTL, NEWS_TTL
+from .http_transport import http_get
+
+ARTICLE_CACHE_DIR = os.path.join(CACHE_DIR, "articles")
+ARTICLE_CACHE_TTL = 60 * 60 * 24
+ARTICLE_MAX_WORKERS = 16
+ARTICLE_TIMEOUT = 2
+ARTICLE_BATCH_TIMEOUT = 6
+NEWS_INDEX_DIR = os.path.join(CACHE_DIR, "news_index")
+NEWS_INDEX_MAX_ITEMS = 200
+NEWS_SEEN_MAX = 2000
+NEWS_FEED_MAX_ITEMS = 100
+
+
+@shared_resource
+def get_article_pool():
+    return ThreadPoolExecutor(max_workers=ARTICLE_MAX_WORKERS, thread_name_prefix="article")
+
+
+def article_cache_path(url):
+    return os.path.join(ARTICLE_CACHE_DIR, hashlib.sha256(url.encode('utf-8')).hexdigest() + ".json")
+
+
+def read_article_cache(url):
+    path = article_cache_path(url)
+    try:
+        if time.time() - os.path.getmtime(path) > ARTICLE_CACHE_TTL:
+            return None
+        with open(path, encoding='utf-8') as f:
+            return json.load(f)['text']
+    except:
+        return None
+
+
+def write_article_cache(url, text):
+    path = article_cache_path(url)
+    try:
+        os.makedirs(ARTICLE_CACHE_DIR, exist_ok=True)
+        tmp_path = f"{path}.{threading.get_ident()}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump({"url": url, "text": text, "fetched_at": time.time()}, f, ensure_ascii=False)
+        os.replace(tmp_path, path)
+    except:
+        pass
+
+
+def get_article_text(url):
+    cached = read_article_cache(url)
+    if cached is not None:
+        return cached
+    try:
+        res = http_get(url, timeout=ARTICLE_TIMEOUT, allow_redirects=True)
+        if res.status_code >= 400:
+            return ""
+        soup = BeautifulSoup(res.text, 'html.parser')
+        paragraphs = soup.find_all('p')
+        text = " ".join([p.get_text().strip() for p in paragraphs if p.get_text()])
+        text = text[:800] if text else ""
+        write_article_cache(url, text)
+        return text
+    except:
+        tracing.record_error()
+        return ""
+
+
+def fetch_article_texts(urls):
+    """여러 기사 본문을 동시에 가져와 {url: 본문}으로 돌려줍니다. 제한 시간을 넘긴 기사는 빈 문자열입니다."""
+    texts = {}
+    pending = []
+    for url in dict.fromkeys(urls):
+        cached = read_article_cache(url)
+        if cached is not None:
+            texts[url] = cached
+        else:
+            pending.append(url)
+    if pending:
+        pool = get_article_pool()
+        with tracing.span("news.articles", urls=len(pending), disk_cached=len(texts)):
+            futures = {pool.submit(contextvars.copy_context().run, get_article_text, url): url for url in pending}
+            done, not_done = wait(futures, timeout=ARTICLE_BATCH_TIMEOUT)
+            for future in not_done:
+                future.cancel()
+            tracing.annotate(timed_out=len(not_done))
+        for future, url in futures.items():
+            texts[url] = future.result() if future in done else ""
+    return texts
+
+
+def parse_pub_date(text):
+    # RSS pubDate(RFC 822)를 epoch 초로 바꿉니다. 형식이 다르면 None.
+    try:
+        return parsedate_to_datetime(text).timestamp()
+    except:
+        return None
+
+
+class NewsIndex:
+    """종목별로 이미 본 기사(GUID/링크)와 발행 시각 최신순으로 정렬된 최근 기사 목록을 보관합니다.
+
+    기사 목록은 max_items개, 본 기사 기록은 max_seen개까지만 두고 오래된 것부터 지웁니다.
+    목록에서 밀려난 기사도 본 기사 기록에 남아 있는 동안은 다시 들어오지 않습니다.
+    본문(content)을 아직 못 받은 기사는 목록에는 넣되 본 기사로 기록하지 않아, 다음 갱신 때 다시 받아 교체합니다.
+    """
+    def __init__(self, directory, max_items, max_seen):
+        self.directory = directory
+        self.max_items = max_items
+        self.max_seen = max_seen
+        self._lock = threading.Lock()
+        self._entries = {}
+
+    def _path(self, ticker):
+        return os.path.join(self.directory, re.sub(r"[^\w.-]", "_", ticker) + ".json")
+
+    def _entry(self, ticker):
+        entry = self._entries.get(ticker)
+        if entry is None:
+            try:
+                with open(self._path(ticker), encoding='utf-8') as f:
+                    data = json.load(f)
+                entry = {"seen": dict.fromkeys(data['seen']), "items": data['items']}
+            except:
+                entry = {"seen": {}, "items": []}
+            self._entries[ticker] = entry
+        return entry
+
+    def seen(self, ticker):
+        with self._lock:
+            return set(self._entry(ticker)["seen"])
+
+    def items(self, ticker):
+        with self._lock:
+            return list(self._entry(ticker)["items"])
+
+    def add(self, ticker, items):
+        with self._lock:
+            entry = self._entry(ticker)
+            for item in items:
+                if item.get('content'):
+                    entry["seen"][item['guid']] = None
+            while len(entry["seen"]) > self.max_seen:
+                del entry["seen"][next(iter(entry["seen"]))]
+            guids = {item['guid'] for item in items}
+            merged = items + [item for item in entry["items"] if item.get('guid') not in guids]
+            merged.sort(key=lambda item: item.get('published') or 0, reverse=True)
+            entry["items"] = merged[:self.max_items]
+            data = {"seen": list(entry["seen"]), "items": entry["items"]}
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            path = self._path(ticker)
+            tmp_path = f"{path}.{threading.get_ident()}.tmp"
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(data, f, ensure_ascii=False)
+            os.replace(tmp_path, path)
+        except:
+            pass
+
+
+@shared_resource
+def get_news_index():
+    return NewsIndex(NEWS_INDEX_DIR, NEWS_INDEX_MAX_ITEMS, NEWS_SEEN_MAX)
+
+
+def iter_feed_items(content, limit=NEWS_FEED_MAX_ITEMS):
+    """RSS 문서 전체를 트리로 만들지 않고 <item>이 닫힐 때마다 (guid, 제목, 링크, 설명, pubDate)를 내보냅니다."""
+    count = 0
+    for _, elem in ET.iterparse(io.BytesIO(content), events=('end',)):
+        if elem.tag != 'item':
+            continue
+        link = elem.findtext('link') or "#"
+        yield (elem.findtext('guid') or link, elem.findtext('title') or "No title", link,
+               elem.findtext('description') or "", elem.findtext('pubDate'))
+        # 다 읽은 기사는 비워 두어 문서가 커도 메모리가 늘지 않게 합니다.
+        elem.clear()
+        count += 1
+        if count >= limit:
+            return
+
+
+def ingest_feed(ticker, content, index):
+    """피드에서 인덱스에 없는 기사만 정리해 추가하고, 추가한 기사 수를 돌려줍니다."""
+    seen = index.seen(ticker)
+    fresh = [entry for entry in iter_feed_items(content) if entry[0] not in seen]
+    tracing.annotate(news_new=len(fresh))
+    if not fresh:
+        return 0
+    # 설명이 비어 있는 기사들만 모아 본문을 한 번에 가져옵니다.
+    article_texts = fetch_article_texts([link for _, _, link, desc, _ in fresh if not desc])
+    items = []
+    for guid, title, link, desc, pub_date in fresh:
+        content = BeautifulSoup(desc, "html.parser").get_text() if desc else article_texts.get(link, "")
+        items.append({"title": title, "link": link, "content": content[:800].replace('\n', ' '),
+                      "published": parse_pub_date(pub_date), "guid": guid})
+    index.add(ticker, items)
+    return len(items)
+
+
+@ttl_cache(ttl=NEWS_TTL, stale_ttl=NEWS_STALE_TTL, shared=True)
+def load_news(ticker, query):
+    """[{title, link, content, published, guid}] 목록을 최신순으로 돌려줍니다. (종목별 뉴스 인덱스, 최대 200개)"""
+    index = get_news_index()
+    is_korean_stock = ticker.endswith('.KS') or ticker.endswith('.KQ')
+    try:
+        if is_korean_stock:
+            rss_url = f"https://news.google.com/rss/search?q={query}+주식&hl=ko-KR&gl=KR&ceid=KR:ko"
+        else:
+            rss_url = f"https://news.google.com/rss/search?q={query}+stock&hl=en-US&gl=US&ceid=US:en"
+        response = http_get(rss_url, headers={'User-Agent': 'Mozilla/5.0'}, timeout=5, conditional=True)
+        ingest_feed(ticker, response.content, index)
+    except:
+        tracing.record_error()
+    news_list = index.items(ticker)
+
+    if not news_list:
+        try:
+            raw_news = [n for n in yf.Ticker(ticker).news[:100] if isinstance(n, dict) and 'title' in n and 'link' in n]
+            article_texts = fetch_article_texts([n['link'] for n in raw_news if not n.get('summary', '')])
+            for n in raw_news:
+                link = n['link']
+                title = n['title']
+                content = n.get('summary', '')
+                if not content:
+                    content = article_texts.get(link, "")
+                news_list.append({"title": title, "link": link, "content": content[:800].replace('\n', ' '),
+                                  "published": n.get('providerPublishTime')})
+        except:
+            tracing.record_error()
+    return news_list
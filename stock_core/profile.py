@@ -0,0 +1,125 @@
+"""화면과 프롬프트가 쓰는 기본 지표만 담은 종목 프로필.
+
+yfinance info는 키가 수백 개라 캐시에 통째로 두면 종목마다 메모리를 많이 차지하고, 쓸 때마다 여러 키 이름을
+차례로 확인해야 합니다. FundamentalProfile은 받는 즉시 필요한 항목만 숫자로 정규화하고(빈 값/0/N/A는 None)
+항목마다 값을 채운 출처(yfinance, naver, finviz)를 함께 기억합니다. dumps()/loads()는 캐시나 다른 프로세스와
+주고받을 수 있는 짧은 JSON 바이트입니다.
+
+    profile = profile_from_info(yf_info, 'yfinance').merged(profile_from_info(naver_data, 'naver'))
+    profile.trailing_pe, profile.source('trailing_pe')
+"""
+import json
+import math
+
+# 항목 -> info에서 찾을 키 후보 (앞의 것 우선). 네이버/Finviz 스크래핑 결과도 같은 yfinance 키를 씁니다.
+PROFILE_KEYS = {
+    'market_cap': ['marketCap'],
+    'trailing_pe': ['trailingPE', 'trailingPe', 'PE'],
+    'forward_pe': ['forwardPE', 'forwardPe'],
+    'pb': ['priceToBook', 'pbr', 'priceBook'],
+    'psr': ['priceToSalesTrailing12Months', 'priceToSales', 'psr'],
+    'peg': ['pegRatio', 'peg'],
+    'ev_ebitda': ['enterpriseToEbitda', 'evToEbitda'],
+    'roe': ['returnOnEquity', 'roe'],
+    'roa': ['returnOnAssets', 'roa'],
+    'roic': ['returnOnCapitalEmployed', 'roic'],
+    'gross_margin': ['grossMargins', 'grossMargin'],
+    'op_margin': ['operatingMargins', 'operatingMargin'],
+    'net_margin': ['profitMargins', 'netMargin'],
+    'rev_growth': ['revenueGrowth'],
+    'div_yield': ['dividendYield'],
+    'debt': ['debtToEquity'],
+    'current_ratio': ['currentRatio'],
+    'quick_ratio': ['quickRatio'],
+    'high_52': ['fiftyTwoWeekHigh'],
+    'low_52': ['fiftyTwoWeekLow'],
+}
+PROFILE_FIELDS = tuple(PROFILE_KEYS)
+PROFILE_SOURCES = ('yfinance', 'naver', 'finviz')
+# dumps() 형식이 바뀌면 올려서 예전 바이트를 읽지 않게 합니다.
+PROFILE_VERSION = 1
+
+
+def as_number(v):
+    try:
+        f = float(v)
+        return None if math.isnan(f) or math.isinf(f) else f
+    except:
+        return None
+
+
+def first_value(info, keys):
+    # 키 후보 중 처음으로 0이 아닌 유한한 숫자가 있는 값 (없으면 None)
+    for k in keys:
+        v = as_number(info.get(k))
+        if v:
+            return v
+    return None
+
+
+class FundamentalProfile:
+    """PROFILE_FIELDS 항목(숫자 또는 None)과 provenance(항목 순서의 출처 또는 None)를 담습니다.
+
+    캐시에 그대로 들어가므로 고치지 말고, 합칠 때는 merged()로 새 프로필을 만드세요.
+    """
+    __slots__ = PROFILE_FIELDS + ('provenance',)
+
+    def __init__(self, values=None, provenance=None):
+        values = values or (None,) * len(PROFILE_FIELDS)
+        for name, value in zip(PROFILE_FIELDS, values):
+            setattr(self, name, value)
+        self.provenance = tuple(provenance or (None,) * len(PROFILE_FIELDS))
+
+    def values(self):
+        return tuple(getattr(self, name) for name in PROFILE_FIELDS)
+
+    @property
+    def empty(self):
+        return all(v is None for v in self.values())
+
+    def source(self, name):
+        return self.provenance[PROFILE_FIELDS.index(name)]
+
+    def merged(self, other):
+        """비어 있는 항목만 other의 값(과 출처)으로 채운 새 프로필을 돌려줍니다."""
+        pairs = [
+            (v, src) if v is not None else (ov, osrc)
+            for v, src, ov, osrc in zip(self.values(), self.provenance, other.values(), other.provenance)
+        ]
+        return FundamentalProfile([v for v, _ in pairs], [src for _, src in pairs])
+
+    def to_dict(self):
+        return {
+            **dict(zip(PROFILE_FIELDS, self.values())),
+            "provenance": {name: src for name, src in zip(PROFILE_FIELDS, self.provenance) if src},
+        }
+
+    def dumps(self):
+        # [버전, 값 목록, 출처 번호 목록(-1은 없음)]
+        sources = [PROFILE_SOURCES.index(src) if src else -1 for src in self.provenance]
+        return json.dumps([PROFILE_VERSION, self.values(), sources], separators=(',', ':')).encode('utf-8')
+
+    @classmethod
+    def loads(cls, data):
+        version, values, sources = json.loads(data)
+        if version != PROFILE_VERSION or len(values) != len(PROFILE_FIELDS):
+            raise ValueError(f"지원하지 않는 프로필 형식입니다: {version}")
+        return cls(values, [PROFILE_SOURCES[i] if i >= 0 else None for i in sources])
+
+    def __eq__(self, other):
+        if not isinstance(other, FundamentalProfile):
+            return NotImplemented
+        return self.values() == other.values() and self.provenance == other.provenance
+
+    def __repr__(self):
+        filled = ", ".join(f"{name}={value!r}" for name, value in zip(PROFILE_FIELDS, self.values()) if value is not None)
+        return f"FundamentalProfile({filled})"
+
+
+EMPTY_PROFILE = FundamentalProfile()
+
+
+def profile_from_info(info, source):
+    """yfinance info 키 기준 dict에서 프로필 항목만 뽑습니다. source: PROFILE_SOURCES 중 하나"""
+    values = [first_value(info, keys) for keys in PROFILE_KEYS.values()]
+    return FundamentalProfile(values, [source if v is not None else None for v in values])
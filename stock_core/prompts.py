@@ -0,0 +1,296 @@
+"""AI 분석 버튼별 프롬프트 조립과 프롬프트 크기 관리.
+
+입력 토큰 수가 Gemini 응답 시간과 비용을 좌우하므로, 버튼마다 뉴스에 쓸 토큰 예산을 정해 두고
+거의 같은 헤드라인은 SimHash로 걸러낸 뒤 최신성/관련도 순으로 예산 안에서만 담습니다.
+가격 표는 최근 봉은 그대로, 오래된 봉은 몇 개씩 묶고 가격대에 맞게 자릿수를 줄여 보냅니다.
+(증감값 인코딩은 지지/저항 가격을 직접 읽어야 하는 분석 품질을 떨어뜨려 쓰지 않습니다.)
+"""
+import functools
+import hashlib
+import math
+import re
+import time
+
+import pandas as pd
+
+from .history import decimate_ohlc, load_price_history, positive_prices
+from .indicators import add_indicators
+from .metrics import fmt_flt, fmt_pct, format_large_number, trend_table
+from .resolver import char_ngrams
+
+NEWS_TOKEN_BUDGETS = {
+    'chart': 1500, 'financial': 2000, 'news_briefing': 6000, 'sentiment': 6000, 'report': 4000,
+}
+NEWS_DUPLICATE_DISTANCE = 3
+NEWS_RECENCY_HALF_LIFE = 60 * 60 * 48
+PRICE_TABLE_RECENT_ROWS = 60
+PRICE_TABLE_OLDER_ROWS = 90
+PRICE_TABLE_OLDER_STEP = 3
+# AI 차트 분석에 넘기는 주기별 이동평균 창
+ANALYSIS_MA_WINDOWS = {"1d": [5, 20, 60, 120], "1wk": [13, 26, 52], "1mo": [9, 24, 60]}
+
+
+def estimate_tokens(text):
+    # 토크나이저 없이 쓰는 근사치: 영문/숫자는 4자당 1토큰, 한글 등은 1.5자당 1토큰 정도로 셉니다.
+    ascii_chars = sum(1 for ch in text if ord(ch) < 128)
+    return int(ascii_chars / 4 + (len(text) - ascii_chars) / 1.5) + 1
+
+
+def normalize_headline(title):
+    # 구글 뉴스 제목 끝의 ' - 언론사'를 떼고 공백/기호를 정리합니다.
+    title = re.sub(r"\s+-\s+[^-]+$", "", title or "")
+    return re.sub(r"[\W_]+", "", title.lower())
+
+
+def simhash(text, bits=64):
+    weights = [0] * bits
+    for gram in char_ngrams(text, 3):
+        h = int.from_bytes(hashlib.blake2b(gram.encode('utf-8'), digest_size=8).digest(), 'big')
+        for i in range(bits):
+            weights[i] += 1 if (h >> i) & 1 else -1
+    return sum(1 << i for i in range(bits) if weights[i] > 0)
+
+
+@functools.lru_cache(maxsize=4096)
+def headline_signature(title):
+    # 뉴스 인덱스의 기사는 버튼을 누를 때마다 다시 들어오므로 제목별 simhash를 기억해 둡니다.
+    return simhash(normalize_headline(title))
+
+
+def dedupe_news(news_list, max_distance=NEWS_DUPLICATE_DISTANCE):
+    kept, signatures = [], []
+    for item in news_list:
+        sig = headline_signature(item['title'])
+        if any(bin(sig ^ other).count('1') <= max_distance for other in signatures):
+            continue
+        signatures.append(sig)
+        kept.append(item)
+    return kept
+
+
+def rank_news(news_list, query_terms, now=None):
+    """제목/본문에 종목명이 나오는 기사와 최근 기사가 앞에 오도록 정렬합니다."""
+    now = now or time.time()
+    terms = [t.lower() for t in query_terms if t]
+
+    def score(pair):
+        position, item = pair
+        text = f"{item['title']} {item.get('content', '')}".lower()
+        relevance = sum(2 if term in item['title'].lower() else 1 for term in terms if term in text)
+        published = item.get('published')
+        # 발행 시각이 없으면 피드 순서(대체로 최신순)를 대신 씁니다.
+        recency = 0.5 ** ((now - published) / NEWS_RECENCY_HALF_LIFE) if published else 1.0 / (1 + position)
+        return relevance + 2 * recency
+
+    return [item for _, item in sorted(enumerate(news_list), key=score, reverse=True)]
+
+
+def build_news_context(news_list, token_budget, query_terms):
+    """중복 제거·정렬한 뉴스를 토큰 예산 안에서 프롬프트용 텍스트로 만듭니다."""
+    ranked = rank_news(dedupe_news(news_list), query_terms)
+    parts, used = [], 0
+    for item in ranked:
+        entry = f"[{len(parts)+1}] 제목: {item['title']}\n본문: {item.get('content') or '본문 없음'}"
+        cost = estimate_tokens(entry)
+        if used + cost > token_budget:
+            # 본문까지는 안 들어가도 제목만이라도 들어가면 담습니다.
+            entry = f"[{len(parts)+1}] 제목: {item['title']}"
+            cost = estimate_tokens(entry)
+            if used + cost > token_budget:
+                continue
+        parts.append(entry)
+        used += cost
+    return "\n\n".join(parts) if parts else "수집된 실시간 데이터가 없습니다."
+
+
+def price_decimals(df):
+    if df.empty:
+        return 2
+    level = float(df['Close'].abs().median())
+    return 0 if level >= 1000 else 1 if level >= 100 else 2
+
+
+def compact_price_table(df, recent_rows=PRICE_TABLE_RECENT_ROWS, older_rows=PRICE_TABLE_OLDER_ROWS, older_step=PRICE_TABLE_OLDER_STEP):
+    """최근 recent_rows개 봉은 그대로, 그 이전 older_rows개 봉은 older_step개씩 묶어 CSV로 만듭니다."""
+    recent = df.tail(recent_rows)
+    older = df.iloc[max(0, len(df) - recent_rows - older_rows):max(0, len(df) - recent_rows)]
+    if not older.empty and older_step > 1:
+        older, _ = decimate_ohlc(older, math.ceil(len(older) / older_step))
+    table = pd.concat([older, recent])
+    table.index = table.index.strftime('%Y-%m-%d')
+    decimals = price_decimals(df)
+    table = table.round(decimals)
+    if decimals == 0:
+        table = table.astype('Int64')
+    return table.to_csv(header=True)
+
+
+def analysis_price_table(ticker, interval, start, end):
+    """start~end(date) 구간의 가격과 이동평균을 AI 차트 분석용 압축 CSV로 만듭니다."""
+    ma_windows = ANALYSIS_MA_WINDOWS[interval]
+    history = positive_prices(load_price_history(ticker, interval))
+    history = add_indicators(ticker, interval, history, ma_windows)
+    mask = (history.index.date >= start) & (history.index.date <= end)
+    cols = ['Open', 'High', 'Low', 'Close'] + [f'MA_{w}' for w in ma_windows]
+    return compact_price_table(history.loc[mask, cols])
+
+
+def ma_context_text(history, ma_labels, price_fmt, currency):
+    """[(창, 이름)]마다 마지막 이동평균 값을 '이름: 값 / 이름: 값' 형태로 만듭니다. (종합 리포트용)"""
+    parts = []
+    for w, name in ma_labels:
+        val = history[f'MA_{w}'].iloc[-1]
+        val_str = f"{val:{price_fmt}} {currency}" if pd.notna(val) else "데이터 부족"
+        parts.append(f"{name}: {val_str}")
+    return " / ".join(parts)
+
+
+# ====================== 버튼별 프롬프트 ======================
+# m은 metrics.ValuationMetrics, s는 metrics.StatementSummary입니다.
+
+def chart_prompt(ticker, news_context, daily_csv, weekly_csv, monthly_csv, currency):
+    return f"""종목 {ticker}의 일봉, 주봉, 월봉 전체 가격(시가/고가/저가/종가) 및 이동평균선(MA) 데이터와 최신 시장 동향입니다.
+
+[최신 시장 동향 백그라운드 (참고용)]
+{news_context}
+
+[일봉 차트 데이터 내역 (Open, High, Low, Close, MAs)]
+{daily_csv}
+
+[주봉 차트 데이터 내역]
+{weekly_csv}
+
+[월봉 차트 데이터 내역]
+{monthly_csv}
+
+위 데이터를 바탕으로 실전 트레이더 수준의 깊이 있는 '기술적 분석(Technical Analysis)' 리포트를 작성해주세요.
+
+[🚨 기술적 분석 핵심 지시사항 🚨]
+1. [프라이스 액션 중심 분석]: 이동평균선(MA) 수치만 기계적으로 나열하지 마세요!! 제공된 시가(Open), 고가(High), 저가(Low), 종가(Close) 데이터를 종합하여 캔들의 형태, 고점/저점의 돌파 여부, 심리적 지지와 저항선, 변동성 등 실전적인 **'프라이스 액션(Price Action)'** 관점으로 폭넓게 분석하세요.
+2. [정보 필터링]: 일봉, 주봉, 월봉을 모두 확인하되, 추세 설명에 꼭 필요한 유의미한 기술적 단서(특정 가격대, 매물대, 주요 돌파 지점 등)만 선별해서 자연스럽게 제시하세요.
+3. [이동평균선 표기 규칙]: 이동평균선을 언급할 때 '13-주 이동평균선'처럼 숫자와 단위 사이에 하이픈(-)을 절대 넣지 마세요. 반드시 '13주 이동평균선', '20일 이동평균선'과 같이 올바른 한국어로 작성하세요.
+4. 마크다운 수식 오류 방지: 가격 범위나 기간 표시 시 절대 물결표 및 달러 기호를 사용하지 마세요. (금액은 반드시 '{currency}'로 표기할 것)
+5. [가독성 철저]: 글머리 기호(-, *, • 등 땡땡 표시)를 절대 사용하지 마세요. 소제목은 마크다운 헤딩(###)으로 작성하고, 문단과 문단 사이에는 빈 줄(Enter 2번)을 넣어 완벽하게 분리하세요.
+6. [핵심 강조]: 분석 내용 중 핵심이 되는 중요한 단어나 문장 및 주요 지지/저항 가격은 반드시 **굵은 글씨(**)**로 강조해서 한눈에 들어오게 하세요. 단, 폰트 크기나 색상은 절대 변경하지 마세요.
+7. [어조 설정]: 반드시 '~습니다', '~입니다' 형태의 정중체를 사용하세요.
+8. [항목 제한]: 분석 항목은 무조건 '1. 단기적인 추세', '2. 장기적인 추세' 딱 두 가지만 출력하세요.
+9. [뉴스 및 기사 수 언급 절대 금지]: 당신은 100개의 최신 시장 동향 기사를 배경지식으로 제공받았지만, 출력물에 '100개의 기사를 분석했습니다', '뉴스에 따르면' 등의 언급을 절대 하지 마세요. 오직 차트와 가격 움직임을 바탕으로 하되, 배경지식을 활용해 틀린 분석(환각)을 하지 않는 용도로만 조용히 참고하세요.
+
+[출력 형식 가이드]
+### 1. 단기적인 추세 (Short-term trend)
+
+단기적인 가격 흐름과 매수/매도 모멘텀을 분석합니다. 유의미할 경우에 한해 프라이스 액션(캔들 흐름), 주요 지지/저항 가격, 단기 이평선 등을 근거로 자연스럽게 제시하세요. 글머리 기호 없이 일반 문단으로 작성하세요.
+
+### 2. 장기적인 추세 (Long-term trend)
+
+일/주/월봉을 아우르는 큰 흐름에서의 추세와 차트 구조를 분석합니다. 유의미할 경우에 한해 중장기 추세선, 거시적 가격대 돌파 여부 등을 언급하세요. 글머리 기호 없이 일반 문단으로 작성하세요.
+"""
+
+
+def statement_trend_text(history):
+    # 최근 결산부터 다년 지표를 CSV로 (지표 이름, 기간별 값)
+    if history.empty:
+        return "재무제표 데이터 부족\n"
+    return trend_table(history).to_csv()
+
+
+def financial_prompt(ticker, news_context, m, s, currency, trend_text):
+    return f"""종목 {ticker}의 상세 재무 데이터 및 최신 동향 텍스트입니다.
+
+[최신 동향 데이터]
+{news_context}
+
+[가치 및 수익성 지표]
+시가총액: {format_large_number(m.market_cap, currency)}, Trailing PER: {m.trailing_pe}, Forward PER: {m.forward_pe}, PBR: {m.pb}, PSR: {fmt_flt(m.psr)}, PEG: {fmt_flt(m.peg)}, EV/EBITDA: {fmt_flt(m.ev_ebitda)}
+ROE: {fmt_pct(m.roe)}, ROA: {fmt_pct(m.roa)}, ROIC: {fmt_pct(m.roic)}, 매출 성장률: {fmt_pct(m.rev_growth)}, 배당 수익률: {fmt_pct(m.div_yield, is_dividend=True)}
+매출총이익률: {fmt_pct(m.gross_margin)}, 영업이익률: {fmt_pct(m.op_margin)}, 순이익률: {fmt_pct(m.net_margin)}
+[안정성 지표]
+부채비율: {m.debt}%, 유동비율: {fmt_flt(m.current_ratio)}, 당좌비율: {fmt_flt(m.quick_ratio)}, 이자보상배율: {fmt_flt(m.interest_cov)}
+[손익계산서]
+매출액: {s.rev}, 매출원가: {s.cogs}, 매출총이익: {s.gp}, 판매관리비: {s.sga}, 영업이익: {s.op}, 법인세차감전순이익: {s.pretax}, 당기순이익: {s.net}, 기타포괄손익: {s.oci}
+[재무상태표]
+자산총계: {s.tot_assets} (유동자산: {s.cur_assets} [현금성자산: {s.cash}, 매출채권: {s.receiv}, 재고자산: {s.inv}], 비유동자산: {s.ncur_assets} [유형자산: {s.tangible}, 무형자산: {s.intangible}])
+부채총계: {s.tot_liab} (유동부채: {s.cur_liab} [단기차입금: {s.s_debt}], 비유동부채: {s.ncur_liab} [장기차입금: {s.l_debt}])
+자본총계: {s.tot_eq} (자본금: {s.cap_stock}, 자본잉여금: {s.cap_surplus}, 이익잉여금: {s.retained})
+[현금흐름표]
+기초현금: {s.cf_beg}, 영업활동현금흐름: {s.cf_op}, 투자활동현금흐름: {s.cf_inv}, 재무활동현금흐름: {s.cf_fin}, 배당금지급: {s.dividend}, 기말현금: {s.cf_end}
+[다년 재무 추이 (연간 결산, 최근 순)]
+{trend_text}
+이 모든 세부 재무 수치들을 종합적으로 분석하여 다음을 객관적으로 평가해주세요:
+1. 현재 기업 가치의 고평가 또는 저평가 여부
+2. 기업의 재무적 안전성 및 리스크 판단
+3. 기업의 수익성 및 미래 성장 가능성
+
+🚨 [최고급 애널리스트 수준의 입체적 분석 지침 - 반드시 엄수할 것]
+- [어조 설정]: 반드시 '~습니다', '~입니다' 형태의 정중체를 사용하세요. 반말은 절대 금지하며, 지나치게 깍듯한 극존칭은 피하고 깔끔한 전문가 톤을 유지하세요.
+- [가독성 철저]: 글머리 기호(-, *, • 등 땡땡 표시)를 절대 사용하지 마세요! 1, 2, 3번 각 평가 항목은 마크다운 헤딩(###)으로 크고 명확하게 달고, 세부 분석은 빈 줄(Enter 2번)로 단락을 나누어 시원시원한 일반 문단으로 작성하세요.
+- [핵심 강조]: 분석 내용 중 핵심이 되는 중요한 단어나 문장은 반드시 **굵은 글씨(**)**로 강조해서 한눈에 들어오게 하세요. 단, 폰트 크기나 색상은 절대 임의로 변경하지 마세요.
+- [재무 지표 중심의 서술]: 제공된 텍스트 동향은 오직 '재무 지표의 원인과 결과'를 파악하는 데만 조용히 참고하세요. 기술적 차트 이야기나 가십성 이슈는 철저히 배제하고, 철저히 '재무적 관점(수익성, 안정성, 현금흐름, 밸류에이션)'에만 집중해서 평가하세요.
+- [뉴스 및 기사 수 언급 절대 금지]: "제공된 데이터에 따르면", "수집된 기사/뉴스에서", "100개의 기사를 분석했습니다" 등의 표현을 완벽하게 금지합니다. '뉴스', '기사', '헤드라인', '100개'라는 단어 자체를 출력문에 쓰지 마세요. 오직 당신이 직접 팩트를 분석한 것처럼 유려하게 서술하세요.
+- [입체적 재무 해석]: 부채비율이 높거나 자본잠식 상태일 때, 무조건 '착한 부채'로 포장하지 마세요. 이자보상배율, 현금흐름, 대규모 투자(CapEx) 등의 맥락을 융합하여 실제 시장이 우려하는 재무적 리스크인지 성장을 위한 통과 의례인지 객관적으로 판단하세요.
+- [작위적 표현 금지]: "표면적 지표 이면의", "숫자 이면의 진짜 리스크", "숨겨진 리스크" 등 시스템 프롬프트의 지시어 느낌이 나는 단어를 절대 출력하지 마세요.
+- 마크다운 렌더링 오류를 막기 위해 절대 물결표 및 달러 기호를 사용하지 마세요. (금액은 반드시 '{currency}'으로 표기할 것)
+"""
+
+
+def news_briefing_prompt(ticker, today_date, news_context):
+    return f"오늘은 {today_date}입니다. 방금 시스템이 실시간으로 수집한 {ticker}의 최신 기사 데이터입니다.\n\n[실시간 시장 동향 데이터]\n{news_context}\n\n위 데이터의 본문 내용까지 꼼꼼하게 읽고, 현재 이 기업을 둘러싼 가장 치명적이고 중요한 핵심 이슈 3가지를 도출해주세요. 각 이슈가 기업의 펀더멘털이나 향후 실적에 미칠 파급력까지 전문가의 시선으로 깊이 있게 브리핑해주세요.\n\n🚨 [지시사항]: \n- [어조 설정]: 반드시 '~습니다', '~입니다' 형태의 정중체를 사용하세요. 반말은 절대 금지하며, 지나치게 깍듯한 극존칭은 피하고 깔끔한 전문가 톤을 유지하세요.\n- [가독성 철저]: 글머리 기호(-, *, • 등 땡땡 표시)를 절대 사용하지 마세요! 3가지 핵심 이슈는 마크다운 헤딩(###)과 숫자로 큼직하게 제목을 달고, 그 아래에 빈 줄(Enter 2번)을 띄운 뒤 일반 문단으로 길게 설명하세요.\n- [핵심 강조]: 분석 내용 중 핵심이 되는 중요한 단어나 문장(예: **호실적 발표**, **공급망 이슈** 등)은 반드시 **굵은 글씨(**)**로 강조하세요. 단, 폰트 크기나 색상은 절대 임의로 변경하지 마세요.\n- 기사의 제목이나 본문 문장을 절대(Never) 따옴표로 묶어 그대로 인용하거나 복사하지 마세요. '기사에 따르면', '뉴스에서' 같은 단어도 절대 쓰지 마세요. 여러 기사의 맥락을 하나로 꿰어내어 완전히 당신만의 언어로 소화해서 작성하세요. 물결표 및 달러 기호 사용 금지.\n- [기사 수 언급 절대 금지]: '100개의 기사를 분석했습니다', '다수의 기사에서'와 같이 수집된 기사의 개수나 규모를 직접적으로 절대 언급하지 마세요."
+
+
+def sentiment_prompt(ticker, today_date, news_context):
+    return f"오늘은 {today_date}입니다. 방금 수집된 {ticker}의 최신 기사 데이터입니다.\n\n[실시간 시장 동향 데이터]\n{news_context}\n\n이 데이터들을 바탕으로 현재 시장 참여자들의 숨은 투자 심리(Fear & Greed)를 꿰뚫어 보고, 이것이 단기 및 중장기 주가 흐름에 어떤 압력(호재/악재)으로 작용할지 논리적으로 분석해주세요.\n\n🚨 [지시사항]: \n- [어조 설정]: 반드시 '~습니다', '~입니다' 형태의 정중체를 사용하세요. 반말은 절대 금지하며, 지나치게 깍듯한 극존칭은 피하고 깔끔한 전문가 톤을 유지하세요.\n- [가독성 철저]: 글머리 기호(-, *, • 등 땡땡 표시)를 절대 사용하지 마세요! 단기 및 중장기 분석 시 마크다운 헤딩(###)으로 소제목을 달고, 그 아래에 빈 줄을 띄워 일반 문단으로 시원하게 작성하세요.\n- [핵심 강조]: 분석 내용 중 핵심이 되는 중요한 투심이나 결론은 반드시 **굵은 글씨(**)**로 강조해서 가독성을 높이세요. 폰트 크기/색상은 절대 변경 금지.\n- 기사의 제목이나 본문 문장을 절대 그대로 인용(복사)하지 마세요. '수집된 뉴스에 의하면' 같은 어색한 말도 금지합니다. 거시경제나 산업 전반의 흐름을 엮어서 당신의 지식인 것처럼 꼼꼼하게 해석해주세요. 물결표 및 달러 기호 사용 금지.\n- [기사 수 언급 절대 금지]: '100개의 기사를 분석했습니다', '다수의 기사에서'와 같이 수집된 기사의 개수나 규모를 직접적으로 절대 언급하지 마세요."
+
+
+def report_prompt(ticker, today_date, current_price, high_52, low_52, ma_context, m, s, news_context, currency, price_fmt):
+    return f"""
+오늘은 {today_date}입니다. {ticker} 종목을 종합적으로 분석해주세요.
+
+[1. 현재 가격 및 기술적 지표]
+- 현재가: {current_price:{price_fmt}} {currency}
+- 52주 최고/최저: {high_52:{price_fmt}} {currency} / {low_52:{price_fmt}} {currency}
+- 이동평균선 최근값: {ma_context}
+
+[2. 주요 재무 및 펀더멘털 지표]
+- 시가총액: {format_large_number(m.market_cap, currency)}, Trailing PER: {m.trailing_pe}, Forward PER: {m.forward_pe}, PBR: {m.pb}, PEG: {fmt_flt(m.peg)}
+- ROE: {fmt_pct(m.roe)}, 영업이익률: {fmt_pct(m.op_margin)}, 순이익률: {fmt_pct(m.net_margin)}, 부채비율: {m.debt}%
+- 매출액: {s.rev}, 영업이익: {s.op}, 당기순이익: {s.net}, 영업활동현금흐름: {s.cf_op}
+- 배당 수익률: {fmt_pct(m.div_yield, is_dividend=True)}
+
+[3. 최신 시장 동향 및 기사 본문 요약]
+\n{news_context}
+
+반드시 다음 4가지 항목을 포함하여 최고급 애널리스트처럼 한국어로 명확하게 작성해주세요.
+
+1. 재무 상황 종합 평가
+2. 시장 투심 및 향후 주가 흐름 예상
+3. 상황별 대응 전략 (현재 보유자 / 신규 매수 대기자 / 매도 고려자)
+4. 구체적인 가격 제시 (진입 추천가, 1차 목표가, 손절가)
+
+[출력 형식 가이드]
+- 글머리 기호(-, *, • 등 땡땡 표시)는 일절 사용하지 마세요.
+- 각 항목의 제목(1, 2, 3, 4번)은 마크다운 헤딩(## 또는 ###)을 사용하여 크게 작성하세요.
+- 제목 아래에는 반드시 빈 줄(Enter 2번)을 띄우고 일반 문단으로 줄글을 작성하세요.
+
+[4번 항목 작성 예시]
+### 4. 구체적인 가격 제시
+
+진입 추천가: 000 원
+
+논리적 근거: 차트를 분석하여 유의미한 기술적 지표(이평선, 지지/저항선 등)나 재무적 근거가 있을 경우에만 이를 포함하여 논리적으로 작성합니다.
+
+1차 목표가: 000 원
+
+논리적 근거: ... (필요한 경우에만 특정 기술적/가격적 근거를 자연스럽게 엮어서 설명)
+
+🚨 [최고급 퀀트 애널리스트 수준의 입체적 분석 지침 - 반드시 엄수할 것]
+- [어조 설정]: 반드시 '~습니다', '~입니다' 형태의 정중체를 사용하세요. 반말은 절대 금지하며, 지나치게 깍듯한 극존칭은 피하고 깔끔한 전문가 톤을 유지하세요.
+- [가독성 철저]: 위 형식 가이드를 완벽히 지켜서, 땡땡 표시 없이 제목과 문단 구분을 통해 마치 잘 쓰여진 신문 기사나 리포트 본문처럼 보이게 하세요.
+- [균형 잡힌 차트 분석]: 기술적 지표를 언급할 때 이동평균선에만 집착하지 말고, 큰 틀에서의 가격 흐름(Price Action)과 지지/저항, 추세 등을 다각도로 고려하여 자연스럽게 설명하세요.
+- [핵심 강조]: 전체 리포트에서 핵심이 되는 주요 단어나 결과 문장은 반드시 **굵은 글씨(**)**로 강조해서 핵심을 짚어주세요. 폰트 변경은 불가합니다.
+- [직접 인용 및 작위적 표현 완벽 금지]: 리포트 내에 '뉴스', '기사', '헤드라인'이라는 단어를 아예 사용하지 마세요. 기사 문장을 절대 복사하지 마세요. 또한 "표면적 지표 이면의", "숨겨진 리스크" 같은 시스템 지시어 느낌의 단어 자체를 쓰지 마세요. 마치 당신이 현업에서 직접 시장을 모니터링하며 얻은 팩트인 것처럼 유려하게 서술하세요.
+- [배경 지식 총동원]: 제공된 수치와 텍스트에만 갇히지 마세요. 당신이 학습한 해당 기업의 최근 거시경제(금리, 인플레 등) 환경, 산업 트렌드(AI, 반도체 등),경쟁사 동향, 대규모 투자(CapEx) 현황을 융합하여 인과관계를 설명하세요.
+- [맹목적 긍정 금지 및 리스크 직시]: 부채비율이 높거나 자본잠식 상태일 때, 무조건 주주환원에 의한 '착한 부채'로 포장하지 마세요. '이자보상배율', '현금흐름', '동향'을 교차 검증하여, 과도한 인프라/M&A 투자로 인한 이자 부담이나 시장이 실제로 우려하는 치명적 리스크라면 아주 냉철하게 경고하세요.
+- [시장 심리(Fear & Greed) 통찰]: 주가가 크게 하락했거나 변동성이 크다면, 동향의 행간 의미를 파악해 현재 시장 참여자들이 무엇에 공포를 느끼고 있는지 평가에 명확히 반영하세요.
+- 마크다운 렌더링 오류를 막기 위해 절대 물결표 및 달러 기호를 사용하지 마세요. (금액은 반드시 '{currency}'으로 표기할 것)
+- [기사 수 언급 절대 금지]: '100개의 기사를 분석했습니다', '다수의 기사에서'와 같이 수집된 기사의 개수나 규모를 직접적으로 절대 언급하지 마세요.
+"""
@@ -0,0 +1,133 @@
+"""자주 찾는 종목의 데이터를 만료 전에 미리 다시 받아 두는 백그라운드 갱신기.
+
+종목을 열 때마다 track_ticker()로 인기도를 올리고(반감기 HOT_HALF_LIFE로 감쇠), 점수가 REFRESH_MIN_SCORE 이상인
+종목 중 상위 REFRESH_TOP_N개의
+현재가/일봉/기본 정보/보충 지표/재무제표/뉴스 캐시가 유효 시간의 REFRESH_AHEAD 비율을 넘기면 미리 새로 받습니다.
+미처 갱신하지 못한 값도 ttl_cache의 stale_ttl 동안은 예전 값을 바로 돌려주므로, 화면은 거의 외부 응답을 기다리지 않습니다.
+
+    STOCK_TERMINAL_REFRESH_TOP_N=0 이면 갱신기를 띄우지 않습니다.
+"""
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from .caching import shared_resource
+from .fundamentals import STATEMENT_KINDS, load_info, load_scraped_fundamentals, load_statement
+from .history import load_daily_history, load_quote
+from .news import load_news
+
+REFRESH_TOP_N = int(os.environ.get("STOCK_TERMINAL_REFRESH_TOP_N", "20"))
+REFRESH_INTERVAL = 10
+REFRESH_AHEAD = 0.8
+REFRESH_POOL_SIZE = 4
+HOT_HALF_LIFE = 60 * 60
+HOT_MAX_TRACKED = 500
+# 한 번 연 종목(점수 1)은 반감기 한 번이 지나면 갱신 대상에서 빠집니다.
+REFRESH_MIN_SCORE = 0.5
+
+
+def refresh_jobs(ticker, news_query):
+    """종목 하나에 대해 미리 받아 둘 (캐시 함수, 인자) 목록입니다."""
+    jobs = [(load_quote, (ticker,)), (load_daily_history, (ticker,)),
+            (load_info, (ticker,)), (load_scraped_fundamentals, (ticker,))]
+    jobs += [(load_statement, (ticker, kind)) for kind in STATEMENT_KINDS]
+    jobs.append((load_news, (ticker, news_query)))
+    return jobs
+
+
+class HotTickerRefresher:
+    def __init__(self, top_n, interval, half_life, pool_size=REFRESH_POOL_SIZE, max_tracked=HOT_MAX_TRACKED,
+                 min_score=REFRESH_MIN_SCORE):
+        self.top_n = top_n
+        self.min_score = min_score
+        self.interval = interval
+        self.half_life = half_life
+        self.max_tracked = max_tracked
+        self._lock = threading.Lock()
+        self._scores = {}  # ticker -> [점수, 마지막 갱신 시각, 뉴스 검색어]
+        self._inflight = set()
+        self._pool = ThreadPoolExecutor(max_workers=pool_size, thread_name_prefix="refresh")
+        self._stop = threading.Event()
+        self._thread = None
+
+    def _decayed(self, score, updated, now):
+        return score * 0.5 ** ((now - updated) / self.half_life)
+
+    def _prune(self, now):
+        # 잠금을 잡은 채 부릅니다. 점수가 min_score 아래로 식은 종목은 더 추적하지 않습니다.
+        for ticker in [t for t, (score, updated, _) in self._scores.items() if self._decayed(score, updated, now) < self.min_score]:
+            del self._scores[ticker]
+
+    def touch(self, ticker, news_query):
+        now = time.monotonic()
+        with self._lock:
+            score, updated, _ = self._scores.get(ticker, (0.0, now, news_query))
+            self._scores[ticker] = [self._decayed(score, updated, now) + 1, now, news_query]
+            self._prune(now)
+            if len(self._scores) > self.max_tracked:
+                coldest = min(self._scores, key=lambda t: self._decayed(self._scores[t][0], self._scores[t][1], now))
+                del self._scores[coldest]
+
+    def hot(self):
+        """점수가 min_score 이상인 [(티커, 뉴스 검색어)]를 인기도 순으로 최대 top_n개 돌려줍니다."""
+        now = time.monotonic()
+        with self._lock:
+            self._prune(now)
+            ranked = sorted(self._scores.items(), key=lambda kv: self._decayed(kv[1][0], kv[1][1], now), reverse=True)
+        return [(ticker, news_query) for ticker, (_, _, news_query) in ranked[:self.top_n]]
+
+    def _refresh(self, key, fn, args):
+        # 실패하거나 빈 결과면 fn.refresh가 캐시의 예전 값을 그대로 둡니다.
+        try:
+            fn.refresh(*args)
+        except:
+            pass
+        finally:
+            with self._lock:
+                self._inflight.discard(key)
+
+    def run_once(self):
+        """만료가 가까운 항목을 갱신 풀에 올리고, 올린 개수를 돌려줍니다."""
+        submitted = 0
+        for ticker, news_query in self.hot():
+            for fn, args in refresh_jobs(ticker, news_query):
+                age = fn.age(*args)
+                if age is not None and age < fn.ttl * REFRESH_AHEAD:
+                    continue
+                key = (fn.__name__, args)
+                with self._lock:
+                    if key in self._inflight:
+                        continue
+                    self._inflight.add(key)
+                self._pool.submit(self._refresh, key, fn, args)
+                submitted += 1
+        return submitted
+
+    def _loop(self):
+        while not self._stop.wait(self.interval):
+            try:
+                self.run_once()
+            except:
+                pass
+
+    def start(self):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._loop, name="hot-ticker-refresher", daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        self._pool.shutdown(wait=False)
+
+
+@shared_resource
+def get_refresher():
+    refresher = HotTickerRefresher(REFRESH_TOP_N, REFRESH_INTERVAL, HOT_HALF_LIFE)
+    return refresher.start() if REFRESH_TOP_N > 0 else refresher
+
+
+def track_ticker(ticker, news_query):
+    """종목을 열 때 불러 인기도를 올립니다. (갱신기는 처음 부를 때 시작)"""
+    get_refresher().touch(ticker, news_query)
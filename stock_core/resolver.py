@@ -0,0 +1,206 @@
+"""입력한 종목명/코드/티커를 야후 파이낸스 티커로 바꿉니다.
+
+KRX 상장 목록과 미국 종목 별칭은 해시 인덱스로 바로 찾고, 부분 한글명은 2-gram 인덱스로 찾습니다.
+야후 검색이나 Gemini 번역을 거쳐 찾은 결과는 디스크 메모에 남겨 다음부터는 네트워크를 쓰지 않습니다.
+"""
+import json
+import os
+import re
+import threading
+import time
+from collections import Counter, defaultdict
+
+from . import tracing
+from .caching import get_shared_cache, shared_resource, ttl_cache
+from .config import CACHE_DIR
+from .http_transport import http_get
+from .llm import get_llm_client
+from .shared_cache import shared_key
+
+US_ALIASES = {
+    "애플": "AAPL", "테슬라": "TSLA", "엔비디아": "NVDA", "마이크로소프트": "MSFT",
+    "알파벳": "GOOGL", "구글": "GOOGL", "아마존": "AMZN", "메타": "META",
+    "넷플릭스": "NFLX", "마이크론": "MU", "인텔": "INTC", "AMD": "AMD"
+}
+TICKER_MEMO_PATH = os.path.join(CACHE_DIR, "ticker_memo.json")
+TICKER_MEMO_TTL = 60 * 60 * 24 * 30
+TICKER_MEMO_VERSION = 1
+FUZZY_MIN_SCORE = 0.5
+
+
+@ttl_cache()
+def load_krx_data():
+    # 상장 목록 조회는 느리므로 처음 종목을 찾을 때 한 번만 받아 둡니다.
+    import FinanceDataReader as fdr
+
+    return fdr.StockListing('KRX')
+
+
+def normalize_term(term):
+    return re.sub(r"\s+", "", term).upper()
+
+
+def char_ngrams(text, n=2):
+    if len(text) <= n:
+        return {text}
+    return {text[i:i + n] for i in range(len(text) - n + 1)}
+
+
+class TickerIndex:
+    """KRX 종목명/코드와 미국 종목 별칭을 해시 인덱스로, 부분 한글명은 2-gram 인덱스로 찾습니다."""
+    def __init__(self, krx_df, aliases):
+        self.exact = {}
+        self.names = []
+        self.grams = defaultdict(set)
+        for code, name, market in zip(krx_df['Code'], krx_df['Name'], krx_df['Market']):
+            symbol = f"{code}.KS" if market == 'KOSPI' else f"{code}.KQ"
+            key = normalize_term(str(name))
+            self.exact.setdefault(key, symbol)
+            self.exact.setdefault(str(code), symbol)
+            idx = len(self.names)
+            self.names.append((key, symbol))
+            for gram in char_ngrams(key):
+                self.grams[gram].add(idx)
+        for alias, symbol in aliases.items():
+            self.exact.setdefault(normalize_term(alias), symbol)
+
+    def lookup(self, term):
+        return self.exact.get(normalize_term(term))
+
+    def search(self, term, min_score=FUZZY_MIN_SCORE):
+        """접두어가 일치하는 가장 짧은 종목명(동률이면 상장 목록 순서), 없으면 2-gram 다이스 계수가 가장 높은 종목을 돌려줍니다."""
+        key = normalize_term(term)
+        if not key:
+            return None
+        query_grams = char_ngrams(key)
+        hits = Counter()
+        for gram in query_grams:
+            for idx in self.grams.get(gram, ()):
+                hits[idx] += 1
+        if not hits:
+            return None
+        prefixed = [idx for idx in hits if self.names[idx][0].startswith(key)]
+        if prefixed:
+            return self.names[min(prefixed, key=lambda i: (len(self.names[i][0]), i))][1]
+        best_idx, best_score = None, 0.0
+        for idx, common in hits.items():
+            score = 2.0 * common / (len(query_grams) + len(char_ngrams(self.names[idx][0])))
+            if score > best_score:
+                best_idx, best_score = idx, score
+        return self.names[best_idx][1] if best_score >= min_score else None
+
+
+class ResolutionMemo:
+    """야후 검색/Gemini 번역으로 찾은 티커를 디스크에 기억해 두는 메모입니다. 공유 캐시가 있으면 그곳에도 남깁니다."""
+    def __init__(self, path, ttl):
+        self.path = path
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        try:
+            with open(path, encoding='utf-8') as f:
+                self._entries = json.load(f)
+        except:
+            self._entries = {}
+
+    def get(self, term):
+        entry = self._entries.get(normalize_term(term))
+        if entry and time.time() - entry['at'] <= self.ttl:
+            return entry['symbol']
+        return self.get_shared(term)
+
+    def get_shared(self, term):
+        # 다른 레플리카가 찾아 둔 결과. 받아 온 것은 디스크에 다시 쓰지 않고 메모리에만 둡니다.
+        backend = get_shared_cache()
+        if backend is None:
+            return None
+        try:
+            raw = backend.get(shared_key('ticker', TICKER_MEMO_VERSION, normalize_term(term)))
+            if raw is None:
+                return None
+            entry = json.loads(raw)
+        except:
+            tracing.record_error()
+            return None
+        with self._lock:
+            self._entries[normalize_term(term)] = entry
+        return entry['symbol']
+
+    def put(self, term, symbol, source):
+        entry = {"symbol": symbol, "source": source, "at": time.time()}
+        backend = get_shared_cache()
+        if backend is not None:
+            try:
+                backend.set(shared_key('ticker', TICKER_MEMO_VERSION, normalize_term(term)),
+                            json.dumps(entry).encode('utf-8'), self.ttl)
+            except:
+                tracing.record_error()
+        with self._lock:
+            self._entries[normalize_term(term)] = entry
+            try:
+                os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+                tmp_path = f"{self.path}.tmp"
+                with open(tmp_path, 'w', encoding='utf-8') as f:
+                    json.dump(self._entries, f, ensure_ascii=False)
+                os.replace(tmp_path, self.path)
+            except:
+                pass
+
+
+@shared_resource
+def get_ticker_index():
+    return TickerIndex(load_krx_data(), US_ALIASES)
+
+
+@shared_resource
+def get_resolution_memo():
+    return ResolutionMemo(TICKER_MEMO_PATH, TICKER_MEMO_TTL)
+
+
+def search_yahoo_symbol(query):
+    url = f"https://query2.finance.yahoo.com/v1/finance/search?q={query}"
+    headers = {'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64)'}
+    res = http_get(url, headers=headers, timeout=5)
+    data = res.json()
+    if 'quotes' in data and len(data['quotes']) > 0:
+        for quote in data['quotes']:
+            if quote.get('type') in ['EQUITY', 'ETF']:
+                return quote['symbol']
+        return data['quotes'][0]['symbol']
+    return None
+
+
+def get_ticker_symbol(search_term):
+    search_term = search_term.strip()
+    index = get_ticker_index()
+
+    symbol = index.lookup(search_term)
+    if symbol: return symbol
+    memo = get_resolution_memo()
+    symbol = memo.get(search_term)
+    if symbol: return symbol
+    # 한글이 섞인 입력은 부분 종목명(예: '삼성전')일 수 있으므로 유사 종목명을 먼저 찾아봅니다.
+    if re.search(r"[가-힣]", search_term):
+        symbol = index.search(search_term)
+        if symbol: return symbol
+
+    try:
+        symbol = search_yahoo_symbol(search_term)
+        if symbol:
+            memo.put(search_term, symbol, "yahoo")
+            return symbol
+    except:
+        tracing.record_error()
+    try:
+        translate_prompt = f"""당신은 세계 최고의 주식 종목 번역 전문가입니다.
+다음 한국어 주식 종목명을 정확한 영어 공식명으로 번역해주세요.
+답변은 영어 종목명만 한 줄로 출력하세요. 다른 설명 절대 금지.
+종목명: {search_term}"""
+        eng_name = get_llm_client().generate(translate_prompt).strip()
+        symbol = search_yahoo_symbol(eng_name)
+        if symbol:
+            memo.put(search_term, symbol, "gemini")
+            return symbol
+    except:
+        tracing.record_error()
+
+    return search_term.upper()
@@ -0,0 +1,300 @@
+"""여러 프로세스(Streamlit 레플리카, API 워커)가 함께 쓰는 캐시 저장소.
+
+STOCK_TERMINAL_SHARED_CACHE로 저장소를 고릅니다. 비워 두면 지금처럼 프로세스 안에서만 캐시합니다.
+
+    sqlite:///.cache/shared.sqlite3   같은 호스트(또는 공유 볼륨)의 프로세스끼리 SQLite 파일 하나를 씁니다.
+    redis://cache:6379/0              Redis 프로토콜(RESP) 서버. 아래 대역 서버나 실제 Redis 모두 됩니다.
+
+키는 "stock:{SCHEMA_VERSION}:{이름공간}:v{버전}:{해시}" 형식이라, 값 인코딩을 바꾸면 SCHEMA_VERSION을,
+한 함수의 반환 형식을 바꾸면 그 함수의 버전을 올려 예전 값을 읽지 않게 합니다.
+SQLite 저장소는 전체 크기가 max_bytes를 넘으면 오래 안 쓴 항목부터 지웁니다. Redis는 서버의
+maxmemory/allkeys-lru 설정이 크기를 제한하고, 대역 서버는 SQLite 저장소를 그대로 써서 같은 방식으로 제한합니다.
+값은 pickle이므로 신뢰하는 내부망의 저장소만 지정하세요.
+
+    python -m stock_core.shared_cache --port 6380 --path .cache/shared.sqlite3 --max-mb 512
+"""
+import argparse
+import hashlib
+import os
+import pickle
+import socket
+import socketserver
+import sqlite3
+import threading
+import time
+import zlib
+from urllib.parse import unquote, urlparse
+
+SCHEMA_VERSION = 1
+KEY_PREFIX = "stock"
+REDIS_TIMEOUT = 1.0
+# 연결이 실패하면 이 시간 동안은 저장소를 건너뛰고 바로 직접 계산합니다.
+REDIS_RETRY_DELAY = 30
+EVICT_EVERY = 32
+
+
+def shared_key(namespace, version, ident):
+    digest = hashlib.sha256(repr(ident).encode('utf-8')).hexdigest()[:32]
+    return f"{KEY_PREFIX}:{SCHEMA_VERSION}:{namespace}:v{version}:{digest}"
+
+
+def encode_value(value, created_at=None):
+    return zlib.compress(pickle.dumps((created_at or time.time(), value), protocol=pickle.HIGHEST_PROTOCOL), 1)
+
+
+def decode_value(raw):
+    """(저장한 시각(time.time()), 값)"""
+    return pickle.loads(zlib.decompress(raw))
+
+
+class SQLiteCacheBackend:
+    """SQLite 파일 하나를 여러 프로세스가 함께 쓰는 저장소입니다. (WAL 모드)"""
+    def __init__(self, path, max_bytes):
+        self.path = path
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._writes = 0
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self._conn = sqlite3.connect(path, timeout=10, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS shared_cache ("
+            "key TEXT PRIMARY KEY, value BLOB NOT NULL, size INTEGER NOT NULL, expires_at REAL, accessed_at REAL NOT NULL)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS shared_cache_accessed ON shared_cache (accessed_at)")
+        self._conn.commit()
+
+    def get(self, key):
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute("SELECT value, expires_at FROM shared_cache WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                return None
+            if row[1] is not None and now > row[1]:
+                self._conn.execute("DELETE FROM shared_cache WHERE key = ?", (key,))
+                self._conn.commit()
+                return None
+            self._conn.execute("UPDATE shared_cache SET accessed_at = ? WHERE key = ?", (now, key))
+            self._conn.commit()
+            return row[0]
+
+    def set(self, key, value, ttl=None):
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO shared_cache (key, value, size, expires_at, accessed_at) VALUES (?, ?, ?, ?, ?)",
+                (key, value, len(value), now + ttl if ttl else None, now),
+            )
+            self._writes += 1
+            # 크기 합계는 쓰기 몇 번마다 한 번만 확인합니다.
+            if self._writes % EVICT_EVERY == 0 or len(value) > self.max_bytes // EVICT_EVERY:
+                self._evict(now)
+            self._conn.commit()
+
+    def delete(self, key):
+        with self._lock:
+            self._conn.execute("DELETE FROM shared_cache WHERE key = ?", (key,))
+            self._conn.commit()
+
+    def clear(self):
+        with self._lock:
+            self._conn.execute("DELETE FROM shared_cache")
+            self._conn.commit()
+
+    def _evict(self, now):
+        # 만료된 항목을 지우고, 최근에 쓴 순서로 누적한 크기가 max_bytes를 넘는 나머지를 지웁니다.
+        self._conn.execute("DELETE FROM shared_cache WHERE expires_at IS NOT NULL AND expires_at < ?", (now,))
+        self._conn.execute(
+            "DELETE FROM shared_cache WHERE key IN (SELECT key FROM ("
+            "SELECT key, SUM(size) OVER (ORDER BY accessed_at DESC, key) AS running FROM shared_cache"
+            ") WHERE running > ?)",
+            (self.max_bytes,),
+        )
+
+    def total_bytes(self):
+        with self._lock:
+            return self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM shared_cache").fetchone()[0]
+
+
+class RedisError(Exception):
+    pass
+
+
+class RedisCacheBackend:
+    """GET/SET/DEL만 쓰는 최소 RESP2 클라이언트입니다. 연결 하나를 잠금으로 나눠 씁니다."""
+    def __init__(self, host, port, db=0, password=None, timeout=REDIS_TIMEOUT):
+        self.address = (host, port)
+        self.db = db
+        self.password = password
+        self.timeout = timeout
+        self._lock = threading.Lock()
+        self._sock = None
+        self._file = None
+        self._down_until = 0.0
+
+    def _connect(self):
+        self._sock = socket.create_connection(self.address, timeout=self.timeout)
+        self._file = self._sock.makefile('rb')
+        if self.password:
+            self._call('AUTH', self.password)
+        if self.db:
+            self._call('SELECT', str(self.db))
+
+    def _close(self):
+        try:
+            if self._sock is not None:
+                self._sock.close()
+        except:
+            pass
+        self._sock = self._file = None
+
+    def _call(self, *parts):
+        payload = [f"*{len(parts)}\r\n".encode()]
+        for part in parts:
+            data = part if isinstance(part, bytes) else str(part).encode('utf-8')
+            payload += [f"${len(data)}\r\n".encode(), data, b"\r\n"]
+        self._sock.sendall(b"".join(payload))
+        return read_reply(self._file)
+
+    def command(self, *parts):
+        with self._lock:
+            if time.monotonic() < self._down_until:
+                raise ConnectionError("shared cache unavailable")
+            try:
+                if self._sock is None:
+                    self._connect()
+                return self._call(*parts)
+            except (OSError, EOFError):
+                self._close()
+                self._down_until = time.monotonic() + REDIS_RETRY_DELAY
+                raise
+
+    def get(self, key):
+        return self.command('GET', key)
+
+    def set(self, key, value, ttl=None):
+        if ttl:
+            self.command('SET', key, value, 'PX', str(int(ttl * 1000)))
+        else:
+            self.command('SET', key, value)
+
+    def delete(self, key):
+        self.command('DEL', key)
+
+    def clear(self):
+        self.command('FLUSHDB')
+
+
+def read_reply(f):
+    line = f.readline()
+    if not line:
+        raise EOFError("connection closed")
+    kind, rest = line[:1], line[1:-2]
+    if kind == b'+':
+        return rest.decode()
+    if kind == b'-':
+        raise RedisError(rest.decode())
+    if kind == b':':
+        return int(rest)
+    if kind == b'$':
+        size = int(rest)
+        if size < 0:
+            return None
+        data = f.read(size + 2)
+        return data[:-2]
+    if kind == b'*':
+        size = int(rest)
+        return None if size < 0 else [read_reply(f) for _ in range(size)]
+    raise RedisError(f"unexpected reply: {line[:20]!r}")
+
+
+def open_backend(url, max_bytes):
+    """sqlite:///상대경로, sqlite:////절대경로 또는 redis://[:비밀번호@]호스트:포트/db"""
+    if url.startswith('sqlite:///'):
+        return SQLiteCacheBackend(unquote(url[len('sqlite:///'):]), max_bytes)
+    parsed = urlparse(url)
+    if parsed.scheme == 'redis':
+        db = int(parsed.path.lstrip('/') or 0)
+        return RedisCacheBackend(parsed.hostname or 'localhost', parsed.port or 6379, db, parsed.password)
+    raise ValueError(f"지원하지 않는 공유 캐시 주소입니다: {url}")
+
+
+# ====================== Redis 대역 서버 ======================
+# 실제 Redis 없이 여러 레플리카가 캐시를 공유하도록, RESP 명령 일부를 SQLite 저장소로 처리합니다.
+
+class _RespHandler(socketserver.StreamRequestHandler):
+    def handle(self):
+        backend = self.server.backend
+        while True:
+            try:
+                parts = read_reply(self.rfile)
+            except (EOFError, OSError, RedisError, ValueError):
+                return
+            if not isinstance(parts, list) or not parts:
+                self.wfile.write(b"-ERR expected array\r\n")
+                continue
+            name = parts[0].decode().upper()
+            try:
+                reply = self.execute(backend, name, parts[1:])
+            except Exception as e:
+                reply = f"-ERR {e}\r\n".encode()
+            self.wfile.write(reply)
+            if name == 'QUIT':
+                return
+
+    @staticmethod
+    def execute(backend, name, args):
+        if name == 'PING':
+            return b"+PONG\r\n"
+        if name in ('AUTH', 'SELECT', 'QUIT'):
+            return b"+OK\r\n"
+        if name == 'GET':
+            value = backend.get(args[0].decode())
+            return b"$-1\r\n" if value is None else b"$%d\r\n%s\r\n" % (len(value), value)
+        if name == 'SET':
+            ttl = None
+            options = [a.decode().upper() for a in args[2:]]
+            if 'PX' in options:
+                ttl = int(options[options.index('PX') + 1]) / 1000
+            elif 'EX' in options:
+                ttl = int(options[options.index('EX') + 1])
+            backend.set(args[0].decode(), args[1], ttl)
+            return b"+OK\r\n"
+        if name == 'DEL':
+            for key in args:
+                backend.delete(key.decode())
+            return b":%d\r\n" % len(args)
+        if name == 'FLUSHDB':
+            backend.clear()
+            return b"+OK\r\n"
+        return f"-ERR unknown command '{name}'\r\n".encode()
+
+
+class RespServer(socketserver.ThreadingTCPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self, address, backend):
+        super().__init__(address, _RespHandler)
+        self.backend = backend
+
+
+def main():
+    ap = argparse.ArgumentParser(description="SQLite에 저장하는 Redis 프로토콜 대역 캐시 서버")
+    ap.add_argument("--host", default="127.0.0.1")
+    ap.add_argument("--port", type=int, default=6380)
+    ap.add_argument("--path", default=os.path.join(".cache", "shared.sqlite3"))
+    ap.add_argument("--max-mb", type=int, default=512)
+    args = ap.parse_args()
+    server = RespServer((args.host, args.port), SQLiteCacheBackend(args.path, args.max_mb * 1024 * 1024))
+    print(f"redis://{args.host}:{args.port}/0 -> {args.path} (최대 {args.max_mb}MB)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
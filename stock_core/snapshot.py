@@ -0,0 +1,219 @@
+"""티커 하나의 분석 데이터를 동시에 모으는 오케스트레이터.
+
+티커가 정해진 뒤의 데이터 소스들은 서로 의존하지 않으므로 스레드 풀에서 한꺼번에 가져옵니다.
+소스별 제한 시간을 넘기면 기본값으로 대체해, 느린 소스 하나가 전체 응답을 붙잡지 않게 합니다.
+화면은 SnapshotLoader로 차트를 먼저 그린 뒤 나머지를 백그라운드로 받고, 각 탭이 필요한 소스만 기다립니다.
+"""
+import contextvars
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import List
+
+import pandas as pd
+
+from . import tracing
+from .caching import shared_resource
+from .fundamentals import load_info, load_scraped_fundamentals, load_statement
+from .metrics import StatementSummary, ValuationMetrics, compute_valuation, get_52w_high_low, summarize_statements
+from .news import load_news
+from .profile import EMPTY_PROFILE, FundamentalProfile
+from .statements import StatementHistory, statement_history
+
+FETCH_POOL_SIZE = 8
+SOURCE_TIMEOUTS = {
+    'info': 10, 'scraped': 6,
+    'financials': 10, 'balance_sheet': 10, 'cashflow': 10,
+    'news': 8, 'range_52w': 12,
+}
+SOURCE_LABELS = {
+    'info': "기본 정보", 'scraped': "보충 재무 지표",
+    'financials': "손익계산서", 'balance_sheet': "재무상태표", 'cashflow': "현금흐름표",
+    'news': "뉴스", 'range_52w': "52주 가격 범위",
+}
+SOURCE_DEFAULTS = {
+    'info': EMPTY_PROFILE, 'scraped': EMPTY_PROFILE,
+    'financials': pd.DataFrame(), 'balance_sheet': pd.DataFrame(), 'cashflow': pd.DataFrame(),
+    'news': [], 'range_52w': None,
+}
+
+
+@shared_resource
+def get_fetch_pool():
+    # 프로세스 전체가 공유하는 고정 크기 풀이라 동시 접속이 늘어도 스레드 수가 제한됩니다.
+    return ThreadPoolExecutor(max_workers=FETCH_POOL_SIZE, thread_name_prefix="fetch")
+
+
+def submit_sources(sources, pool=None, span_prefix=None):
+    """sources: {이름: 인자 없는 함수}를 풀(기본은 공용 수집 풀)에 올리고 {이름: future}를 돌려줍니다.
+
+    span_prefix를 주면 소스마다 '{span_prefix}.{이름}' span으로 소요 시간을 남깁니다.
+    """
+    pool = pool or get_fetch_pool()
+    if span_prefix:
+        sources = {name: tracing.traced(f"{span_prefix}.{name}", fn) for name, fn in sources.items()}
+    # 풀 스레드에서도 호출한 쪽의 span 아래에 기록되도록 작업마다 현재 컨텍스트를 복사해 넘깁니다.
+    return {name: pool.submit(contextvars.copy_context().run, fn) for name, fn in sources.items()}
+
+
+def collect_results(futures, defaults, started, timeouts=SOURCE_TIMEOUTS, default_timeout=10):
+    # 소스별 제한 시간(started 기준) 안에 끝나지 않거나 실패한 소스는 기본값으로 대체합니다.
+    results, failed = {}, []
+    for name, future in futures.items():
+        deadline = started + timeouts.get(name, default_timeout)
+        try:
+            results[name] = future.result(timeout=max(0.0, deadline - time.monotonic()))
+        except Exception:
+            tracing.record_error()
+            future.cancel()
+            results[name] = defaults.get(name)
+            failed.append(name)
+    return results, failed
+
+
+def is_korean_ticker(ticker):
+    return ticker.endswith('.KS') or ticker.endswith('.KQ')
+
+
+@dataclass
+class Snapshot:
+    """fetch_snapshot()의 결과. failed에는 제한 시간 안에 못 받아 기본값으로 채운 소스 이름이 들어갑니다."""
+    ticker: str
+    profile: FundamentalProfile
+    financials: pd.DataFrame
+    balance_sheet: pd.DataFrame
+    cashflow: pd.DataFrame
+    news: list
+    high_52: float
+    low_52: float
+    failed: List[str] = field(default_factory=list)
+
+    @property
+    def is_korean(self):
+        return is_korean_ticker(self.ticker)
+
+    @property
+    def currency(self):
+        return "원" if self.is_korean else "달러"
+
+    @property
+    def price_fmt(self):
+        return ",.0f" if self.is_korean else ",.2f"
+
+    def statement_history(self) -> StatementHistory:
+        return statement_history(self.ticker, self.financials, self.balance_sheet, self.cashflow)
+
+    def valuation(self) -> ValuationMetrics:
+        return compute_valuation(self.profile, self.statement_history())
+
+    def statements(self) -> StatementSummary:
+        return summarize_statements(self.statement_history())
+
+
+def submit_snapshot_sources(ticker, news_query):
+    """스냅샷의 소스(기본 정보, 보충 지표, 재무제표 3종, 뉴스, 52주 범위)를 공용 수집 풀에 올립니다."""
+    futures = submit_sources({
+        'info': lambda: load_info(ticker),
+        'scraped': lambda: load_scraped_fundamentals(ticker),
+        'financials': lambda: load_statement(ticker, 'financials'),
+        'balance_sheet': lambda: load_statement(ticker, 'balance_sheet'),
+        'cashflow': lambda: load_statement(ticker, 'cashflow'),
+        'news': lambda: load_news(ticker, news_query),
+    }, span_prefix='source')
+
+    def range_task():
+        # 52주 범위의 2년치 이력 보완은 info 값이 비었을 때만 필요하므로 info 결과를 기다렸다가 진행합니다.
+        base = futures['info'].result(timeout=SOURCE_TIMEOUTS['info'])
+        return get_52w_high_low(ticker, base.high_52 or 0, base.low_52 or 0)
+    futures.update(submit_sources({'range_52w': range_task}, span_prefix='source'))
+    return futures
+
+
+class SnapshotLoader:
+    """스냅샷 소스를 필요할 때 받는 지연 로더입니다.
+
+    prefetch()는 모든 소스를 백그라운드 풀에 올리기만 하고 기다리지 않습니다. 각 속성은 처음 접근할 때
+    그 소스만 기다리며(제한 시간은 prefetch 시점 기준), prefetch 전에 접근하면 그때 올립니다.
+    """
+    def __init__(self, ticker, news_query):
+        self.ticker = ticker
+        self.news_query = news_query
+        self.failed = []
+        self._lock = threading.Lock()
+        self._futures = None
+        self._started = None
+        self._results = {}
+        self._profile = None
+
+    is_korean = Snapshot.is_korean
+    currency = Snapshot.currency
+    price_fmt = Snapshot.price_fmt
+
+    def prefetch(self):
+        with self._lock:
+            if self._futures is None:
+                self._started = time.monotonic()
+                self._futures = submit_snapshot_sources(self.ticker, self.news_query)
+        return self
+
+    def result(self, name):
+        self.prefetch()
+        if name not in self._results:
+            results, failed = collect_results({name: self._futures[name]}, SOURCE_DEFAULTS, self._started)
+            if failed:
+                tracing.annotate(timed_out=name)
+            self.failed += failed
+            self._results[name] = results[name]
+        return self._results[name]
+
+    @property
+    def profile(self):
+        """yfinance 기본 정보의 빈 항목을 보충 지표로 채운 FundamentalProfile"""
+        if self._profile is None:
+            self._profile = self.result('info').merged(self.result('scraped'))
+        return self._profile
+
+    @property
+    def financials(self):
+        return self.result('financials')
+
+    @property
+    def balance_sheet(self):
+        return self.result('balance_sheet')
+
+    @property
+    def cashflow(self):
+        return self.result('cashflow')
+
+    @property
+    def news(self):
+        return self.result('news')
+
+    @property
+    def range_52w(self):
+        """(52주 최고, 최저). 2년치 이력 보완이 실패하면 기본 정보 값을 씁니다."""
+        value = self.result('range_52w')
+        if value is not None:
+            return value
+        return self.profile.high_52 or 0, self.profile.low_52 or 0
+
+    def statement_history(self) -> StatementHistory:
+        return statement_history(self.ticker, self.financials, self.balance_sheet, self.cashflow)
+
+    def valuation(self) -> ValuationMetrics:
+        return compute_valuation(self.profile, self.statement_history())
+
+    def statements(self) -> StatementSummary:
+        return summarize_statements(self.statement_history())
+
+    def snapshot(self) -> Snapshot:
+        """모든 소스를 기다려 Snapshot으로 돌려줍니다."""
+        high_52, low_52 = self.range_52w
+        return Snapshot(self.ticker, self.profile, self.financials, self.balance_sheet, self.cashflow,
+                        self.news, high_52, low_52, list(self.failed))
+
+
+def fetch_snapshot(ticker, news_query) -> Snapshot:
+    """티커 하나의 분석 데이터(기본 정보+보충 지표, 재무제표 3종, 뉴스, 52주 고/저)를 동시에 수집합니다."""
+    return SnapshotLoader(ticker, news_query).snapshot()
@@ -0,0 +1,228 @@
+"""재무제표 전 기간을 한 배열로 맞춘 다기간 지표 엔진.
+
+yfinance 재무제표 3종(연간 또는 분기)의 결산 기간을 합쳐 (항목 × 기간) 숫자 배열 하나로 정렬한 뒤,
+ROIC/이자보상배율/이익률/성장률/잉여현금흐름을 모든 기간에 대해 배열 연산으로 한 번에 계산합니다.
+결과는 (종목, 연간/분기, 결산일)별로 기억하므로 새 결산이 나오기 전까지는 다시 계산하지 않습니다.
+
+    history = statement_history(ticker, fin, bs, cf)
+    history.latest('rev'), history.metric('roic'), history.to_frame()
+"""
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+
+import numpy as np
+import pandas as pd
+
+from . import tracing
+from .fundamentals import STATEMENT_KINDS, load_statement
+
+# 연간/분기별 (손익계산서, 재무상태표, 현금흐름표) yfinance 속성 이름
+FREQUENCIES = {
+    'annual': STATEMENT_KINDS,
+    'quarterly': ('quarterly_financials', 'quarterly_balance_sheet', 'quarterly_cashflow'),
+}
+# 성장률을 비교할 기간 차이 (분기는 전년 동기와 비교)
+GROWTH_LAG = {'annual': 1, 'quarterly': 4}
+ROIC_TAX_RATE = 0.25
+HISTORY_CACHE_SIZE = 256
+
+# 요약 항목 -> (재무제표 종류, 찾을 행 이름 후보). 기간마다 값이 있는 첫 후보를 씁니다.
+STATEMENT_ROWS = {
+    'rev': ('financials', ['Total Revenue']),
+    'cogs': ('financials', ['Cost Of Revenue']),
+    'gp': ('financials', ['Gross Profit']),
+    'sga': ('financials', ['Selling General And Administration']),
+    'op': ('financials', ['Operating Income']),
+    'pretax': ('financials', ['Pretax Income']),
+    'net': ('financials', ['Net Income']),
+    'oci': ('financials', ['Other Comprehensive Income']),
+    'tot_assets': ('balance_sheet', ['Total Assets']),
+    'cur_assets': ('balance_sheet', ['Current Assets']),
+    'ncur_assets': ('balance_sheet', ['Total Non Current Assets']),
+    'tot_liab': ('balance_sheet', ['Total Liabilities Net Minority Interest', 'Total Liabilities']),
+    'cur_liab': ('balance_sheet', ['Current Liabilities']),
+    'ncur_liab': ('balance_sheet', ['Total Non Current Liabilities Net Minority Interest']),
+    'tot_eq': ('balance_sheet', ['Stockholders Equity', 'Total Equity Gross Minority Interest']),
+    'cash': ('balance_sheet', ['Cash And Cash Equivalents', 'Cash']),
+    'receiv': ('balance_sheet', ['Accounts Receivable', 'Net Receivables']),
+    'inv': ('balance_sheet', ['Inventory']),
+    'tangible': ('balance_sheet', ['Net PPE']),
+    'intangible': ('balance_sheet', ['Total Intangible Assets', 'Goodwill And Other Intangible Assets']),
+    's_debt': ('balance_sheet', ['Current Debt', 'Current Debt And Capital Lease Obligation']),
+    'l_debt': ('balance_sheet', ['Long Term Debt', 'Long Term Debt And Capital Lease Obligation']),
+    'cap_stock': ('balance_sheet', ['Capital Stock', 'Common Stock']),
+    'cap_surplus': ('balance_sheet', ['Additional Paid In Capital']),
+    'retained': ('balance_sheet', ['Retained Earnings']),
+    'cf_op': ('cashflow', ['Operating Cash Flow']),
+    'cf_inv': ('cashflow', ['Investing Cash Flow']),
+    'cf_fin': ('cashflow', ['Financing Cash Flow']),
+    'cf_beg': ('cashflow', ['Beginning Cash Position']),
+    'cf_end': ('cashflow', ['End Cash Position']),
+    'dividend': ('cashflow', ['Cash Dividends Paid', 'Dividends Paid']),
+}
+# 요약에는 없고 지표 계산에만 쓰는 행
+METRIC_INPUT_ROWS = {
+    'ebit': ('financials', ['EBIT']),
+    'interest': ('financials', ['Interest Expense']),
+    'capex': ('cashflow', ['Capital Expenditure']),
+    'fcf': ('cashflow', ['Free Cash Flow']),
+}
+ROWS = {**STATEMENT_ROWS, **METRIC_INPUT_ROWS}
+ROW_NAMES = tuple(ROWS)
+
+METRIC_NAMES = (
+    'roic', 'interest_coverage', 'gross_margin', 'op_margin', 'net_margin',
+    'rev_growth', 'op_growth', 'net_growth', 'fcf', 'fcf_margin',
+)
+
+
+def numeric_statement(df):
+    # 행 이름이 겹치면 첫 행만 남기고, 숫자가 아닌 값은 NaN으로 바꿉니다.
+    if df.index.has_duplicates:
+        df = df[~df.index.duplicated()]
+    if all(pd.api.types.is_numeric_dtype(dtype) for dtype in df.dtypes):
+        return df
+    return df.apply(pd.to_numeric, errors='coerce')
+
+
+def align_statements(fin_df, bs_df, cf_df):
+    """(기간 목록(최근 먼저), 값 배열[ROW_NAMES, 기간], {재무제표 종류: 그 재무제표의 최근 기간 열})을 돌려줍니다."""
+    frames = {
+        kind: numeric_statement(df)
+        for kind, df in zip(STATEMENT_KINDS, (fin_df, bs_df, cf_df)) if df is not None and not df.empty
+    }
+    periods = pd.Index([])
+    for df in frames.values():
+        periods = periods.union(df.columns)
+    periods = periods.sort_values(ascending=False)
+
+    blocks = {kind: df.reindex(columns=periods).to_numpy(dtype=float) for kind, df in frames.items()}
+    values = np.full((len(ROW_NAMES), len(periods)), np.nan)
+    for i, (kind, keys) in enumerate(ROWS.values()):
+        if kind not in frames:
+            continue
+        for pos in frames[kind].index.get_indexer(keys):
+            if pos >= 0:
+                values[i] = np.where(np.isnan(values[i]), blocks[kind][pos], values[i])
+    latest_column = {kind: periods.get_loc(df.columns.max()) for kind, df in frames.items()}
+    return periods, values, latest_column
+
+
+def period_growth(values, lag):
+    # values: [항목, 기간(최근 먼저)]. lag 기간 전 값이 양수일 때만 성장률을 냅니다.
+    prior = np.full_like(values, np.nan)
+    if lag < values.shape[1]:
+        prior[:, :-lag] = values[:, lag:]
+    return np.where(prior > 0, values / prior - 1, np.nan)
+
+
+def compute_history_metrics(values, lag):
+    """정렬된 값 배열에서 METRIC_NAMES 순서의 지표 배열[지표, 기간]을 계산합니다."""
+    row = dict(zip(ROW_NAMES, values))
+    with np.errstate(divide='ignore', invalid='ignore'):
+        op = np.where(np.isnan(row['op']), row['ebit'], row['op'])
+        # ROIC = 세후 영업이익(세율 25% 가정) / 투하자본(총자산 - 유동부채)
+        invested = row['tot_assets'] - np.nan_to_num(row['cur_liab'])
+        roic = np.where((row['tot_assets'] > 0) & (invested > 0), op * (1 - ROIC_TAX_RATE) / invested, np.nan)
+        coverage = np.where(row['interest'] != 0, np.abs(op / row['interest']), np.nan)
+        revenue = np.where(row['rev'] != 0, row['rev'], np.nan)
+        margins = np.vstack([row['gp'], op, row['net']]) / revenue
+        growth = period_growth(np.vstack([row['rev'], op, row['net']]), lag)
+        # 잉여현금흐름이 없으면 영업활동현금흐름 + 설비투자(음수로 기록됨)로 계산합니다.
+        fcf = np.where(np.isnan(row['fcf']), row['cf_op'] + row['capex'], row['fcf'])
+        return np.vstack([roic, coverage, margins, growth, fcf, fcf / revenue])
+
+
+@dataclass
+class StatementHistory:
+    """재무제표 전 기간의 정렬된 값과 기간별 지표. 배열의 열은 periods 순서(최근 먼저)입니다."""
+    periods: pd.Index
+    values: np.ndarray
+    metrics: np.ndarray
+    latest_column: dict
+
+    @property
+    def empty(self):
+        return len(self.periods) == 0
+
+    def row(self, name):
+        return self.values[ROW_NAMES.index(name)]
+
+    def metric(self, name):
+        return self.metrics[METRIC_NAMES.index(name)]
+
+    def latest(self, name):
+        """항목은 그 재무제표의, 지표는 손익계산서의 최근 결산 값입니다. 없으면 None."""
+        if name in ROWS:
+            column = self.latest_column.get(ROWS[name][0])
+            series = self.row(name)
+        else:
+            column = self.latest_column.get('financials')
+            series = self.metric(name)
+        if column is None or np.isnan(series[column]):
+            return None
+        return float(series[column])
+
+    def to_frame(self, names=METRIC_NAMES, periods=None):
+        """지표(행) × 기간(열) 표. periods를 주면 최근 그 개수만큼만 담습니다."""
+        rows = [self.metric(name)[:periods] for name in names]
+        return pd.DataFrame(rows, index=list(names), columns=self.periods[:periods])
+
+    def as_dict(self):
+        return {
+            "periods": [p.strftime("%Y-%m-%d") if hasattr(p, 'strftime') else str(p) for p in self.periods],
+            "metrics": {name: self.metric(name).tolist() for name in METRIC_NAMES},
+        }
+
+
+def build_statement_history(fin_df, bs_df, cf_df, lag=GROWTH_LAG['annual']):
+    periods, values, latest_column = align_statements(fin_df, bs_df, cf_df)
+    return StatementHistory(periods, values, compute_history_metrics(values, lag), latest_column)
+
+
+# 재무제표를 받지 못했을 때 쓰는 빈 기록
+EMPTY_HISTORY = build_statement_history(None, None, None)
+
+
+def filing_key(frames):
+    # 재무제표별 최근 결산일과 크기. 새 결산이 올라오면 바뀝니다.
+    return tuple((df.columns.max(), df.shape) if df is not None and not df.empty else None for df in frames)
+
+
+_history_lock = threading.Lock()
+_history_cache = OrderedDict()
+
+
+def statement_history(ticker, fin_df, bs_df, cf_df, frequency='annual'):
+    """받아 둔 재무제표로 StatementHistory를 만들거나, 같은 결산이면 기억해 둔 것을 돌려줍니다."""
+    key = (ticker, frequency, filing_key((fin_df, bs_df, cf_df)))
+    with _history_lock:
+        history = _history_cache.get(key)
+        if history is not None:
+            _history_cache.move_to_end(key)
+    if history is not None:
+        tracing.count('cache_hit')
+        return history
+    tracing.count('cache_miss')
+    history = build_statement_history(fin_df, bs_df, cf_df, GROWTH_LAG[frequency])
+    with _history_lock:
+        _history_cache[key] = history
+        while len(_history_cache) > HISTORY_CACHE_SIZE:
+            _history_cache.popitem(last=False)
+    return history
+
+
+def load_statement_history(ticker, frequency='annual'):
+    """재무제표를 (캐시를 거쳐) 받아 StatementHistory로 돌려줍니다. frequency: 'annual' 또는 'quarterly'
+
+    받지 못한 재무제표는 빈 표로 대신합니다. (캐시에는 남지 않으므로 다음 호출 때 다시 받습니다)
+    """
+    frames = []
+    for kind in FREQUENCIES[frequency]:
+        try:
+            frames.append(load_statement(ticker, kind))
+        except:
+            tracing.record_error()
+            frames.append(pd.DataFrame())
+    return statement_history(ticker, *frames, frequency=frequency)
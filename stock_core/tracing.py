@@ -0,0 +1,206 @@
+"""단계별 소요 시간 기록(트레이스).
+
+화면을 한 번 그리거나 API 요청 하나를 처리하는 동안을 trace 하나로, 그 안의 단계(종목 찾기, 소스별 수집,
+프롬프트 만들기, AI 호출 등)를 span으로 남깁니다. span에는 소요 시간과 함께 캐시 적중/미적중 수,
+HTTP로 받은 바이트 수, except로 삼킨 예외를 붙입니다. 진행 중인 trace가 없으면 span은 아무것도 기록하지 않습니다.
+
+끝난 trace는 stock_core.tracing 로거(DEBUG, span마다 JSON 한 줄)로 남기고, STOCK_TERMINAL_TRACE_FILE을
+지정하면 OTLP/JSON 형식(OpenTelemetry 수집기의 otlpjsonfile 수신기가 읽는 형식)으로 한 줄씩 덧붙입니다.
+
+    trace = start_trace("page")
+    with span("resolve", query=user_input):
+        ticker = get_ticker_symbol(user_input)
+    finish_trace(trace)
+    trace.rows()
+"""
+import contextvars
+import json
+import logging
+import os
+import secrets
+import sys
+import threading
+import time
+from contextlib import contextmanager
+
+TRACE_FILE = os.environ.get("STOCK_TERMINAL_TRACE_FILE")
+SERVICE_NAME = "stock-terminal"
+ERROR_MESSAGE_MAX = 200
+
+logger = logging.getLogger(__name__)
+_current = contextvars.ContextVar("stock_core_span", default=None)
+
+
+class Span:
+    def __init__(self, trace, name, parent_id, attrs):
+        self.trace = trace
+        self.span_id = secrets.token_hex(8)
+        self.parent_id = parent_id
+        self.name = name
+        self.attrs = dict(attrs)
+        self.error = None
+        self.start_ns = time.time_ns()
+        self._started = time.perf_counter_ns()
+        self.duration_ns = None
+
+    def end(self):
+        if self.duration_ns is None:
+            self.duration_ns = time.perf_counter_ns() - self._started
+
+    @property
+    def duration_ms(self):
+        return (self.duration_ns or 0) / 1e6
+
+    def set(self, **attrs):
+        with self.trace.lock:
+            self.attrs.update(attrs)
+
+    def count(self, key, amount=1):
+        # 수집 풀의 여러 스레드가 같은 span에 더할 수 있으므로 trace 잠금 안에서 더합니다.
+        with self.trace.lock:
+            self.attrs[key] = self.attrs.get(key, 0) + amount
+
+    def to_otel(self):
+        status = {"code": "STATUS_CODE_ERROR", "message": self.error} if self.error else {"code": "STATUS_CODE_OK"}
+        return {
+            "traceId": self.trace.trace_id,
+            "spanId": self.span_id,
+            "parentSpanId": self.parent_id or "",
+            "name": self.name,
+            "kind": "SPAN_KIND_INTERNAL",
+            "startTimeUnixNano": str(self.start_ns),
+            "endTimeUnixNano": str(self.start_ns + (self.duration_ns or 0)),
+            "attributes": [{"key": k, "value": otel_value(v)} for k, v in self.attrs.items()],
+            "status": status,
+        }
+
+
+class Trace:
+    def __init__(self, name, attrs):
+        self.trace_id = secrets.token_hex(16)
+        self.lock = threading.Lock()
+        self.spans = []
+        self.root = self.open_span(name, None, attrs)
+        self._token = None
+
+    def open_span(self, name, parent_id, attrs):
+        span_ = Span(self, name, parent_id, attrs)
+        with self.lock:
+            self.spans.append(span_)
+        return span_
+
+    def rows(self):
+        """화면 표시용 [{name, depth, ms, cache_hit, cache_miss, bytes, error}] (시작 순서)."""
+        depth = {}
+        rows = []
+        for s in sorted(self.spans, key=lambda s: s.start_ns):
+            depth[s.span_id] = depth.get(s.parent_id, -1) + 1 if s.parent_id else 0
+            rows.append({
+                "name": s.name, "depth": depth[s.span_id], "ms": round(s.duration_ms, 1),
+                "cache_hit": s.attrs.get("cache_hit", 0), "cache_miss": s.attrs.get("cache_miss", 0),
+                "bytes": s.attrs.get("http_bytes", 0), "error": s.error or s.attrs.get("swallowed"),
+            })
+        return rows
+
+    def to_otlp(self):
+        """OTLP/JSON ExportTraceServiceRequest 형태의 dict를 돌려줍니다."""
+        return {"resourceSpans": [{
+            "resource": {"attributes": [{"key": "service.name", "value": {"stringValue": SERVICE_NAME}}]},
+            "scopeSpans": [{"scope": {"name": "stock_core"}, "spans": [s.to_otel() for s in self.spans]}],
+        }]}
+
+
+def otel_value(value):
+    if isinstance(value, bool):
+        return {"boolValue": value}
+    if isinstance(value, int):
+        return {"intValue": str(value)}
+    if isinstance(value, float):
+        return {"doubleValue": value}
+    return {"stringValue": str(value)}
+
+
+def current_span():
+    return _current.get()
+
+
+def start_trace(name, **attrs):
+    """새 trace를 시작하고 그 루트 span을 현재 span으로 만듭니다."""
+    trace = Trace(name, attrs)
+    trace._token = _current.set(trace.root)
+    return trace
+
+
+def finish_trace(trace):
+    trace.root.end()
+    try:
+        _current.reset(trace._token)
+    except ValueError:
+        # 다른 컨텍스트에서 끝내는 경우(예: Streamlit이 중간에 멈춘 뒤)는 현재 span만 비웁니다.
+        _current.set(None)
+    export_trace(trace)
+    return trace
+
+
+@contextmanager
+def span(name, **attrs):
+    """현재 span 아래에 자식 span을 열고 닫습니다. 진행 중인 trace가 없으면 None을 내주고 아무것도 하지 않습니다."""
+    parent = _current.get()
+    if parent is None:
+        yield None
+        return
+    span_ = parent.trace.open_span(name, parent.span_id, attrs)
+    token = _current.set(span_)
+    try:
+        yield span_
+    except BaseException as e:
+        span_.error = f"{type(e).__name__}: {e}"[:ERROR_MESSAGE_MAX]
+        raise
+    finally:
+        span_.end()
+        _current.reset(token)
+
+
+def traced(name, fn):
+    """fn을 name span 안에서 부르는 인자 없는 함수를 돌려줍니다. (풀에 올릴 작업용)"""
+    def run():
+        with span(name):
+            return fn()
+    return run
+
+
+def annotate(**attrs):
+    span_ = _current.get()
+    if span_ is not None:
+        span_.set(**attrs)
+
+
+def count(key, amount=1):
+    span_ = _current.get()
+    if span_ is not None:
+        span_.count(key, amount)
+
+
+def record_error():
+    """except 블록 안에서 불러, 삼킨 예외를 현재 span에 남깁니다. (마지막 예외와 횟수)"""
+    span_ = _current.get()
+    if span_ is None:
+        return
+    exc = sys.exc_info()[1]
+    if exc is not None:
+        span_.set(swallowed=f"{type(exc).__name__}: {exc}"[:ERROR_MESSAGE_MAX])
+        span_.count("errors")
+
+
+def export_trace(trace):
+    if logger.isEnabledFor(logging.DEBUG):
+        for s in trace.spans:
+            logger.debug(json.dumps({
+                "trace": trace.trace_id, "span": s.name, "ms": round(s.duration_ms, 2), "attrs": s.attrs, "error": s.error,
+            }, ensure_ascii=False, default=str))
+    if TRACE_FILE:
+        try:
+            with open(TRACE_FILE, "a", encoding="utf-8") as f:
+                f.write(json.dumps(trace.to_otlp(), ensure_ascii=False) + "\n")
+        except:
+            pass
@@ -0,0 +1,94 @@
+"""관심종목 스크리너.
+
+여러 종목을 한 번에 훑어볼 때는 가격을 yf.download 한 번으로 묶어 받고, 펀더멘털은 종목별 캐시 로더를
+전용 풀에서 동시에 돌립니다. 전체 제한 시간을 넘긴 종목의 지표는 비워 두고 표를 먼저 돌려줍니다.
+"""
+import re
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pandas as pd
+import yfinance as yf
+
+from .caching import shared_resource, ttl_cache
+from .config import QUOTE_TTL
+from .fundamentals import load_info, load_scraped_fundamentals
+from .metrics import as_percent, compute_roic
+from .profile import EMPTY_PROFILE
+from .resolver import get_ticker_symbol
+from .snapshot import collect_results, submit_sources
+from .statements import EMPTY_HISTORY, load_statement_history
+
+WATCHLIST_MAX_SYMBOLS = 300
+WATCHLIST_POOL_SIZE = 16
+WATCHLIST_TIMEOUT = 45
+
+
+@shared_resource
+def get_watchlist_pool():
+    return ThreadPoolExecutor(max_workers=WATCHLIST_POOL_SIZE, thread_name_prefix="watchlist")
+
+
+def parse_watchlist(text):
+    terms = [t.strip() for t in re.split(r"[,\n]+", text) if t.strip()]
+    return list(dict.fromkeys(terms))[:WATCHLIST_MAX_SYMBOLS]
+
+
+@ttl_cache(ttl=QUOTE_TTL)
+def load_batch_quotes(tickers):
+    """여러 티커의 최근 종가와 전일 대비 등락률을 한 번의 yf.download로 가져옵니다."""
+    quotes = {}
+    try:
+        data = yf.download(list(tickers), period="5d", interval="1d", group_by="ticker", threads=True, progress=False)
+    except:
+        return quotes
+    for t in tickers:
+        try:
+            closes = data[t]['Close'] if isinstance(data.columns, pd.MultiIndex) else data['Close']
+            closes = closes.dropna()
+            if closes.empty: continue
+            change = closes.iloc[-1] / closes.iloc[-2] - 1 if len(closes) > 1 else None
+            quotes[t] = (float(closes.iloc[-1]), change)
+        except:
+            pass
+    return quotes
+
+
+def screen_watchlist(terms):
+    """입력한 종목들을 티커로 바꾸고 상세 재무 탭과 같은 기준의 지표 표(DataFrame)와 늦게 끝난 종목 수를 돌려줍니다."""
+    pool = get_watchlist_pool()
+    started = time.monotonic()
+    resolved, _ = collect_results(
+        submit_sources({term: (lambda t=term: get_ticker_symbol(t)) for term in terms}, pool),
+        {}, started, timeouts={}, default_timeout=WATCHLIST_TIMEOUT,
+    )
+    pairs = [(term, resolved[term]) for term in terms if resolved.get(term)]
+    symbols = list(dict.fromkeys(sym for _, sym in pairs))
+    quotes = load_batch_quotes(tuple(symbols))
+
+    sources = {}
+    for sym in symbols:
+        sources[(sym, 'info')] = lambda s=sym: load_info(s)
+        sources[(sym, 'scraped')] = lambda s=sym: load_scraped_fundamentals(s)
+        sources[(sym, 'history')] = lambda s=sym: load_statement_history(s)
+    defaults = {key: (EMPTY_HISTORY if key[1] == 'history' else EMPTY_PROFILE) for key in sources}
+    results, failed = collect_results(submit_sources(sources, pool), defaults, started, timeouts={}, default_timeout=WATCHLIST_TIMEOUT)
+
+    rows = []
+    for term, sym in pairs:
+        profile = results[(sym, 'info')].merged(results[(sym, 'scraped')])
+        price, change = quotes.get(sym, (None, None))
+        history = results[(sym, 'history')]
+        rows.append({
+            "종목": term, "티커": sym, "현재가": price, "등락률(%)": as_percent(change),
+            "PER": profile.trailing_pe,
+            "PBR": profile.pb,
+            "ROE(%)": as_percent(profile.roe),
+            "ROIC(%)": as_percent(compute_roic(profile, history)),
+            "매출총이익률(%)": as_percent(profile.gross_margin),
+            "영업이익률(%)": as_percent(profile.op_margin),
+            "순이익률(%)": as_percent(profile.net_margin),
+            "부채비율(%)": profile.debt,
+        })
+    late = len({key[0] for key in failed})
+    return pd.DataFrame(rows), late
@@ -0,0 +1,91 @@
+"""가격 이력 도구(stock_core.history) 확인.
+
+일봉에서 만든 주봉/월봉이 주(월요일 시작)/월 단위로 묶은 값과 같은지, 긴 구간을 묶은 캔들이
+고가/저가 극값과 거래량 합계를 잃지 않는지 봅니다.
+
+    python -m pytest tests
+"""
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+import pytest
+
+pytest.importorskip("yfinance")
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from stock_core.history import OHLCV_COLUMNS, decimate_ohlc, resample_ohlcv
+
+
+def daily_bars(start="2023-01-02", end="2023-12-29", seed=0):
+    index = pd.bdate_range(start, end)
+    # 월요일 휴장과 한 주 전체 휴장(추석 연휴 흉내)을 넣어 둡니다.
+    index = index[(index != pd.Timestamp("2023-05-01")) & ~((index >= "2023-09-25") & (index <= "2023-09-29"))]
+    rng = np.random.default_rng(seed)
+    close = 100 * np.exp(np.cumsum(rng.normal(0, 0.01, len(index))))
+    spread = rng.uniform(0.001, 0.02, len(index))
+    return pd.DataFrame({
+        'Open': close * (1 + rng.normal(0, 0.005, len(index))),
+        'High': close * (1 + spread),
+        'Low': close * (1 - spread),
+        'Close': close,
+        'Volume': rng.integers(1_000, 100_000, len(index)).astype(float),
+    }, index=index)
+
+
+def grouped_bars(daily, period):
+    groups = daily.groupby(daily.index.to_period(period))
+    bars = groups.agg({'Open': 'first', 'High': 'max', 'Low': 'min', 'Close': 'last', 'Volume': 'sum'})
+    bars.index = bars.index.start_time
+    return bars[OHLCV_COLUMNS]
+
+
+@pytest.mark.parametrize("interval, period", [("1wk", "W-SUN"), ("1mo", "M")])
+def test_resample_matches_calendar_groups(interval, period):
+    daily = daily_bars()
+    bars = resample_ohlcv(daily, interval)
+    expected = grouped_bars(daily, period)
+    pd.testing.assert_frame_equal(bars[OHLCV_COLUMNS], expected, check_freq=False, check_names=False)
+
+
+def test_weekly_bars_are_labelled_monday_and_skip_closed_weeks():
+    bars = resample_ohlcv(daily_bars(), "1wk")
+    assert (bars.index.dayofweek == 0).all()
+    # 월요일이 휴장인 주도 월요일 날짜로, 전체 휴장 주는 봉이 없습니다.
+    assert pd.Timestamp("2023-05-01") in bars.index
+    assert pd.Timestamp("2023-09-25") not in bars.index
+
+
+def test_daily_and_empty_pass_through():
+    daily = daily_bars()
+    assert resample_ohlcv(daily, "1d") is daily
+    assert resample_ohlcv(daily.iloc[:0], "1wk").empty
+
+
+@pytest.mark.parametrize("target", [50, 64, 100, 249])
+def test_decimate_keeps_extremes_and_totals(target):
+    daily = daily_bars()
+    daily['MA_20'] = daily['Close'].rolling(20).mean()
+    bars, step = decimate_ohlc(daily, target)
+    assert len(bars) <= target
+    assert step == int(np.ceil(len(daily) / target))
+    assert bars['High'].max() == daily['High'].max()
+    assert bars['Low'].min() == daily['Low'].min()
+    assert bars['Volume'].sum() == pytest.approx(daily['Volume'].sum())
+    for i, start in enumerate(range(0, len(daily), step)):
+        chunk = daily.iloc[start:start + step]
+        assert bars.index[i] == chunk.index[0]
+        assert bars['Open'].iloc[i] == chunk['Open'].iloc[0]
+        assert bars['High'].iloc[i] == chunk['High'].max()
+        assert bars['Low'].iloc[i] == chunk['Low'].min()
+        assert bars['Close'].iloc[i] == chunk['Close'].iloc[-1]
+        # 지표 열은 묶음의 마지막 값
+        assert bars['MA_20'].iloc[i] == chunk['MA_20'].iloc[-1] or np.isnan(chunk['MA_20'].iloc[-1])
+
+
+def test_decimate_passes_short_ranges_through():
+    daily = daily_bars()
+    for target in (len(daily), 0):
+        bars, step = decimate_ohlc(daily, target)
+        assert bars is daily and step == 1
@@ -0,0 +1,91 @@
+"""기술적 지표 엔진(stock_core.indicators) 확인.
+
+누적합/지수평활로 계산한 지표와, 새 봉이 붙을 때 바뀐 구간만 이어서 계산한 결과가 pandas rolling/ewm과 같은지 봅니다.
+
+    python -m pytest tests
+"""
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from stock_core.indicators import (
+    BOLLINGER_K, BOLLINGER_WINDOW, EMA_SPANS, MACD_FAST, MACD_SIGNAL, MACD_SLOW, RSI_PERIOD, IndicatorCache,
+)
+
+MA_WINDOWS = (5, 20, 60)
+TOLERANCE = 1e-8
+
+
+def price_history(n, seed=0):
+    rng = np.random.default_rng(seed)
+    close = 50000 * np.exp(np.cumsum(rng.normal(0, 0.02, n)))
+    return pd.DataFrame({'Close': close}, index=pd.bdate_range("2020-01-01", periods=n))
+
+
+def pandas_indicators(close):
+    """같은 지표를 pandas rolling/ewm으로 계산한 기준값"""
+    out = {f'MA_{w}': close.rolling(w).mean() for w in MA_WINDOWS}
+    mid = close.rolling(BOLLINGER_WINDOW).mean()
+    std = close.rolling(BOLLINGER_WINDOW).std()
+    out.update(BB_mid=mid, BB_upper=mid + BOLLINGER_K * std, BB_lower=mid - BOLLINGER_K * std)
+    for span in set(EMA_SPANS) | {MACD_FAST, MACD_SLOW}:
+        out[f'EMA_{span}'] = close.ewm(span=span, adjust=False).mean()
+    macd = out[f'EMA_{MACD_FAST}'] - out[f'EMA_{MACD_SLOW}']
+    signal = macd.ewm(span=MACD_SIGNAL, adjust=False).mean()
+    out.update(MACD=macd, MACD_signal=signal, MACD_hist=macd - signal)
+    delta = close.diff().fillna(0)
+    gain = delta.clip(lower=0).ewm(alpha=1 / RSI_PERIOD, adjust=False).mean()
+    loss = (-delta).clip(lower=0).ewm(alpha=1 / RSI_PERIOD, adjust=False).mean()
+    rsi = (100 - 100 / (1 + gain / loss)).where(loss != 0, 100.0)
+    rsi[np.arange(len(close)) < RSI_PERIOD] = np.nan
+    out[f'RSI_{RSI_PERIOD}'] = rsi
+    return pd.DataFrame(out)
+
+
+def assert_matches_pandas(result, history):
+    expected = pandas_indicators(history['Close'])
+    for name in expected:
+        np.testing.assert_allclose(result[name].to_numpy(), expected[name].to_numpy(), rtol=TOLERANCE, atol=TOLERANCE,
+                                   equal_nan=True, err_msg=name)
+
+
+def test_full_computation_matches_pandas():
+    history = price_history(300)
+    assert_matches_pandas(IndicatorCache(4).get("T", "1d", history, MA_WINDOWS), history)
+
+
+def test_appended_bars_splice_matches_pandas():
+    history = price_history(400)
+    cache = IndicatorCache(4)
+    cache.get("T", "1d", history.iloc[:350], MA_WINDOWS)
+    assert_matches_pandas(cache.get("T", "1d", history, MA_WINDOWS), history)
+
+
+def test_revised_last_bar_recomputes_from_change():
+    # 장중에 저장된 마지막 봉이 종가로 바뀌고 새 봉이 붙는 경우
+    history = price_history(300)
+    cache = IndicatorCache(4)
+    intraday = history.iloc[:250].copy()
+    intraday.iloc[-1, 0] *= 1.03
+    cache.get("T", "1d", intraday, MA_WINDOWS)
+    assert_matches_pandas(cache.get("T", "1d", history, MA_WINDOWS), history)
+
+
+def test_revised_past_bars_recompute_everything():
+    # 수정주가로 과거 가격이 바뀌면 처음부터 다시 계산한 것과 같아야 합니다.
+    history = price_history(300)
+    cache = IndicatorCache(4)
+    cache.get("T", "1d", history, MA_WINDOWS)
+    adjusted = history * 0.5
+    assert_matches_pandas(cache.get("T", "1d", adjusted, MA_WINDOWS), adjusted)
+
+
+@pytest.mark.parametrize("n", [1, 10, RSI_PERIOD + 1])
+def test_short_histories(n):
+    history = price_history(n)
+    assert_matches_pandas(IndicatorCache(4).get("T", "1d", history, MA_WINDOWS), history)
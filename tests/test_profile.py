@@ -0,0 +1,78 @@
+"""종목 프로필(stock_core.profile) 확인.
+
+info dict에서 항목을 뽑는 규칙, 출처를 유지하며 합치는 규칙, dumps()/loads() 왕복을 봅니다.
+
+    python -m pytest tests
+"""
+import json
+import os
+import pickle
+import sys
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from stock_core.profile import EMPTY_PROFILE, PROFILE_FIELDS, FundamentalProfile, profile_from_info
+
+
+@pytest.fixture(scope="module")
+def yf_info():
+    with open(os.path.join(ROOT, "benchmarks", "fixtures", "info_005930.json"), encoding="utf-8") as f:
+        return json.load(f)
+
+
+def test_profile_from_info_normalizes_values():
+    profile = profile_from_info({
+        'trailingPE': 'N/A', 'PE': '12.5', 'priceToBook': 0, 'pbr': 1.1,
+        'marketCap': float('nan'), 'returnOnEquity': 0.15, 'unused': 1,
+    }, 'naver')
+    assert profile.trailing_pe == 12.5
+    assert profile.pb == 1.1
+    assert profile.market_cap is None
+    assert profile.roe == 0.15
+    assert profile.source('roe') == 'naver'
+    assert profile.source('market_cap') is None
+
+
+def test_merged_fills_only_missing_fields():
+    yf = profile_from_info({'trailingPE': 10.0}, 'yfinance')
+    naver = profile_from_info({'trailingPE': 99.0, 'priceToBook': 1.5}, 'naver')
+    merged = yf.merged(naver)
+    assert (merged.trailing_pe, merged.source('trailing_pe')) == (10.0, 'yfinance')
+    assert (merged.pb, merged.source('pb')) == (1.5, 'naver')
+    # 원래 프로필은 바뀌지 않습니다.
+    assert yf.pb is None
+
+
+def test_dumps_loads_round_trip(yf_info):
+    profile = profile_from_info(yf_info, 'yfinance').merged(profile_from_info({'quickRatio': 0.9}, 'finviz'))
+    data = profile.dumps()
+    assert isinstance(data, bytes)
+    restored = FundamentalProfile.loads(data)
+    assert restored == profile
+    assert restored.provenance == profile.provenance
+    assert FundamentalProfile.loads(EMPTY_PROFILE.dumps()) == EMPTY_PROFILE
+
+
+def test_pickle_round_trip(yf_info):
+    # 공유 캐시는 값을 pickle로 저장합니다.
+    profile = profile_from_info(yf_info, 'yfinance')
+    assert pickle.loads(pickle.dumps(profile)) == profile
+
+
+def test_loads_rejects_other_versions():
+    version, values, sources = json.loads(EMPTY_PROFILE.dumps())
+    with pytest.raises(ValueError):
+        FundamentalProfile.loads(json.dumps([version + 1, values, sources]))
+    with pytest.raises(ValueError):
+        FundamentalProfile.loads(json.dumps([version, values[:-1], sources[:-1]]))
+
+
+def test_profile_is_slotted():
+    profile = FundamentalProfile()
+    assert profile.empty
+    assert len(profile.to_dict()) == len(PROFILE_FIELDS) + 1
+    with pytest.raises(AttributeError):
+        profile.extra = 1
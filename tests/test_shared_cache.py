@@ -0,0 +1,171 @@
+"""공유 캐시 저장소(stock_core.shared_cache) 확인.
+
+SQLite 저장소는 임시 폴더에서, Redis 프로토콜 저장소는 임시 포트에 띄운 RespServer(대역 서버)로 확인합니다.
+RESP 틀이나 제거 규칙이 깨져 공유 캐시가 늘 빗나가는 일을 막기 위한 것이라 실제 Redis는 쓰지 않습니다.
+
+    python -m pytest tests
+"""
+import os
+import socket
+import sys
+import threading
+import time
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from stock_core import caching
+from stock_core.shared_cache import (
+    RedisCacheBackend, RespServer, SQLiteCacheBackend, decode_value, encode_value, open_backend, shared_key,
+)
+
+# 값 안에 RESP 구분자와 NUL이 섞여도 그대로 돌아와야 합니다.
+BINARY_VALUE = b"line\r\n$3\r\n*1\r\n\x00" + bytes(range(256))
+
+
+@pytest.fixture
+def sqlite_backend(tmp_path):
+    return SQLiteCacheBackend(str(tmp_path / "shared.sqlite3"), 1 << 20)
+
+
+@pytest.fixture
+def resp_server(tmp_path):
+    server = RespServer(("127.0.0.1", 0), SQLiteCacheBackend(str(tmp_path / "standin.sqlite3"), 64 * 1024))
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture
+def redis_backend(resp_server):
+    return open_backend(f"redis://127.0.0.1:{resp_server.server_address[1]}/0", 0)
+
+
+def test_shared_key_is_stable_and_versioned():
+    key = shared_key("stock_core.history.load_quote", 1, (("005930.KS",), ()))
+    assert key == shared_key("stock_core.history.load_quote", 1, (("005930.KS",), ()))
+    assert key.startswith("stock:1:stock_core.history.load_quote:v1:")
+    assert key != shared_key("stock_core.history.load_quote", 2, (("005930.KS",), ()))
+
+
+def test_encode_value_keeps_timestamp():
+    created_at, value = decode_value(encode_value({"price": 1.5}, created_at=123.0))
+    assert (created_at, value) == (123.0, {"price": 1.5})
+
+
+def test_open_backend_parses_urls(tmp_path):
+    assert isinstance(open_backend(f"sqlite:///{tmp_path}/a.sqlite3", 1024), SQLiteCacheBackend)
+    backend = open_backend("redis://:secret@cache:6390/2", 0)
+    assert (backend.address, backend.db, backend.password) == (("cache", 6390), 2, "secret")
+    with pytest.raises(ValueError):
+        open_backend("memcached://cache", 0)
+
+
+def test_sqlite_round_trip_and_expiry(sqlite_backend):
+    assert sqlite_backend.get("missing") is None
+    sqlite_backend.set("k", BINARY_VALUE)
+    sqlite_backend.set("short", b"x", ttl=0.05)
+    assert sqlite_backend.get("k") == BINARY_VALUE
+    assert sqlite_backend.get("short") == b"x"
+    time.sleep(0.1)
+    assert sqlite_backend.get("short") is None
+    sqlite_backend.delete("k")
+    assert sqlite_backend.get("k") is None
+
+
+def test_sqlite_shared_between_connections(tmp_path):
+    path = str(tmp_path / "shared.sqlite3")
+    SQLiteCacheBackend(path, 1 << 20).set("k", b"v", ttl=60)
+    assert SQLiteCacheBackend(path, 1 << 20).get("k") == b"v"
+
+
+def test_sqlite_evicts_least_recently_used(tmp_path):
+    backend = SQLiteCacheBackend(str(tmp_path / "small.sqlite3"), 10_000)
+    for i in range(40):
+        backend.set(f"k{i}", bytes(1000))
+        if i >= 1:
+            # 처음 넣은 항목은 계속 읽어 가장 최근에 쓴 항목으로 남깁니다.
+            backend.get("k0")
+    assert backend.total_bytes() <= 10_000
+    assert backend.get("k0") is not None
+    assert backend.get("k1") is None
+    assert backend.get("k39") is not None
+
+
+def test_resp_round_trip_and_expiry(redis_backend):
+    assert redis_backend.command("PING") == "PONG"
+    assert redis_backend.get("missing") is None
+    redis_backend.set("k", BINARY_VALUE)
+    redis_backend.set("short", b"x", ttl=0.05)
+    assert redis_backend.get("k") == BINARY_VALUE
+    assert redis_backend.get("short") == b"x"
+    time.sleep(0.1)
+    assert redis_backend.get("short") is None
+    redis_backend.delete("k")
+    assert redis_backend.get("k") is None
+    redis_backend.set("a", b"1")
+    redis_backend.clear()
+    assert redis_backend.get("a") is None
+
+
+def test_resp_server_enforces_max_bytes(resp_server, redis_backend):
+    for i in range(64):
+        redis_backend.set(f"k{i}", bytes(4096))
+    assert resp_server.backend.total_bytes() <= 64 * 1024
+    assert redis_backend.get("k63") == bytes(4096)
+
+
+def test_resp_concurrent_clients(redis_backend):
+    errors = []
+
+    def work(n):
+        try:
+            for j in range(30):
+                value = f"{n}-{j}".encode() * 50
+                redis_backend.set(f"t{n}-{j}", value)
+                assert redis_backend.get(f"t{n}-{j}") == value
+        except Exception as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=work, args=(n,)) for n in range(4)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert not errors
+
+
+def test_redis_backs_off_when_server_is_down():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        port = s.getsockname()[1]
+    backend = RedisCacheBackend("127.0.0.1", port, timeout=0.2)
+    with pytest.raises(OSError):
+        backend.get("k")
+    # 두 번째부터는 연결을 다시 시도하지 않고 바로 실패합니다.
+    started = time.monotonic()
+    with pytest.raises(ConnectionError):
+        backend.get("k")
+    assert time.monotonic() - started < 0.05
+
+
+@pytest.mark.parametrize("kind", ["sqlite", "redis"])
+def test_ttl_cache_reads_through_shared_backend(kind, monkeypatch, sqlite_backend, request):
+    backend = sqlite_backend if kind == "sqlite" else request.getfixturevalue("redis_backend")
+    monkeypatch.setattr(caching, "get_shared_cache", lambda: backend)
+    calls = []
+
+    @caching.ttl_cache(ttl=60, shared=True)
+    def load(ticker):
+        calls.append(ticker)
+        return {"ticker": ticker}
+
+    assert load("AAPL") == {"ticker": "AAPL"}
+    # 다른 프로세스처럼 프로세스 캐시만 비우면 공유 캐시에서 읽고 다시 계산하지 않습니다.
+    load.cache_clear()
+    assert load("AAPL") == {"ticker": "AAPL"}
+    assert calls == ["AAPL"]
+    assert load.age("AAPL") < 1
@@ -0,0 +1,106 @@
+"""다기간 재무 지표 엔진(stock_core.statements) 확인.
+
+벤치마크 픽스처 재무제표로 만든 기간별 ROIC/이자보상배율이, 최근 결산 한 열만 보던 예전 계산을
+결산 기간마다 적용한 값과 같은지 봅니다.
+
+    python -m pytest tests
+"""
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+import pytest
+
+pytest.importorskip("yfinance")
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from stock_core.statements import GROWTH_LAG, build_statement_history
+
+FIXTURE_DIR = os.path.join(ROOT, "benchmarks", "fixtures")
+
+
+def fixture_statement(kind):
+    df = pd.read_csv(os.path.join(FIXTURE_DIR, f"{kind}_005930.csv"), index_col=0)
+    df.columns = pd.to_datetime(df.columns)
+    return df
+
+
+@pytest.fixture(scope="module")
+def statements():
+    return tuple(fixture_statement(kind) for kind in ('financials', 'balance_sheet', 'cashflow'))
+
+
+def baseline_roic(fin_df, bs_df):
+    """예전 상세 재무 탭의 ROIC 추정 (첫 열 = 최근 결산)"""
+    op_inc = None
+    if 'Operating Income' in fin_df.index:
+        op_inc = fin_df.loc['Operating Income'].iloc[0]
+    elif 'EBIT' in fin_df.index:
+        op_inc = fin_df.loc['EBIT'].iloc[0]
+    tot_assets = bs_df.loc['Total Assets'].iloc[0] if 'Total Assets' in bs_df.index else None
+    cur_liab = bs_df.loc['Current Liabilities'].iloc[0] if 'Current Liabilities' in bs_df.index else 0
+    if pd.notna(op_inc) and pd.notna(tot_assets) and float(tot_assets) > 0:
+        invested_capital = float(tot_assets) - float(cur_liab if pd.notna(cur_liab) else 0)
+        if invested_capital > 0:
+            return float(op_inc) * 0.75 / invested_capital
+    return np.nan
+
+
+def baseline_interest_coverage(fin_df):
+    op_inc_val = fin_df.loc['Operating Income'].iloc[0]
+    int_exp_val = fin_df.loc['Interest Expense'].iloc[0]
+    if pd.isna(op_inc_val) or pd.isna(int_exp_val) or int_exp_val == 0:
+        return np.nan
+    return abs(op_inc_val / int_exp_val)
+
+
+def test_periods_are_most_recent_first(statements):
+    history = build_statement_history(*statements)
+    assert list(history.periods) == sorted(statements[0].columns, reverse=True)
+
+
+def test_roic_and_interest_coverage_match_baseline_per_period(statements):
+    fin_df, bs_df, cf_df = statements
+    history = build_statement_history(fin_df, bs_df, cf_df)
+    for i, period in enumerate(history.periods):
+        fin_p, bs_p = fin_df[[period]], bs_df[[period]]
+        np.testing.assert_allclose(history.metric('roic')[i], baseline_roic(fin_p, bs_p), rtol=1e-12, equal_nan=True)
+        np.testing.assert_allclose(history.metric('interest_coverage')[i], baseline_interest_coverage(fin_p),
+                                   rtol=1e-12, equal_nan=True)
+    # 픽스처에는 투하자본이 음수인 해(2023)가 있어 그 해의 ROIC는 비어야 합니다.
+    assert np.isnan(history.metric('roic')[list(history.periods).index(pd.Timestamp("2023-12-31"))])
+
+
+def test_latest_matches_baseline(statements):
+    fin_df, bs_df, cf_df = statements
+    history = build_statement_history(fin_df, bs_df, cf_df)
+    assert history.latest('roic') == pytest.approx(baseline_roic(fin_df, bs_df))
+    assert history.latest('interest_coverage') == pytest.approx(baseline_interest_coverage(fin_df))
+    assert history.latest('rev') == fin_df.loc['Total Revenue'].iloc[0]
+
+
+def test_operating_income_falls_back_to_ebit_and_growth_uses_lag():
+    periods = pd.to_datetime(["2024-12-31", "2023-12-31", "2022-12-31"])
+    fin_df = pd.DataFrame({
+        periods[0]: [200.0, np.nan, 120.0, -10.0],
+        periods[1]: [100.0, 50.0, 80.0, 0.0],
+        periods[2]: [80.0, 40.0, 60.0, -5.0],
+    }, index=['Total Revenue', 'Operating Income', 'EBIT', 'Interest Expense'])
+    bs_df = pd.DataFrame({p: [1000.0, 200.0] for p in periods}, index=['Total Assets', 'Current Liabilities'])
+    history = build_statement_history(fin_df, bs_df, pd.DataFrame())
+
+    np.testing.assert_allclose(history.metric('roic'), [120 * 0.75 / 800, 50 * 0.75 / 800, 40 * 0.75 / 800])
+    np.testing.assert_allclose(history.metric('interest_coverage'), [12.0, np.nan, 8.0], equal_nan=True)
+    np.testing.assert_allclose(history.metric('op_margin'), [0.6, 0.5, 0.5])
+    np.testing.assert_allclose(history.metric('rev_growth'), [1.0, 0.25, np.nan], equal_nan=True)
+
+    quarterly = build_statement_history(fin_df, bs_df, pd.DataFrame(), GROWTH_LAG['quarterly'])
+    assert np.isnan(quarterly.metric('rev_growth')).all()
+
+
+def test_empty_statements():
+    history = build_statement_history(pd.DataFrame(), pd.DataFrame(), pd.DataFrame())
+    assert history.empty
+    assert history.latest('roic') is None